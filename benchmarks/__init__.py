@@ -0,0 +1,9 @@
+"""
+Paper Mimic benchmarks
+
+End-to-end benchmarks against the local mock LLM server
+(src/services/mock_llm_server.py). Run from the project root:
+
+    python -m benchmarks.run --scenario all --output bench.json
+    python -m benchmarks.run --scenario mimic --baseline bench.json
+"""
@@ -0,0 +1,159 @@
+"""
+Measurement helpers for the benchmarks: latency percentiles, event-loop lag
+and peak RSS of a process tree
+"""
+
+import asyncio
+import os
+from pathlib import Path
+import resource
+import sys
+import threading
+import time
+from typing import Any
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Linear-interpolated percentile (q in 0-100) of values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def latency_summary(seconds: list[float], unit: str = "s") -> dict[str, Any]:
+    """count, mean, p50/p95/p99 and max of a list of durations"""
+    scale = 1000 if unit == "ms" else 1
+
+    def fmt(value: float | None) -> float | None:
+        return None if value is None else round(value * scale, 3)
+
+    return {
+        "count": len(seconds),
+        f"mean_{unit}": fmt(sum(seconds) / len(seconds)) if seconds else None,
+        f"p50_{unit}": fmt(percentile(seconds, 50)),
+        f"p95_{unit}": fmt(percentile(seconds, 95)),
+        f"p99_{unit}": fmt(percentile(seconds, 99)),
+        f"max_{unit}": fmt(max(seconds)) if seconds else None,
+    }
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop wakes a sleeping task
+
+    A task sleeps for interval seconds in a loop; anything beyond interval
+    is time the loop spent on other callbacks without yielding.
+    """
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - started - self.interval))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def summary(self) -> dict[str, Any]:
+        return latency_summary(self.samples, unit="ms")
+
+
+def _children(pid: int) -> list[int]:
+    children = []
+    for stat in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            # The command name may contain spaces; ppid follows the closing ")"
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(stat.parent.name))
+    return children
+
+
+def tree_rss_bytes(pid: int) -> int | None:
+    """Resident memory of a process and all its descendants (Linux only)"""
+    if not Path("/proc").is_dir():
+        return None
+    total = 0
+    pending = [pid]
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    while pending:
+        current = pending.pop()
+        try:
+            total += int(Path(f"/proc/{current}/statm").read_text().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+        pending.extend(_children(current))
+    return total
+
+
+class PeakRSSSampler:
+    """
+    Samples the RSS of a process tree in a background thread
+
+    Without /proc (macOS, Windows) only this process's ru_maxrss is
+    available, which is the peak since it started.
+    """
+
+    def __init__(self, pid: int | None = None, interval: float = 0.1):
+        self.pid = pid or os.getpid()
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = tree_rss_bytes(self.pid)
+            if rss:
+                self.peak = max(self.peak, rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        if not self.peak and self.pid == os.getpid():
+            # ru_maxrss is kilobytes on Linux and bytes on macOS
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            self.peak = maxrss if sys.platform == "darwin" else maxrss * 1024
+
+    @property
+    def peak_mb(self) -> float:
+        return round(self.peak / (1024 * 1024), 1)
+
+
+class Stopwatch:
+    """Wall time of a block, in seconds"""
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.started
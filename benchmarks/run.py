@@ -0,0 +1,623 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark runner
+
+Scenarios:
+- parse: PyMuPDF parsing (parser process pool, no cache) of synthetic papers
+  of increasing page count
+- mimic: mimic_exam_questions in-process, end to end (parse, extract,
+  generate) for --sessions concurrent sessions
+- ws: the same workload through the /api/question/mimic WebSocket of a
+  uvicorn server started for the run (PDF sent as binary frames)
+
+All LLM traffic goes to the mock server (src/services/mock_llm_server.py),
+started with the --latency/--tokens-per-second/--error-rate/--seed options
+unless --mock-url points at a running one.
+
+Each scenario does --warmup unrecorded runs and --repeat recorded ones.
+Reported: questions/min, p50/p95/p99 latencies, peak RSS of the process tree
+and event-loop lag (for ws: latency of /health probes, which is the server's
+loop lag as seen from outside). Papers carry a per-run nonce so caches never
+answer for them.
+
+--output writes the report as JSON; --baseline compares against an earlier
+report and exits with status 1 if a metric got worse by more than
+--tolerance (and by more than its noise floor).
+
+Usage:
+    python -m benchmarks.run --scenario all --output bench.json
+    python -m benchmarks.run --scenario mimic ws --sessions 4 --baseline bench.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+from datetime import datetime
+import json
+import os
+from pathlib import Path
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any
+import uuid
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from benchmarks.measure import (
+    LoopLagMonitor,
+    PeakRSSSampler,
+    Stopwatch,
+    latency_summary,
+    percentile,
+)
+from benchmarks.sample_pdfs import write_sample_pdf
+
+SCENARIOS = ("parse", "mimic", "ws")
+MOCK_MODEL = "mock"
+
+# Worse-is-higher suffixes and the smallest change that counts as a regression
+LOWER_IS_BETTER = {"_ms": 5.0, "_s": 0.05, "_mb": 10.0}
+HIGHER_IS_BETTER = ("per_min", "per_sec")
+
+# Progress output goes to the real stdout while the pipeline's prints are captured
+REAL_STDOUT = sys.stdout
+
+
+def say(message: str = ""):
+    print(message, file=REAL_STDOUT, flush=True)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def llm_env(mock_url: str) -> dict[str, str]:
+    """Environment pointing every LLM setting at the mock server"""
+    return {
+        "GEMINI_API_KEY": "mock",
+        "GEMINI_BASE_URL": mock_url,
+        "OPENAI_API_KEY": "mock",
+        "OPENAI_BASE_URL": mock_url,
+        "LLM_API_KEY": "mock",
+        "LLM_BASE_URL": mock_url,
+        "LLM_MODEL": MOCK_MODEL,
+    }
+
+
+class ServerProcess:
+    """A server subprocess that is ready once health_url answers"""
+
+    def __init__(self, command: list[str], health_url: str, log_path: Path, env: dict | None = None):
+        self.command = command
+        self.health_url = health_url
+        self.log_path = log_path
+        self.env = env
+        self.process: subprocess.Popen | None = None
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def __enter__(self):
+        import httpx
+
+        self._log = open(self.log_path, "ab")
+        self.process = subprocess.Popen(
+            self.command, cwd=project_root, env=self.env, stdout=self._log, stderr=subprocess.STDOUT
+        )
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"{self.command[2]} exited early, see {self.log_path}")
+            try:
+                if httpx.get(self.health_url, timeout=1).status_code == 200:
+                    return self
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.2)
+        self.__exit__()
+        raise RuntimeError(f"{self.command[2]} did not become ready, see {self.log_path}")
+
+    def __exit__(self, *exc):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(15)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self._log.close()
+
+
+class EventTimer:
+    """Per-question latencies and outcome of one session's progress events"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.generating: dict[str, float] = {}
+        self.latencies: list[float] = []
+        self.first_result: float | None = None
+        self.succeeded = 0
+        self.failed = 0
+        self.timings: dict[str, Any] | None = None
+        self.error: str | None = None
+
+    def on_event(self, event_type: str, data: dict[str, Any]):
+        now = time.perf_counter()
+        question_id = data.get("question_id")
+        if event_type == "question_update" and data.get("status") == "generating":
+            self.generating[question_id] = now
+        elif event_type == "question_update" and data.get("status") == "failed":
+            self.failed += 1
+        elif event_type == "result" and data.get("success"):
+            self.succeeded += 1
+            if self.first_result is None:
+                self.first_result = now - self.started
+            if question_id in self.generating:
+                self.latencies.append(now - self.generating.pop(question_id))
+        elif event_type == "summary":
+            self.timings = data.get("timings")
+        elif event_type == "error":
+            self.error = data.get("content")
+
+
+def aggregate_sessions(runs: list[tuple[float, list[EventTimer]]]) -> dict[str, Any]:
+    """Combine recorded runs (wall time, session timers) into one report entry"""
+    timers = [timer for _, sessions in runs for timer in sessions]
+    throughput = [
+        sum(t.succeeded for t in sessions) / wall * 60 for wall, sessions in runs if wall > 0
+    ]
+    stage_seconds: dict[str, list[float]] = {}
+    tokens = []
+    for timer in timers:
+        if not timer.timings:
+            continue
+        for stage, entry in timer.timings.get("stages", {}).items():
+            stage_seconds.setdefault(stage, []).append(entry["seconds"])
+        if timer.succeeded and timer.timings.get("tokens"):
+            tokens.append(timer.timings["tokens"].get("total_tokens", 0) / timer.succeeded)
+
+    return {
+        "questions_per_min": round(percentile(throughput, 50) or 0, 1),
+        "succeeded": sum(t.succeeded for t in timers),
+        "failed": sum(t.failed for t in timers),
+        "errors": [t.error for t in timers if t.error],
+        "question_latency": latency_summary([l for t in timers for l in t.latencies]),
+        "first_result": latency_summary([t.first_result for t in timers if t.first_result is not None]),
+        "session_wall": latency_summary([wall for wall, _ in runs]),
+        "stages_median_s": {
+            stage: round(percentile(values, 50), 3) for stage, values in sorted(stage_seconds.items())
+        },
+        "tokens_per_question": round(percentile(tokens, 50), 1) if tokens else None,
+    }
+
+
+async def bench_parse(args, workdir: Path) -> dict[str, Any]:
+    """PyMuPDF parsing time per paper size"""
+    from src.agents.question.tools.pdf_parser import (
+        _parse_pdf_with_pymupdf_parallel,
+        shutdown_parser_pool,
+    )
+
+    results = {}
+    try:
+        for pages in args.pages:
+            pdf = workdir / f"parse_{pages}p.pdf"
+            write_sample_pdf(pdf, pages=pages, nonce=args.nonce)
+
+            durations = []
+            lag = LoopLagMonitor()
+            lag.start()
+            with PeakRSSSampler() as rss:
+                for run in range(args.warmup + args.repeat):
+                    output = workdir / f"parse_{pages}p_{run}"
+                    with Stopwatch() as watch:
+                        if not await _parse_pdf_with_pymupdf_parallel(pdf, output):
+                            raise RuntimeError(f"Parsing the {pages}-page paper failed")
+                    if run >= args.warmup:
+                        durations.append(watch.elapsed)
+                    shutil.rmtree(output, ignore_errors=True)
+            await lag.stop()
+
+            median = percentile(durations, 50)
+            results[f"pages_{pages}"] = {
+                "pages": pages,
+                "pages_per_sec": round(pages / median, 1) if median else None,
+                "parse": latency_summary(durations),
+                "peak_rss_mb": rss.peak_mb,
+                "loop_lag": lag.summary(),
+            }
+            say(
+                f"  {pages:>4} pages: p50 {median:.3f}s "
+                f"({results[f'pages_{pages}']['pages_per_sec']} pages/s), peak RSS {rss.peak_mb} MB"
+            )
+    finally:
+        shutdown_parser_pool()
+    return results
+
+
+async def run_mimic_session(pdf: Path, output_dir: Path, args, session_id: str) -> EventTimer:
+    from src.agents.question.tools.exam_mimic import mimic_exam_questions
+    from src.services.llm_scheduler import llm_session
+
+    timer = EventTimer()
+
+    async def callback(event_type: str, data: dict[str, Any]):
+        timer.on_event(event_type, data)
+
+    with llm_session(session_id):
+        result = await mimic_exam_questions(
+            pdf_path=str(pdf),
+            kb_name="bench",
+            output_dir=str(output_dir),
+            max_questions=args.questions,
+            ws_callback=callback,
+            fast_mode=True,
+            streaming=True,
+        )
+    if not result.get("success"):
+        timer.error = result.get("error", "Unknown error")
+    return timer
+
+
+async def bench_mimic(args, workdir: Path) -> dict[str, Any]:
+    """mimic_exam_questions in this process"""
+    runs = []
+    lag = LoopLagMonitor()
+    with PeakRSSSampler() as rss:
+        for run in range(args.warmup + args.repeat):
+            sessions = []
+            for s in range(args.sessions):
+                pdf = workdir / f"mimic_{run}_{s}" / f"bench_{args.nonce}_{run}_{s}.pdf"
+                write_sample_pdf(pdf, questions=args.questions, nonce=f"{args.nonce}-{run}-{s}")
+                sessions.append((pdf, pdf.parent / "out"))
+
+            recorded = run >= args.warmup
+            if recorded and lag._task is None:
+                lag.start()
+            with Stopwatch() as watch:
+                timers = await asyncio.gather(
+                    *(
+                        run_mimic_session(pdf, out, args, f"bench-{s}")
+                        for s, (pdf, out) in enumerate(sessions)
+                    )
+                )
+            if recorded:
+                runs.append((watch.elapsed, timers))
+                say(
+                    f"  run {run - args.warmup + 1}/{args.repeat}: "
+                    f"{sum(t.succeeded for t in timers)} questions in {watch.elapsed:.2f}s"
+                )
+            for pdf, _ in sessions:
+                shutil.rmtree(pdf.parent, ignore_errors=True)
+    await lag.stop()
+
+    return {
+        **aggregate_sessions(runs),
+        "peak_rss_mb": rss.peak_mb,
+        "loop_lag": lag.summary(),
+    }
+
+
+async def run_ws_session(url: str, pdf: Path, args) -> EventTimer:
+    import websockets
+
+    timer = EventTimer()
+    data = pdf.read_bytes()
+    async with websockets.connect(url, max_size=None, open_timeout=30) as ws:
+        await ws.send(
+            json.dumps(
+                {
+                    "mode": "upload_stream",
+                    "pdf_name": pdf.name,
+                    "size": len(data),
+                    "kb_name": "bench",
+                    "max_questions": args.questions,
+                    "streaming": True,
+                }
+            )
+        )
+        for offset in range(0, len(data), 64 * 1024):
+            await ws.send(data[offset:offset + 64 * 1024])
+
+        async for raw in ws:
+            message = json.loads(raw)
+            event_type = message.get("type")
+            timer.on_event(event_type, message)
+            if event_type in ("complete", "error"):
+                break
+    return timer
+
+
+async def probe_health(url: str, samples: list[float], interval: float = 0.1):
+    """Latency of GET /health while the server works"""
+    import httpx
+
+    async with httpx.AsyncClient(timeout=30) as client:
+        while True:
+            started = time.perf_counter()
+            try:
+                await client.get(url)
+                samples.append(time.perf_counter() - started)
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(interval)
+
+
+def cleanup_ws_sessions(nonce: str):
+    """Remove the history sessions the ws scenario created"""
+    from src.api.routers.question import MIMIC_OUTPUT_DIR
+    from src.services.history_index import get_history_index
+
+    index = get_history_index()
+    for session_dir in MIMIC_OUTPUT_DIR.glob(f"mimic_*_bench_{nonce}_*"):
+        index.delete(session_dir.name)
+        shutil.rmtree(session_dir, ignore_errors=True)
+
+
+async def bench_ws(args, workdir: Path) -> dict[str, Any]:
+    """/api/question/mimic on a uvicorn server subprocess"""
+    port = free_port()
+    env = {**os.environ, **llm_env(args.mock_url), "API_WORKERS": "1", "ENVIRONMENT": "production"}
+    command = [
+        sys.executable, "-m", "uvicorn", "src.api.main:app",
+        "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+    ]
+    base = f"127.0.0.1:{port}"
+
+    runs = []
+    probes: list[float] = []
+    try:
+        with ServerProcess(command, f"http://{base}/health", workdir / "api_server.log", env) as server:
+            with PeakRSSSampler(server.pid) as rss:
+                for run in range(args.warmup + args.repeat):
+                    pdfs = []
+                    for s in range(args.sessions):
+                        pdf = workdir / f"bench_{args.nonce}_{run}_{s}.pdf"
+                        write_sample_pdf(pdf, questions=args.questions, nonce=f"{args.nonce}-ws-{run}-{s}")
+                        pdfs.append(pdf)
+
+                    recorded = run >= args.warmup
+                    samples: list[float] = []
+                    probe = asyncio.create_task(probe_health(f"http://{base}/health", samples))
+                    with Stopwatch() as watch:
+                        timers = await asyncio.gather(
+                            *(run_ws_session(f"ws://{base}/api/question/mimic", pdf, args) for pdf in pdfs)
+                        )
+                    probe.cancel()
+                    with contextlib.suppress(asyncio.CancelledError):
+                        await probe
+
+                    if recorded:
+                        runs.append((watch.elapsed, timers))
+                        probes.extend(samples)
+                        say(
+                            f"  run {run - args.warmup + 1}/{args.repeat}: "
+                            f"{sum(t.succeeded for t in timers)} questions in {watch.elapsed:.2f}s"
+                        )
+    finally:
+        await asyncio.to_thread(cleanup_ws_sessions, args.nonce)
+
+    return {
+        **aggregate_sessions(runs),
+        "server_peak_rss_mb": rss.peak_mb,
+        "health_probe": latency_summary(probes, unit="ms"),
+    }
+
+
+def flatten(report: dict[str, Any], prefix: str = "") -> dict[str, float]:
+    flat = {}
+    for key, value in report.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = float(value)
+    return flat
+
+
+def compare_reports(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Metrics that got worse than the baseline by more than tolerance"""
+    regressions = []
+    old = flatten(baseline.get("scenarios", {}))
+    for path, value in flatten(current.get("scenarios", {})).items():
+        name = path.rsplit(".", 1)[-1]
+        if path not in old or name.startswith(("max_", "count")):
+            continue
+        before = old[path]
+
+        if name.endswith(HIGHER_IS_BETTER):
+            worse = before - value
+        else:
+            floor = next((f for suffix, f in LOWER_IS_BETTER.items() if name.endswith(suffix)), None)
+            if floor is None:
+                continue
+            worse = value - before
+            if worse <= floor:
+                continue
+        if worse > abs(before) * tolerance:
+            regressions.append(f"{path}: {before:g} -> {value:g}")
+    return regressions
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=project_root, capture_output=True, text=True, timeout=10,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="End-to-end benchmarks against the mock LLM server",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("Usage:", 1)[1],
+    )
+    parser.add_argument(
+        "--scenario", nargs="+", choices=SCENARIOS + ("all",), default=["all"],
+        help="Scenarios to run (default: all)",
+    )
+    parser.add_argument(
+        "--pages", type=lambda v: [int(p) for p in v.split(",")], default=[1, 10, 50, 200],
+        help="Page counts for the parse scenario (default: 1,10,50,200)",
+    )
+    parser.add_argument("--questions", type=int, default=20, help="Questions per paper (default: 20)")
+    parser.add_argument("--sessions", type=int, default=2, help="Concurrent sessions (default: 2)")
+    parser.add_argument("--repeat", type=int, default=3, help="Recorded runs (default: 3)")
+    parser.add_argument("--warmup", type=int, default=1, help="Unrecorded warm-up runs (default: 1)")
+
+    mock = parser.add_argument_group("mock LLM server")
+    mock.add_argument("--mock-url", type=str, default=None, help="Use a running mock server (…/v1)")
+    mock.add_argument(
+        "--latency", type=str, default="lognormal:0.3,0.3",
+        help="First-token latency distribution (default: lognormal:0.3,0.3)",
+    )
+    mock.add_argument("--tokens-per-second", type=float, default=200.0, help="Completion token rate")
+    mock.add_argument("--completion-tokens", type=int, default=0, help="Pad answers to about N tokens")
+    mock.add_argument("--error-rate", type=float, default=0.0, help="Share of failed LLM requests")
+    mock.add_argument("--error-status", type=int, default=500, help="Status of failed requests")
+    mock.add_argument("--seed", type=int, default=1234, help="Mock random seed (default: 1234)")
+
+    parser.add_argument("--output", type=Path, default=None, help="Write the report as JSON")
+    parser.add_argument("--baseline", type=Path, default=None, help="Compare with an earlier report")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="Allowed relative regression (default: 0.2)"
+    )
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own output")
+    args = parser.parse_args(argv)
+    args.scenarios = list(SCENARIOS) if "all" in args.scenario else list(dict.fromkeys(args.scenario))
+    return args
+
+
+async def run_benchmarks(args, workdir: Path) -> dict[str, Any]:
+    report: dict[str, Any] = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "settings": {
+                key: getattr(args, key)
+                for key in (
+                    "questions", "sessions", "repeat", "warmup", "latency", "tokens_per_second",
+                    "completion_tokens", "error_rate", "error_status", "seed",
+                )
+            },
+        },
+        "scenarios": {},
+    }
+    benches = {"parse": bench_parse, "mimic": bench_mimic, "ws": bench_ws}
+    for name in args.scenarios:
+        say(f"▶️ {name}")
+        with Stopwatch() as watch:
+            report["scenarios"][name] = await benches[name](args, workdir)
+        say(f"✓ {name} done in {watch.elapsed:.1f}s")
+
+    from src.services.llm import close_llm_clients
+
+    await close_llm_clients()
+    return report
+
+
+def print_report(report: dict[str, Any]):
+    say()
+    say("=" * 80)
+    say("📊 Benchmark results")
+    say("=" * 80)
+    for name, result in report["scenarios"].items():
+        if name == "parse":
+            for size, entry in result.items():
+                say(
+                    f"parse {size:<10} p50 {entry['parse']['p50_s']}s  p95 {entry['parse']['p95_s']}s  "
+                    f"{entry['pages_per_sec']} pages/s  peak RSS {entry['peak_rss_mb']} MB"
+                )
+            continue
+        latency = result["question_latency"]
+        lag = result.get("loop_lag") or result.get("health_probe")
+        rss = result.get("peak_rss_mb", result.get("server_peak_rss_mb"))
+        say(
+            f"{name:<6} {result['questions_per_min']} questions/min  "
+            f"question p50/p95/p99 {latency['p50_s']}/{latency['p95_s']}/{latency['p99_s']}s  "
+            f"peak RSS {rss} MB"
+        )
+        say(
+            f"       {'loop lag' if name == 'mimic' else 'health probe'} "
+            f"p50/p99/max {lag['p50_ms']}/{lag['p99_ms']}/{lag['max_ms']} ms  "
+            f"failed {result['failed']}  errors {len(result['errors'])}"
+        )
+        if result["stages_median_s"]:
+            say("       stages: " + ", ".join(f"{k} {v}s" for k, v in result["stages_median_s"].items()))
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    args = parse_args(argv)
+    args.nonce = uuid.uuid4().hex[:8]
+    workdir = Path(tempfile.mkdtemp(prefix="paper_mimic_bench_"))
+    pipeline_log = workdir / "pipeline.log"
+
+    with contextlib.ExitStack() as stack:
+        if args.mock_url is None:
+            port = free_port()
+            args.mock_url = f"http://127.0.0.1:{port}/v1"
+            stack.enter_context(
+                ServerProcess(
+                    [
+                        sys.executable, "-m", "src.services.mock_llm_server",
+                        "--port", str(port),
+                        "--latency", args.latency,
+                        "--tokens-per-second", str(args.tokens_per_second),
+                        "--completion-tokens", str(args.completion_tokens),
+                        "--error-rate", str(args.error_rate),
+                        "--error-status", str(args.error_status),
+                        "--seed", str(args.seed),
+                    ],
+                    f"http://127.0.0.1:{port}/health",
+                    workdir / "mock_llm_server.log",
+                )
+            )
+        # Set before the pipeline reads its LLM settings (.env does not override these)
+        os.environ.update(llm_env(args.mock_url))
+        say(f"🧪 Mock LLM server: {args.mock_url} (work dir {workdir})")
+
+        if not args.verbose:
+            log_file = stack.enter_context(open(pipeline_log, "w", encoding="utf-8"))
+            stack.enter_context(contextlib.redirect_stdout(log_file))
+        report = asyncio.run(run_benchmarks(args, workdir))
+
+    print_report(report)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        say(f"💾 Report saved to: {args.output}")
+
+    status = 0
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare_reports(report, baseline, args.tolerance)
+        if regressions:
+            say(f"✗ {len(regressions)} regression(s) against {args.baseline}:")
+            for line in regressions:
+                say(f"   {line}")
+            status = 1
+        else:
+            say(f"✓ No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
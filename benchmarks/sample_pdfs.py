@@ -0,0 +1,113 @@
+"""
+Synthetic exam PDFs for the benchmarks
+
+Pages are written with a minimal, dependency-free PDF writer (Helvetica
+text only), so the papers are identical on every machine. Each question
+starts with a "Question N." line, which the mock LLM server's extraction
+recognises. A nonce line makes every paper unique, so the parse and
+extraction caches never serve a benchmark run.
+"""
+
+from pathlib import Path
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+LINES_PER_PAGE = 48
+LINE_HEIGHT = 14
+
+TOPICS = (
+    "Compute the derivative of f(x) = {a}x^3 - {b}x + {c} and find its critical points.",
+    "A tank holds {a}00 litres and drains at {b} litres per minute. After how many minutes is it {c}0% full?",
+    "Solve the system {a}x + {b}y = {c}, {b}x - {a}y = 1 and check the solution.",
+    "Evaluate the integral of {a}x e^(-{b}x) from 0 to {c}, showing each integration by parts step.",
+    "Prove by induction that the sum of the first n odd numbers times {a} equals {a}n^2 for n >= {b}.",
+    "A fair die is rolled {a} times. What is the probability of at least {b} sixes? Give {c} decimals.",
+)
+
+
+def question_text(number: int) -> list[str]:
+    """Body of question number, wrapped to a few lines"""
+    template = TOPICS[number % len(TOPICS)]
+    text = template.format(a=number % 7 + 2, b=number % 5 + 1, c=number % 9 + 1)
+    words = text.split()
+    lines, line = [], f"Question {number}."
+    for word in words:
+        if len(line) + len(word) > 80:
+            lines.append(line)
+            line = "   "
+        line += " " + word
+    lines.append(line)
+    lines.append("   Show all working. [{} marks]".format(number % 4 + 2))
+    return lines
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _page_stream(lines: list[str]) -> bytes:
+    ops = [f"BT /F1 11 Tf {LINE_HEIGHT} TL 56 {PAGE_HEIGHT - 56} Td"]
+    for line in lines:
+        ops.append(f"({_escape(line)}) Tj T*")
+    ops.append("ET")
+    return "\n".join(ops).encode("latin-1", "replace")
+
+
+def build_pdf(pages: list[list[str]]) -> bytes:
+    """A PDF with one text page per list of lines"""
+    objects: list[bytes] = []
+    font_id = 3
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for pid, lines in zip(page_ids, pages):
+        stream = _page_stream(lines)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {pid + 1} 0 R >>".encode()
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def write_sample_pdf(
+    path: Path, pages: int | None = None, questions: int | None = None, nonce: str = ""
+) -> tuple[int, int]:
+    """
+    Write a synthetic exam paper
+
+    Give the number of pages (filled with questions) or of questions (as
+    many pages as they need). Returns (pages, questions) written.
+    """
+    layout: list[list[str]] = [[f"Benchmark exam paper {nonce}".strip(), ""]]
+    number = 0
+    while True:
+        if questions is not None and number >= questions:
+            break
+        block = question_text(number + 1) + [""]
+        if len(layout[-1]) + len(block) > LINES_PER_PAGE:
+            if pages is not None and len(layout) >= pages:
+                break
+            layout.append([])
+        layout[-1].extend(block)
+        number += 1
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(build_pdf(layout))
+    return len(layout), number
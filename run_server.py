@@ -19,16 +19,37 @@ def main():
     """Run the Paper Mimic API server"""
     host = os.getenv("API_HOST", "0.0.0.0")
     port = int(os.getenv("API_PORT", 8000))
-    
-    print(f"🚀 Starting Paper Mimic API server on {host}:{port}")
-    
-    uvicorn.run(
-        "src.api.main:app",
-        host=host,
-        port=port,
-        reload=os.getenv("ENVIRONMENT", "development") == "development",
-        log_level="info",
-    )
+    # Several worker processes for production; reload only works with one
+    workers = int(os.getenv("API_WORKERS", 1))
+
+    from src.services.job_worker import start_worker_pool, stop_worker_pool
+    from src.services.jobs import get_job_settings
+    from src.services.progress_bus import get_bus_settings
+
+    job_workers = []
+    if workers > 1:
+        print(f"🚀 Starting Paper Mimic API server on {host}:{port} with {workers} workers")
+        if get_bus_settings()["backend"] == "memory":
+            print(
+                "⚠️ progress.bus.backend is 'memory': clients can only re-attach to "
+                "sessions on the worker they started on (use 'sqlite' or 'redis')"
+            )
+        # Job workers are started once here instead of by every API worker
+        job_workers = start_worker_pool(get_job_settings()["workers"])
+    else:
+        print(f"🚀 Starting Paper Mimic API server on {host}:{port}")
+
+    try:
+        uvicorn.run(
+            "src.api.main:app",
+            host=host,
+            port=port,
+            workers=workers if workers > 1 else None,
+            reload=workers == 1 and os.getenv("ENVIRONMENT", "development") == "development",
+            log_level="info",
+        )
+    finally:
+        stop_worker_pool(job_workers)
 
 
 if __name__ == "__main__":
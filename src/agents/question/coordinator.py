@@ -1,15 +1,120 @@
 """Question Agent Coordinator - Simplified for Paper Mimic"""
 
+import asyncio
+import hashlib
+import json
 from pathlib import Path
 import sys
-from typing import Any
+import time
+from typing import Any, Awaitable, Callable
 
 # Add project root to sys.path
 project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+from src.agents.question.tools.generation_cache import get_generation_cache, make_generation_key
 from src.logging.logger import get_logger
-from src.services.llm import get_llm_config
+from src.services.llm import get_async_llm_client, get_llm_config
+from src.services.config import load_config_with_main
+from src.services.llm_resilience import create_chat_completion, stream_chat_completion
+from src.services.llm_scheduler import estimate_tokens
+from src.services.metrics import collect_usage, record_cache, stage_timer
+
+GENERATION_TEMPERATURE = 0.7
+GENERATION_MAX_TOKENS = 2000
+
+GENERATION_SYSTEM_PROMPT = """You are an expert question generator. Your task is to generate educational questions 
+based on reference questions. The generated question should:
+1. Cover the same core concepts as the reference
+2. Have similar difficulty level
+3. Use different scenarios/contexts
+4. Be well-structured and clear"""
+
+GENERATION_USER_PROMPT = """Generate a new question based on this reference:
+
+Reference Question: {reference_question}
+
+Additional Requirements: {additional_requirements}
+
+Return ONLY a valid JSON object with this structure:
+{{"question": {{"question": "...", "type": "...", "answer": "..."}}, "validation": {{"relevance": 0.9, "difficulty": "medium"}}}}"""
+
+BATCH_MAX_TOKENS = 8000
+
+BATCH_SYSTEM_PROMPT = GENERATION_SYSTEM_PROMPT + """
+
+You will receive several numbered reference questions at once. Generate exactly one
+new question for each item, treating every item independently."""
+
+
+def _build_batch_prompt(requirements: list[dict[str, Any]]) -> str:
+    """Pack several requirements into one prompt, sharing identical requirement text"""
+    templates = []
+    for requirement in requirements:
+        reference = requirement.get("reference_question", "")
+        additional = requirement.get("additional_requirements", "")
+        templates.append(additional.replace(reference, "(the item's reference question)") if reference else additional)
+    shared = len(set(templates)) == 1
+
+    parts = ["Generate one new question for each reference below.\n"]
+    if shared:
+        parts.append(f"Requirements for every item:\n{templates[0]}\n")
+    for item_id, (requirement, template) in enumerate(zip(requirements, templates), 1):
+        parts.append(f"### Item {item_id}\nReference Question: {requirement.get('reference_question', '')}")
+        if not shared:
+            parts.append(f"Additional Requirements: {template}")
+        parts.append("")
+
+    parts.append(
+        "Return ONLY a valid JSON object with this structure, with exactly one entry per item id:\n"
+        '{"items": [{"id": 1, "question": {"question": "...", "type": "...", "answer": "..."}, '
+        '"validation": {"relevance": 0.9, "difficulty": "medium"}}]}'
+    )
+    return "\n".join(parts)
+
+
+def _prompt_fingerprint(requirement: dict[str, Any]) -> str:
+    """Hash of the prompt template with the reference text factored out"""
+    reference = requirement.get("reference_question", "")
+    additional = requirement.get("additional_requirements", "")
+    if reference:
+        additional = additional.replace(reference, "{reference_question}")
+    template = "\n".join([GENERATION_SYSTEM_PROMPT, GENERATION_USER_PROMPT, additional])
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()
+
+
+def build_generation_messages(requirement: dict[str, Any]) -> list[dict[str, str]]:
+    """Chat messages for generating one question from a requirement"""
+    user_prompt = GENERATION_USER_PROMPT.format(
+        reference_question=requirement.get("reference_question", ""),
+        additional_requirements=requirement.get("additional_requirements", ""),
+    )
+    return [
+        {"role": "system", "content": GENERATION_SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def parse_json_response(result_text: str) -> dict[str, Any]:
+    """Parse a JSON object from an LLM response, tolerating markdown fences"""
+    # Extract JSON from potential markdown code blocks
+    clean_text = result_text.strip()
+    if "```" in clean_text:
+        # Find the first { and last } which matches the expected JSON structure
+        start_idx = clean_text.find("{")
+        end_idx = clean_text.rfind("}")
+        if start_idx != -1 and end_idx != -1:
+            clean_text = clean_text[start_idx:end_idx+1]
+
+    try:
+        return json.loads(clean_text)
+    except json.JSONDecodeError:
+        # Fallback: try to find specifically the { at start and } at end if naive strip failed
+        start_idx = result_text.find("{")
+        end_idx = result_text.rfind("}")
+        if start_idx != -1 and end_idx != -1:
+            return json.loads(result_text[start_idx:end_idx+1])
+        raise
 
 
 class AgentCoordinator:
@@ -20,75 +125,71 @@ class AgentCoordinator:
         self.kb_name = kb_name
         self.output_dir = output_dir
         self.logger = type('Logger', (), {'logger': get_logger("AgentCoordinator")})()
+        # Token usage of this coordinator's LLM calls (prompt/completion/total_tokens)
         self.token_stats = {}
         self.agent_status = {}
     
-    async def generate_question(self, requirement: dict[str, Any]) -> dict[str, Any]:
-        """Generate a question based on the requirement"""
-        # This is a placeholder - in a real implementation, this would use
-        # language models to generate questions
+    async def generate_question(
+        self,
+        requirement: dict[str, Any],
+        on_partial: Callable[[str], Awaitable[Any]] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Generate a question based on the requirement
+
+        If on_partial is given, the response is streamed (stream=True) and
+        on_partial is awaited with the text received so far, at most once per
+        question.partial_interval seconds.
+        """
         try:
             llm_config = get_llm_config()
-            from openai import AsyncOpenAI
-            
-            client = AsyncOpenAI(api_key=llm_config.api_key, base_url=llm_config.base_url)
-            
-            system_prompt = """You are an expert question generator. Your task is to generate educational questions 
-based on reference questions. The generated question should:
-1. Cover the same core concepts as the reference
-2. Have similar difficulty level
-3. Use different scenarios/contexts
-4. Be well-structured and clear"""
-            
-            user_prompt = f"""Generate a new question based on this reference:
 
-Reference Question: {requirement.get('reference_question', '')}
+            # Optional generation cache (policy in config/main.yaml)
+            cache, cache_key, cached = await self._cache_lookup(requirement, llm_config.model)
+            if cached is not None:
+                return cached
 
-Additional Requirements: {requirement.get('additional_requirements', '')}
+            client = get_async_llm_client(llm_config)
 
-Return ONLY a valid JSON object with this structure:
-{{"question": {{"question": "...", "type": "...", "answer": "..."}}, "validation": {{"relevance": 0.9, "difficulty": "medium"}}}}"""
-            
-            response = await client.chat.completions.create(
-                model=llm_config.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=0.7,
-                max_tokens=2000,
+            messages = build_generation_messages(requirement)
+            tokens = estimate_tokens(
+                *(m["content"] for m in messages), max_tokens=GENERATION_MAX_TOKENS
             )
-            
-            result_text = response.choices[0].message.content
-            
-            # Extract JSON from potential markdown code blocks
-            clean_text = result_text.strip()
-            if "```" in clean_text:
-                # Find the first { and last } which matches the expected JSON structure
-                start_idx = clean_text.find("{")
-                end_idx = clean_text.rfind("}")
-                if start_idx != -1 and end_idx != -1:
-                    clean_text = clean_text[start_idx:end_idx+1]
-            
-            import json
-            try:
-                result = json.loads(clean_text)
-            except json.JSONDecodeError:
-                # Fallback: try to find specifically the { at start and } at end if naive strip failed
-                start_idx = result_text.find("{")
-                end_idx = result_text.rfind("}")
-                if start_idx != -1 and end_idx != -1:
-                    clean_text = result_text[start_idx:end_idx+1]
-                    result = json.loads(clean_text)
+
+            # Retries transient errors; each attempt is one round
+            with stage_timer("generate_question"), collect_usage(self.token_stats):
+                if on_partial is not None:
+                    result_text, rounds = await stream_chat_completion(
+                        client,
+                        self._partial_forwarder(on_partial),
+                        tokens=tokens,
+                        model=llm_config.model,
+                        messages=messages,
+                        temperature=GENERATION_TEMPERATURE,
+                        max_tokens=GENERATION_MAX_TOKENS,
+                    )
                 else:
-                     raise
+                    response, rounds = await create_chat_completion(
+                        client,
+                        tokens=tokens,
+                        model=llm_config.model,
+                        messages=messages,
+                        temperature=GENERATION_TEMPERATURE,
+                        max_tokens=GENERATION_MAX_TOKENS,
+                    )
+                    result_text = response.choices[0].message.content
             
-            return {
+            result = parse_json_response(result_text)
+            
+            generated = {
                 "success": True,
                 "question": result.get("question", {}),
                 "validation": result.get("validation", {}),
-                "rounds": 1,
+                "rounds": rounds,
             }
+            if cache is not None:
+                await asyncio.to_thread(cache.put, cache_key, generated)
+            return generated
             
         except Exception as e:
             return {
@@ -97,6 +198,121 @@ Return ONLY a valid JSON object with this structure:
                 "reason": "Generation failed",
             }
     
+    async def _cache_lookup(self, requirement: dict[str, Any], model: str):
+        """Return (cache, key, cached result or None) for a requirement"""
+        cache = await asyncio.to_thread(get_generation_cache)
+        if cache is None:
+            return None, None, None
+
+        cache_key = make_generation_key(
+            requirement.get("reference_question", ""),
+            self.kb_name,
+            model,
+            GENERATION_TEMPERATURE,
+            _prompt_fingerprint(requirement),
+        )
+        cached = await asyncio.to_thread(cache.get, cache_key)
+        record_cache("generation", cached is not None)
+        if cached is not None:
+            cached = {**cached, "cached": True}
+        return cache, cache_key, cached
+
+    async def generate_questions_batch(
+        self, requirements: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """
+        Generate one question per requirement with a single LLM request
+
+        The references are packed into one structured-output request and the
+        response is split back by item id. Items that are missing or fail to
+        parse fall back to generate_question(). Results are returned in the
+        order of requirements.
+        """
+        if len(requirements) == 1:
+            return [await self.generate_question(requirements[0])]
+
+        results: list[dict[str, Any] | None] = [None] * len(requirements)
+        try:
+            llm_config = get_llm_config()
+
+            pending = []
+            for i, requirement in enumerate(requirements):
+                cache, cache_key, cached = await self._cache_lookup(requirement, llm_config.model)
+                if cached is not None:
+                    results[i] = cached
+                else:
+                    pending.append((i, requirement, cache, cache_key))
+
+            if len(pending) > 1:
+                user_prompt = _build_batch_prompt([req for _, req, _, _ in pending])
+                max_tokens = min(GENERATION_MAX_TOKENS * len(pending), BATCH_MAX_TOKENS)
+                with stage_timer("generate_batch"), collect_usage(self.token_stats):
+                    response, rounds = await create_chat_completion(
+                        get_async_llm_client(llm_config),
+                        tokens=estimate_tokens(
+                            BATCH_SYSTEM_PROMPT, user_prompt, max_tokens=max_tokens
+                        ),
+                        model=llm_config.model,
+                        messages=[
+                            {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                            {"role": "user", "content": user_prompt},
+                        ],
+                        temperature=GENERATION_TEMPERATURE,
+                        max_tokens=max_tokens,
+                    )
+                items = parse_json_response(response.choices[0].message.content).get("items", [])
+                by_id = {str(item.get("id")): item for item in items if isinstance(item, dict)}
+
+                for item_id, (i, _, cache, cache_key) in enumerate(pending, 1):
+                    item = by_id.get(str(item_id))
+                    question = item.get("question") if item else None
+                    if not isinstance(question, dict) or not question.get("question"):
+                        continue
+                    results[i] = {
+                        "success": True,
+                        "question": question,
+                        "validation": item.get("validation", {}),
+                        "rounds": rounds,
+                        "batched": True,
+                    }
+                    if cache is not None:
+                        # Stored as a plain generation: later hits were not batched
+                        stored = {k: v for k, v in results[i].items() if k != "batched"}
+                        await asyncio.to_thread(cache.put, cache_key, stored)
+        except Exception as e:
+            print(f"⚠️ Batched generation failed, falling back to single requests: {e}")
+
+        # Anything the batch did not produce is generated on its own
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            singles = await asyncio.gather(
+                *(self.generate_question(requirements[i]) for i in missing)
+            )
+            for i, result in zip(missing, singles):
+                results[i] = result
+        return results
+
+    @staticmethod
+    def _partial_forwarder(on_partial: Callable[[str], Awaitable[Any]]):
+        """Accumulate streamed deltas and forward the text, throttled"""
+        config = load_config_with_main("question_config.yaml", project_root)
+        interval = config.get("question", {}).get("partial_interval", 0.1)
+        state = {"attempt": 0, "parts": [], "sent": 0.0}
+
+        async def on_delta(delta: str, attempt: int):
+            if attempt != state["attempt"]:
+                # A retry restarts the output
+                state["attempt"] = attempt
+                state["parts"] = []
+            state["parts"].append(delta)
+
+            now = time.monotonic()
+            if now - state["sent"] >= interval:
+                state["sent"] = now
+                await on_partial("".join(state["parts"]))
+
+        return on_delta
+    
     async def generate_questions_custom(self, base_requirement: dict, num_questions: int):
         """Generate multiple questions (custom mode)"""
         results = []
@@ -113,5 +329,59 @@ Return ONLY a valid JSON object with this structure:
         }
 
 
+class GenerationBatcher:
+    """
+    Collects concurrent generate() calls into batched requests
+
+    A batch is sent once batch_size requirements are waiting or linger
+    seconds after the first one arrived, whichever comes first. Each caller
+    still gets its own result.
+    """
+
+    def __init__(self, coordinator: AgentCoordinator, batch_size: int = 5, linger: float = 0.05):
+        self.coordinator = coordinator
+        self.batch_size = max(1, batch_size)
+        self.linger = linger
+        self._pending: list[tuple[dict[str, Any], asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def generate(self, requirement: dict[str, Any]) -> dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((requirement, future))
+
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.linger, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch = [(req, fut) for req, fut in self._pending if not fut.done()]
+        self._pending = []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[dict[str, Any], asyncio.Future]]):
+        try:
+            results = await self.coordinator.generate_questions_batch([req for req, _ in batch])
+        except Exception as e:
+            # One dict per caller, so a caller annotating its result leaves the others alone
+            results = [
+                {"success": False, "error": str(e), "reason": "Generation failed"} for _ in batch
+            ]
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
 # Export AgentCoordinator
-__all__ = ["AgentCoordinator"]
+__all__ = ["AgentCoordinator", "GenerationBatcher"]
@@ -3,11 +3,13 @@ Question Tools - Question generation system toolset
 """
 
 from .exam_mimic import mimic_exam_questions
-from .pdf_parser import parse_pdf_with_mineru
-from .question_extractor import extract_questions_from_paper
+from .pdf_parser import parse_pdf_with_mineru, parse_pdf_with_mineru_async
+from .question_extractor import extract_questions_from_paper, extract_questions_from_paper_async
 
 __all__ = [
     "parse_pdf_with_mineru",
+    "parse_pdf_with_mineru_async",
     "extract_questions_from_paper",
+    "extract_questions_from_paper_async",
     "mimic_exam_questions",
 ]
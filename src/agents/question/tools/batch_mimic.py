@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Offline mimic generation through an OpenAI-compatible Batch API
+
+For bulk jobs that do not need interactive latency, every generation request
+is written to a batch JSONL file (``mimic_batch_input.jsonl`` in the session
+directory), uploaded, and submitted as one ``/v1/chat/completions`` batch.
+The batch is polled until it finishes and its output is turned back into the
+same per-question results the interactive path produces, so the journal and
+``*_generated_questions.json`` are written as usual.
+
+The submitted batch id is saved to ``mimic_batch.json`` in the session
+directory; a resumed run polls that batch instead of submitting a new one.
+Batch calls bypass the interactive LLM scheduler: they have their own
+provider quota.
+"""
+
+import asyncio
+import json
+from pathlib import Path
+import sys
+import time
+from typing import Any, Awaitable, Callable
+
+project_root = Path(__file__).parent.parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.agents.question.coordinator import (
+    GENERATION_MAX_TOKENS,
+    GENERATION_TEMPERATURE,
+    build_generation_messages,
+    parse_json_response,
+)
+from src.agents.question.tools.result_journal import reference_key
+from src.services.config import load_config_with_main
+from src.services.llm import get_async_llm_client, get_llm_config
+
+BATCH_INPUT_NAME = "mimic_batch_input.jsonl"
+BATCH_STATE_NAME = "mimic_batch.json"
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+ProgressCallback = Callable[[str, dict[str, Any]], Awaitable[Any]]
+
+
+def get_batch_api_settings() -> dict:
+    """Get Batch API settings from config/main.yaml"""
+    config = load_config_with_main("question_config.yaml", project_root)
+    cfg = config.get("llm", {}).get("batch_api", {})
+
+    return {
+        "poll_interval": cfg.get("poll_interval", 30.0),
+        "completion_window": cfg.get("completion_window", "24h"),
+    }
+
+
+def build_batch_requests(
+    items: list[tuple[int, dict[str, Any]]], kb_name: str, model: str
+) -> list[dict[str, Any]]:
+    """One batch request line per (index, reference question)"""
+    # Lazy import to avoid circular import
+    from src.agents.question.tools.exam_mimic import build_mimic_requirement
+
+    return [
+        {
+            "custom_id": f"mimic_{index}",
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {
+                "model": model,
+                "messages": build_generation_messages(build_mimic_requirement(ref, kb_name)),
+                "temperature": GENERATION_TEMPERATURE,
+                "max_tokens": GENERATION_MAX_TOKENS,
+            },
+        }
+        for index, ref in items
+    ]
+
+
+def parse_batch_line(line: dict[str, Any]) -> dict[str, Any]:
+    """Turn one batch output/error line into a generation result"""
+    response = line.get("response") or {}
+    error = line.get("error")
+    status = response.get("status_code")
+    if error or status != 200:
+        message = (error or {}).get("message") or f"HTTP {status}"
+        return {"success": False, "error": message, "reason": "Batch request failed"}
+
+    try:
+        content = response["body"]["choices"][0]["message"]["content"]
+        result = parse_json_response(content)
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        return {"success": False, "error": f"Unparseable batch output: {e}", "reason": "Generation failed"}
+
+    return {
+        "success": True,
+        "question": result.get("question", {}),
+        "validation": result.get("validation", {}),
+        "rounds": 1,
+    }
+
+
+def parse_batch_output(text: str) -> dict[str, dict[str, Any]]:
+    """Map custom_id -> generation result for a batch output or error file"""
+    results = {}
+    for raw in text.splitlines():
+        if not raw.strip():
+            continue
+        try:
+            line = json.loads(raw)
+        except ValueError:
+            continue
+        if line.get("custom_id"):
+            results[line["custom_id"]] = parse_batch_line(line)
+    return results
+
+
+def _load_state(path: Path) -> dict[str, Any] | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_state(path: Path, state: dict[str, Any]):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+
+
+async def _submit(client, session_dir: Path, requests: list[dict[str, Any]], settings: dict) -> str:
+    input_path = session_dir / BATCH_INPUT_NAME
+
+    def write_input() -> bytes:
+        session_dir.mkdir(parents=True, exist_ok=True)
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in requests).encode("utf-8")
+        input_path.write_bytes(data)
+        return data
+
+    data = await asyncio.to_thread(write_input)
+    uploaded = await client.files.create(file=(input_path.name, data), purpose="batch")
+    batch = await client.batches.create(
+        input_file_id=uploaded.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window=settings["completion_window"],
+        metadata={"session": session_dir.name},
+    )
+    print(f"📦 Submitted batch {batch.id} with {len(requests)} request(s)")
+    return batch.id
+
+
+async def _poll(client, batch_id: str, interval: float, send_progress: ProgressCallback | None):
+    last_status = None
+    while True:
+        batch = await client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        done = (counts.completed + counts.failed) if counts else 0
+        total = counts.total if counts else 0
+
+        if batch.status != last_status:
+            print(f"⏳ Batch {batch_id}: {batch.status} ({done}/{total})")
+            last_status = batch.status
+        if send_progress:
+            await send_progress(
+                "progress",
+                {
+                    "stage": "generating",
+                    "status": "running",
+                    "message": f"Batch {batch.status}: {done}/{total} requests finished",
+                },
+            )
+
+        if batch.status in TERMINAL_STATUSES:
+            return batch
+        await asyncio.sleep(interval)
+
+
+async def _download(client, file_id: str | None) -> dict[str, dict[str, Any]]:
+    if not file_id:
+        return {}
+    content = await client.files.content(file_id)
+    return parse_batch_output(content.text)
+
+
+async def generate_mimics_with_batch_api(
+    items: list[tuple[int, dict[str, Any]]],
+    kb_name: str,
+    session_dir: Path,
+    resume: bool = False,
+    send_progress: ProgressCallback | None = None,
+) -> dict[int, dict[str, Any]]:
+    """
+    Generate mimics for (index, reference question) pairs with one batch
+
+    Returns generation results (the shape of AgentCoordinator.generate_question)
+    keyed by index. Requests missing from the batch output come back as
+    failures, so a later --resume run only retries those.
+    """
+    if not items:
+        return {}
+
+    settings = get_batch_api_settings()
+    llm_config = get_llm_config()
+    client = get_async_llm_client(llm_config)
+    session_dir = Path(session_dir)
+    state_path = session_dir / BATCH_STATE_NAME
+    keys = {f"mimic_{index}": reference_key(ref) for index, ref in items}
+
+    # Pick up a batch submitted by an interrupted run for the same references
+    state = await asyncio.to_thread(_load_state, state_path) if resume else None
+    if state and all(state.get("keys", {}).get(cid) == key for cid, key in keys.items()):
+        batch_id = state["batch_id"]
+        print(f"♻️ Resuming batch {batch_id}")
+    else:
+        requests = build_batch_requests(items, kb_name, llm_config.model)
+        batch_id = await _submit(client, session_dir, requests, settings)
+        await asyncio.to_thread(
+            _save_state,
+            state_path,
+            {"batch_id": batch_id, "keys": keys, "submitted": time.time()},
+        )
+
+    batch = await _poll(client, batch_id, settings["poll_interval"], send_progress)
+    if batch.status != "completed":
+        print(f"⚠️ Batch {batch_id} ended as {batch.status}; collecting partial results")
+
+    results = await _download(client, batch.error_file_id)
+    results.update(await _download(client, batch.output_file_id))
+    state_path.unlink(missing_ok=True)
+
+    reason = f"Batch {batch.status}"
+    return {
+        index: results.get(
+            f"mimic_{index}",
+            {"success": False, "error": "Missing from batch output", "reason": reason},
+        )
+        for index, _ in items
+    }
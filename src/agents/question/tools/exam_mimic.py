@@ -16,33 +16,36 @@ from datetime import datetime
 import json
 import os
 from pathlib import Path
-import subprocess
 import sys
+import time
 from typing import TYPE_CHECKING, Any, Callable
 
 if TYPE_CHECKING:
     from src.agents.question import AgentCoordinator
+    from src.agents.question.coordinator import GenerationBatcher
 
 # Add project root to sys.path
 project_root = Path(__file__).parent.parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 # Note: AgentCoordinator is imported inside functions to avoid circular import
-from src.agents.question.tools.pdf_parser import parse_pdf_with_mineru
-from src.agents.question.tools.question_extractor import extract_questions_from_paper
+from src.agents.question.tools.pdf_parser import (
+    parse_pdf_with_mineru_async,
+    parse_pdf_with_pymupdf_async,
+)
+from src.agents.question.tools.question_extractor import extract_questions_from_paper_async
+from src.agents.question.tools.result_journal import JournalBusy, ResultJournal, reference_key
+from src.services.history_index import record_session
+from src.services.metrics import current_session_stats, observe_stage, stage_timer, track_session
+from src.services.session_files import question_index_paths, write_question_index
 
 # Type alias for WebSocket callback
 WsCallback = Callable[[str, dict[str, Any]], Any]
 
 
-async def generate_question_from_reference(
-    reference_question: dict[str, Any], coordinator: AgentCoordinator, kb_name: str
-) -> dict[str, Any]:
-    """
-    Generate a new question based on a reference entry.
-    """
-    # Build generation requirement that encodes the reference
-    requirement = {
+def build_mimic_requirement(reference_question: dict[str, Any], kb_name: str) -> dict[str, Any]:
+    """Build the generation requirement that encodes a reference question."""
+    return {
         "reference_question": reference_question["question_text"],
         "has_images": len(reference_question.get("images", [])) > 0,
         "kb_name": kb_name,
@@ -65,12 +68,41 @@ async def generate_question_from_reference(
         ),
     }
 
+
+def find_question_files(paper_dir: Path) -> list[Path]:
+    """Extracted reference question files (not generated mimic summaries)."""
+    return [
+        f
+        for f in paper_dir.glob("*_questions.json")
+        if not f.name.endswith("_generated_questions.json")
+    ]
+
+
+async def generate_question_from_reference(
+    reference_question: dict[str, Any],
+    coordinator: AgentCoordinator,
+    kb_name: str,
+    on_partial: Callable[[str], Any] | None = None,
+    batcher: GenerationBatcher | None = None,
+) -> dict[str, Any]:
+    """
+    Generate a new question based on a reference entry.
+
+    on_partial, if given, receives the streamed response text so far.
+    batcher, if given, packs the request together with other short
+    references (no streaming in that case).
+    """
+    requirement = build_mimic_requirement(reference_question, kb_name)
+
     # Trigger generation through the coordinator
-    result = await coordinator.generate_question(requirement)
+    if batcher is not None:
+        return await batcher.generate(requirement)
+    result = await coordinator.generate_question(requirement, on_partial=on_partial)
 
     return result
 
 
+@track_session
 async def mimic_exam_questions(
     pdf_path: str | None = None,
     paper_dir: str | None = None,
@@ -79,6 +111,10 @@ async def mimic_exam_questions(
     max_questions: int | None = None,
     ws_callback: WsCallback | None = None,
     fast_mode: bool = False,
+    streaming: bool = False,
+    pdf_sha256: str | None = None,
+    resume: bool = False,
+    batch_api: bool = False,
 ) -> dict[str, Any]:
     """
     End-to-end orchestration for reference-based question generation.
@@ -91,6 +127,17 @@ async def mimic_exam_questions(
         max_questions: Maximum number of questions to process
         ws_callback: Optional async callback for WebSocket progress updates
                      Signature: async def callback(event_type: str, data: dict)
+        fast_mode: Use the PyMuPDF parser instead of MinerU
+        streaming: Start generating each reference question as soon as
+                   extraction emits it instead of waiting for all of them
+        pdf_sha256: SHA-256 of the PDF if already known (skips re-hashing)
+        resume: Reuse results already journaled in the output directory and
+                only generate the remaining reference questions
+        batch_api: Submit all generations as one offline Batch API job and
+                   wait for it instead of calling the model interactively
+
+    The summary event and the returned dict include a "timings" breakdown
+    (seconds per stage, LLM calls and token usage) of the run.
     """
 
     async def send_progress(event_type: str, data: dict[str, Any]):
@@ -118,6 +165,10 @@ async def mimic_exam_questions(
             "error": "pdf_path and paper_dir cannot be used together. Choose only one.",
         }
 
+    if batch_api and streaming:
+        print("⚠️ Streaming extraction is not used with the Batch API")
+        streaming = False
+
     latest_dir = None
 
     # If an already parsed exam directory is provided
@@ -143,8 +194,6 @@ async def mimic_exam_questions(
             await send_progress("error", {"content": error_msg})
             return {"success": False, "error": error_msg}
 
-        paper_path = Path(paper_dir)
-
         # Candidate locations to search (including new location)
         project_root = Path(__file__).parent.parent.parent.parent.parent
         possible_paths = [
@@ -178,12 +227,6 @@ async def mimic_exam_questions(
                 "success": False,
                 "error": f"{error_msg}\nSearched paths: {[str(p) for p in possible_paths]}",
             }
-        else:
-            latest_dir = paper_path.resolve()
-            if not latest_dir.exists():
-                error_msg = f"Exam directory not found: {latest_dir}"
-                await send_progress("error", {"content": error_msg})
-                return {"success": False, "error": error_msg}
 
         # Ensure auto subdirectory exists
         auto_dir = latest_dir / "auto"
@@ -227,19 +270,18 @@ async def mimic_exam_questions(
             output_base = project_root / "data" / "user" / "question" / "mimic_papers"
         output_base.mkdir(parents=True, exist_ok=True)
 
+        # Parsing runs off the event loop (process pool / async subprocess)
         if fast_mode:
             print("🚀 Using Fast Mode (PyMuPDF)")
-            parser_script = Path(__file__).parent / "pdf_parser.py"
-            cmd = [sys.executable, str(parser_script), str(pdf_path), "--fast"]
-            if output_dir:
-                cmd.extend(["-o", str(output_base)])
-            
-            result = subprocess.run(cmd, check=False)
-            success = result.returncode == 0
+            parsed_dir = await parse_pdf_with_pymupdf_async(
+                Path(pdf_path), output_base, pdf_sha256=pdf_sha256
+            )
         else:
-            success = parse_pdf_with_mineru(pdf_path=pdf_path, output_base_dir=str(output_base))
+            parsed_dir = await parse_pdf_with_mineru_async(
+                pdf_path=pdf_path, output_base_dir=str(output_base), pdf_sha256=pdf_sha256
+            )
 
-        if not success:
+        if not parsed_dir:
             await send_progress("error", {"content": "Failed to parse PDF with MinerU"})
             return {"success": False, "error": "Failed to parse PDF"}
 
@@ -248,19 +290,13 @@ async def mimic_exam_questions(
         print("🔍 Step 2: locating parsed results")
         print("-" * 80)
 
-        # Look in the new output directory (user/question/mimic_papers)
-        reference_papers_dir = output_base
-        subdirs = sorted(
-            [d for d in reference_papers_dir.iterdir() if d.is_dir()],
-            key=lambda x: x.stat().st_mtime,
-            reverse=True,
-        )
-
-        if not subdirs:
+        # The parser reports the directory it wrote (or restored from the cache);
+        # the newest folder in a shared output directory may be another paper
+        if not parsed_dir.is_dir():
             await send_progress("error", {"content": "No parsed outputs were found"})
             return {"success": False, "error": "No parsed outputs were found"}
 
-        latest_dir = subdirs[0]
+        latest_dir = parsed_dir
         print(f"✓ Parsed folder: {latest_dir.name}")
         print()
 
@@ -273,88 +309,6 @@ async def mimic_exam_questions(
             },
         )
 
-    # Stage 2: Extract questions
-    await send_progress(
-        "progress",
-        {
-            "stage": "extracting",
-            "status": "running",
-            "message": "Extracting reference questions from exam...",
-        },
-    )
-
-    print("🔄 Step 3: extract reference questions")
-    print("-" * 80)
-
-    json_files = list(latest_dir.glob("*_questions.json"))
-
-    if json_files:
-        print(f"✓ Found existing question file: {json_files[0].name}")
-        with open(json_files[0], encoding="utf-8") as f:
-            questions_data = json.load(f)
-    else:
-        print("📄 No question file found, starting extraction...")
-        success = extract_questions_from_paper(paper_dir=str(latest_dir), output_dir=None)
-
-        if not success:
-            await send_progress("error", {"content": "Question extraction failed"})
-            return {"success": False, "error": "Question extraction failed"}
-
-        json_files = list(latest_dir.glob("*_questions.json"))
-        if not json_files:
-            await send_progress(
-                "error", {"content": "Question JSON file not found after extraction"}
-            )
-            return {"success": False, "error": "Question JSON file not found after extraction"}
-
-        with open(json_files[0], encoding="utf-8") as f:
-            questions_data = json.load(f)
-
-    reference_questions = questions_data.get("questions", [])
-
-    if max_questions:
-        reference_questions = reference_questions[:max_questions]
-
-    print(f"✓ Loaded {len(reference_questions)} reference questions")
-    print()
-
-    # Send reference questions info
-    await send_progress(
-        "progress",
-        {
-            "stage": "extracting",
-            "status": "complete",
-            "message": f"Extracted {len(reference_questions)} reference questions",
-            "total_questions": len(reference_questions),
-            "reference_questions": [
-                {
-                    "number": q.get("question_number", str(i + 1)),
-                    "preview": (
-                        q["question_text"][:100] + "..."
-                        if len(q["question_text"]) > 100
-                        else q["question_text"]
-                    ),
-                }
-                for i, q in enumerate(reference_questions)
-            ],
-        },
-    )
-
-    # Stage 3: Generate mimic questions
-    await send_progress(
-        "progress",
-        {
-            "stage": "generating",
-            "status": "running",
-            "message": "Generating mimic questions...",
-            "current": 0,
-            "total": len(reference_questions),
-        },
-    )
-
-    print("🔄 Step 4: generate new questions from references (parallel)")
-    print("-" * 80)
-
     # Lazy import to avoid circular import
     from src.agents.question import AgentCoordinator
     from src.services.config import load_config_with_main
@@ -362,9 +316,26 @@ async def mimic_exam_questions(
     # Load config for parallel settings
     config = load_config_with_main("question_config.yaml", project_root)
     question_cfg = config.get("question", {})
+    # Questions in flight per session; the shared adaptive LLM limit can
+    # throttle the calls below this, never raise it
     max_parallel = question_cfg.get("max_parallel_questions", 3)
+    # Stream tokens to the client as question_partial events
+    stream_tokens = bool(ws_callback) and question_cfg.get("stream_tokens", True)
+    # Short text-only references can share one LLM request
+    batch_cfg = question_cfg.get("batch", {})
+    batcher = None
+    if batch_cfg.get("enabled", False) and batch_cfg.get("size", 5) > 1:
+        from src.agents.question.coordinator import GenerationBatcher
+
+        batcher = GenerationBatcher(
+            AgentCoordinator(max_rounds=10, kb_name=kb_name),
+            batch_size=batch_cfg.get("size", 5),
+            linger=batch_cfg.get("linger", 0.05),
+        )
+    batch_max_chars = batch_cfg.get("max_reference_chars", 400)
 
-    print(f"📊 Processing {len(reference_questions)} questions with max {max_parallel} parallel")
+    # Reference questions to generate from; grows while streaming extraction runs
+    reference_questions: list[dict[str, Any]] = []
 
     # Create semaphore for parallel control
     semaphore = asyncio.Semaphore(max_parallel)
@@ -373,7 +344,61 @@ async def mimic_exam_questions(
     completed_count = 0
     completed_lock = asyncio.Lock()
 
+    # Results are journaled as they finish so an interrupted run can resume
+    session_dir = Path(output_dir) if output_dir else latest_dir
+    journal = ResultJournal(session_dir)
+    try:
+        await asyncio.to_thread(journal.acquire)
+    except JournalBusy:
+        error_msg = f"Another generation run is already writing to {session_dir}"
+        await send_progress("error", {"content": error_msg})
+        return {"success": False, "error": error_msg}
+    # Held until the summary is written, or until this run ends early
+    asyncio.current_task().add_done_callback(lambda _: journal.release())
+    resumed_results: dict[str, dict[str, Any]] = {}
+    if resume:
+        resumed_results = await asyncio.to_thread(journal.load_completed)
+        print(f"♻️ Resuming: {len(resumed_results)} question(s) already generated")
+    else:
+        await asyncio.to_thread(journal.reset)
+
+    # Generation results fetched up front by the Batch API, keyed by index
+    offline_results: dict[int, dict[str, Any]] | None = None
+
     async def generate_single_mimic(ref_question: dict, index: int) -> dict:
+        """Generate (or replay from the journal) one mimic and journal the result."""
+        nonlocal completed_count
+
+        key = reference_key(ref_question)
+        resumed = resumed_results.get(key)
+        if resumed is not None:
+            async with completed_lock:
+                completed_count += 1
+                current_completed = completed_count
+
+            print(f"♻️ [mimic_{index}] Reusing journaled result")
+            await send_progress(
+                "result",
+                {
+                    "question_id": f"mimic_{index}",
+                    "index": index,
+                    "success": True,
+                    "question": resumed["generated_question"],
+                    "validation": resumed["validation"],
+                    "rounds": resumed["rounds"],
+                    "reference_question": resumed["reference_question_text"],
+                    "current": current_completed,
+                    "total": len(reference_questions),
+                    "resumed": True,
+                },
+            )
+            return resumed
+
+        result_data = await run_single_mimic(ref_question, index)
+        await asyncio.to_thread(journal.append, index, key, result_data)
+        return result_data
+
+    async def run_single_mimic(ref_question: dict, index: int) -> dict:
         """Generate a single mimic question with semaphore control."""
         nonlocal completed_count
 
@@ -399,10 +424,32 @@ async def mimic_exam_questions(
             # Create a fresh coordinator for each question
             coordinator = AgentCoordinator(max_rounds=10, kb_name=kb_name)
 
+            on_partial = None
+            if stream_tokens:
+
+                async def on_partial(text: str):
+                    await send_progress(
+                        "question_partial",
+                        {"question_id": question_id, "index": index, "text": text},
+                    )
+
+            use_batch = (
+                batcher is not None
+                and not ref_question.get("images")
+                and len(ref_question["question_text"]) <= batch_max_chars
+            )
+
             try:
-                result = await generate_question_from_reference(
-                    reference_question=ref_question, coordinator=coordinator, kb_name=kb_name
-                )
+                if offline_results is not None:
+                    result = offline_results[index]
+                else:
+                    result = await generate_question_from_reference(
+                        reference_question=ref_question,
+                        coordinator=coordinator,
+                        kb_name=kb_name,
+                        on_partial=None if use_batch else on_partial,
+                        batcher=batcher if use_batch else None,
+                    )
 
                 async with completed_lock:
                     completed_count += 1
@@ -489,9 +536,186 @@ async def mimic_exam_questions(
                     "error": f"Exception: {e!s}",
                 }
 
-    # Run all mimic generations in parallel
-    tasks = [generate_single_mimic(ref_q, i) for i, ref_q in enumerate(reference_questions, 1)]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    # Stage 2: Extract questions
+    await send_progress(
+        "progress",
+        {
+            "stage": "extracting",
+            "status": "running",
+            "message": "Extracting reference questions from exam...",
+        },
+    )
+
+    print("🔄 Step 3: extract reference questions")
+    print("-" * 80)
+
+    json_files = find_question_files(latest_dir)
+    generation_workers = None
+    generation_started = None
+
+    if json_files:
+        print(f"✓ Found existing question file: {json_files[0].name}")
+        with open(json_files[0], encoding="utf-8") as f:
+            questions_data = json.load(f)
+    elif streaming:
+        print("📄 No question file found, starting streaming extraction...")
+
+        # Extraction feeds a queue drained by the generation worker pool, so
+        # mimics start as soon as the first reference questions are known
+        generation_queue: asyncio.Queue = asyncio.Queue()
+        streamed_results: dict[int, Any] = {}
+
+        async def enqueue_questions(questions: list[dict[str, Any]]):
+            for question in questions:
+                if max_questions and len(reference_questions) >= max_questions:
+                    return
+                reference_questions.append(question)
+                await generation_queue.put((question, len(reference_questions)))
+
+            await send_progress(
+                "progress",
+                {
+                    "stage": "extracting",
+                    "status": "running",
+                    "message": f"Extracted {len(reference_questions)} reference questions so far",
+                    "total_questions": len(reference_questions),
+                },
+            )
+
+        async def generation_worker():
+            while True:
+                item = await generation_queue.get()
+                if item is None:
+                    return
+                ref_question, index = item
+                try:
+                    streamed_results[index] = await generate_single_mimic(ref_question, index)
+                except Exception as e:
+                    streamed_results[index] = e
+
+        generation_started = time.perf_counter()
+        generation_workers = [
+            asyncio.create_task(generation_worker()) for _ in range(max_parallel)
+        ]
+        # If this run is cancelled (e.g. a cancelled job), the pool would keep
+        # generating everything already queued: stop it with the run
+        asyncio.current_task().add_done_callback(
+            lambda _: [worker.cancel() for worker in generation_workers]
+        )
+        try:
+            success = await extract_questions_from_paper_async(
+                paper_dir=str(latest_dir), output_dir=None, on_questions=enqueue_questions
+            )
+        finally:
+            for _ in generation_workers:
+                generation_queue.put_nowait(None)
+
+        if not success:
+            # Some chunks may have streamed questions already: stop their mimics too
+            for worker in generation_workers:
+                worker.cancel()
+            await asyncio.gather(*generation_workers, return_exceptions=True)
+            await send_progress("error", {"content": "Question extraction failed"})
+            return {"success": False, "error": "Question extraction failed"}
+    else:
+        print("📄 No question file found, starting extraction...")
+        success = await extract_questions_from_paper_async(
+            paper_dir=str(latest_dir), output_dir=None
+        )
+
+        if not success:
+            await send_progress("error", {"content": "Question extraction failed"})
+            return {"success": False, "error": "Question extraction failed"}
+
+        json_files = find_question_files(latest_dir)
+        if not json_files:
+            await send_progress(
+                "error", {"content": "Question JSON file not found after extraction"}
+            )
+            return {"success": False, "error": "Question JSON file not found after extraction"}
+
+        with open(json_files[0], encoding="utf-8") as f:
+            questions_data = json.load(f)
+
+    if generation_workers is None:
+        reference_questions.extend(questions_data.get("questions", []))
+
+        if max_questions:
+            del reference_questions[max_questions:]
+
+    print(f"✓ Loaded {len(reference_questions)} reference questions")
+    print()
+
+    # Send reference questions info
+    await send_progress(
+        "progress",
+        {
+            "stage": "extracting",
+            "status": "complete",
+            "message": f"Extracted {len(reference_questions)} reference questions",
+            "total_questions": len(reference_questions),
+            "reference_questions": [
+                {
+                    "number": q.get("question_number", str(i + 1)),
+                    "preview": (
+                        q["question_text"][:100] + "..."
+                        if len(q["question_text"]) > 100
+                        else q["question_text"]
+                    ),
+                }
+                for i, q in enumerate(reference_questions)
+            ],
+        },
+    )
+
+    # Stage 3: Generate mimic questions
+    await send_progress(
+        "progress",
+        {
+            "stage": "generating",
+            "status": "running",
+            "message": "Generating mimic questions...",
+            "current": completed_count,
+            "total": len(reference_questions),
+        },
+    )
+
+    print("🔄 Step 4: generate new questions from references (parallel)")
+    print("-" * 80)
+    print(f"📊 Processing {len(reference_questions)} questions with max {max_parallel} parallel")
+
+    if generation_started is None:
+        generation_started = time.perf_counter()
+
+    if generation_workers is not None:
+        # Streaming mode: generation is already running, wait for the pool to drain
+        await asyncio.gather(*generation_workers)
+        results = [streamed_results[i] for i in sorted(streamed_results)]
+    else:
+        if batch_api:
+            from src.agents.question.tools.batch_mimic import generate_mimics_with_batch_api
+
+            # Journaled results are replayed; everything else goes into one batch
+            with stage_timer("batch_api"):
+                offline_results = await generate_mimics_with_batch_api(
+                    [
+                        (i, ref_q)
+                        for i, ref_q in enumerate(reference_questions, 1)
+                        if reference_key(ref_q) not in resumed_results
+                    ],
+                    kb_name,
+                    session_dir,
+                    resume=resume,
+                    send_progress=send_progress,
+                )
+
+        # Run all mimic generations in parallel
+        tasks = [
+            generate_single_mimic(ref_q, i) for i, ref_q in enumerate(reference_questions, 1)
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    observe_stage("generate", time.perf_counter() - generation_started)
 
     # Separate successes and failures
     generated_questions = []
@@ -522,20 +746,57 @@ async def mimic_exam_questions(
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_file = output_dir / f"{latest_dir.name}_{timestamp}_generated_questions.json"
 
-    output_data = {
+    header = {
         "reference_paper": latest_dir.name,
         "kb_name": kb_name,
         "total_reference_questions": len(reference_questions),
-        "successful_generations": len(generated_questions),
-        "failed_generations": len(failed_questions),
-        "generated_questions": generated_questions,
-        "failed_questions": failed_questions,
     }
-
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2)
+    reference_keys = [reference_key(q) for q in reference_questions]
+
+    def write_output():
+        previous = journal.previous_summary() if resume else None
+        if previous is not None:
+            # The resumed summary supersedes the one written from this journal
+            for old_file in (previous, *question_index_paths(previous)):
+                old_file.unlink(missing_ok=True)
+        # Stream the summary file from the journal instead of in-memory results
+        counts = journal.write_summary(output_file, header, reference_keys)
+        # Per-question layout for /api/history/{id}/questions/{n}
+        write_question_index(
+            output_file, (r for r in journal.iter_results(reference_keys) if r.get("success"))
+        )
+        return counts
+
+    with stage_timer("save"):
+        try:
+            counts = await asyncio.to_thread(write_output)
+        finally:
+            journal.release()
+    await asyncio.to_thread(
+        record_session,
+        output_dir,
+        output_file,
+        {
+            **header,
+            "successful_generations": counts["successful"],
+            "failed_generations": counts["failed"],
+        },
+        datetime.now().timestamp(),
+    )
 
     print(f"\n💾 Results saved to: {output_file}")
+
+    timings = current_session_stats.get().snapshot()
+    print(
+        f"⏱️ Total {timings['total_seconds']:.1f}s | "
+        + " | ".join(f"{stage} {t['seconds']:.1f}s" for stage, t in timings["stages"].items())
+    )
+    if timings["tokens"]:
+        print(
+            f"🔢 {timings['llm_calls']} LLM call(s), "
+            f"{timings['tokens'].get('prompt_tokens', 0)} prompt + "
+            f"{timings['tokens'].get('completion_tokens', 0)} completion tokens"
+        )
     print()
 
     # Send summary
@@ -546,6 +807,7 @@ async def mimic_exam_questions(
             "successful": len(generated_questions),
             "failed": len(failed_questions),
             "output_file": str(output_file),
+            "timings": timings,
         },
     )
 
@@ -555,6 +817,7 @@ async def mimic_exam_questions(
         "total_reference_questions": len(reference_questions),
         "generated_questions": generated_questions,
         "failed_questions": failed_questions,
+        "timings": timings,
     }
 
 
@@ -572,6 +835,7 @@ Examples:
   python exam_mimic.py --paper reference_papers/2211asm1 --kb math2211
   python exam_mimic.py --paper 2211asm1 --kb math2211 --max-questions 3
   python exam_mimic.py --paper 2211asm1 --kb math2211 -o ./output
+  python exam_mimic.py --paper 2211asm1 --kb math2211 --batch-api
         """,
     )
 
@@ -610,6 +874,24 @@ Examples:
         help="Use fast parser (PyMuPDF) instead of MinerU",
     )
 
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Start generating mimics while question extraction is still running",
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip reference questions already generated in the output directory's journal",
+    )
+
+    parser.add_argument(
+        "--batch-api",
+        action="store_true",
+        help="Generate offline through the provider's Batch API (cheaper, not interactive)",
+    )
+
     args = parser.parse_args()
 
     # Execute the workflow
@@ -620,8 +902,15 @@ Examples:
         output_dir=args.output,
         max_questions=args.max_questions,
         fast_mode=args.fast,
+        streaming=args.stream,
+        resume=args.resume,
+        batch_api=args.batch_api,
     )
 
+    from src.services.llm import close_llm_clients
+
+    await close_llm_clients()
+
     if result["success"]:
         print("✓ Completed!")
         sys.exit(0)
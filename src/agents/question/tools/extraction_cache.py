@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Persistent cache for LLM question extraction
+
+Extraction results are stored in a SQLite file keyed on the markdown content
+hash, the available image list, the model name and a hash of the extraction
+system prompt. Identical papers in new batch directories or later sessions
+reuse the stored questions instead of making another LLM call.
+"""
+
+from contextlib import closing
+import hashlib
+import json
+from pathlib import Path
+import sqlite3
+import sys
+import time
+from typing import Any
+
+project_root = Path(__file__).parent.parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.config import load_config_with_main
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS extractions (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    questions TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL
+)
+"""
+
+
+def get_extraction_cache_settings() -> dict:
+    """Get extraction cache settings from config/main.yaml"""
+    config = load_config_with_main("question_config.yaml", project_root)
+    cache_cfg = config.get("cache", {}).get("extraction", {})
+
+    db_path = Path(cache_cfg.get("path", "data/cache/extraction.sqlite3"))
+    if not db_path.is_absolute():
+        db_path = project_root / db_path
+
+    return {
+        "enabled": cache_cfg.get("enabled", True),
+        "path": db_path,
+        "max_entries": cache_cfg.get("max_entries", 1000),
+    }
+
+
+def make_extraction_key(
+    markdown_content: str, image_list: list[str], model: str, system_prompt: str
+) -> str:
+    """Build the cache key for one extraction request"""
+    parts = [
+        hashlib.sha256(markdown_content.encode("utf-8")).hexdigest(),
+        json.dumps(sorted(image_list), ensure_ascii=False),
+        model,
+        hashlib.sha256(system_prompt.encode("utf-8")).hexdigest(),
+    ]
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    """SQLite-backed LRU store of extracted question lists"""
+
+    def __init__(self, db_path: Path, max_entries: int = 1000):
+        self.db_path = Path(db_path)
+        self.max_entries = max_entries
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def get(self, key: str) -> list[dict[str, Any]] | None:
+        """Return cached questions for a key, or None on a miss"""
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT questions FROM extractions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE extractions SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+
+        try:
+            return json.loads(row[0])
+        except ValueError:
+            return None
+
+    def put(self, key: str, model: str, questions: list[dict[str, Any]]):
+        """Store questions for a key and evict least recently used rows"""
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO extractions (key, model, questions, created, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, json.dumps(questions, ensure_ascii=False), now, now),
+            )
+            conn.execute(
+                "DELETE FROM extractions WHERE key NOT IN "
+                "(SELECT key FROM extractions ORDER BY last_access DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+
+
+def get_extraction_cache() -> ExtractionCache | None:
+    """Get the configured extraction cache, or None when disabled"""
+    settings = get_extraction_cache_settings()
+    if not settings["enabled"]:
+        return None
+    try:
+        return ExtractionCache(settings["path"], max_entries=settings["max_entries"])
+    except sqlite3.Error as e:
+        print(f"⚠️ Extraction cache unavailable: {e}")
+        return None
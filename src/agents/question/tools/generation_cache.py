@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Optional cache for generated mimic questions
+
+Generations are stored in a SQLite file keyed on the normalized reference
+text, knowledge base, model, temperature and a hash of the prompt template.
+The cache policy decides how stored generations are used:
+
+- ``off``: never read or write the cache
+- ``reuse``: return any stored generation for the key
+- ``reuse-if-valid``: return a stored generation only if it passes validation
+- ``n-variants``: generate until ``variants`` results are stored for the key,
+  then rotate through them (least recently served first)
+
+Entries expire after ``ttl_hours`` and the least recently used ones are
+evicted once the stored results exceed ``max_size_mb``.
+"""
+
+from contextlib import closing
+import hashlib
+import json
+from pathlib import Path
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from typing import Any
+
+project_root = Path(__file__).parent.parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.config import load_config_with_main
+
+CACHE_POLICIES = ("off", "reuse", "reuse-if-valid", "n-variants")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    key TEXT NOT NULL,
+    variant INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (key, variant)
+)
+"""
+
+
+def get_generation_cache_settings() -> dict:
+    """Get generation cache settings from config/main.yaml"""
+    config = load_config_with_main("question_config.yaml", project_root)
+    cache_cfg = config.get("cache", {}).get("generation", {})
+
+    db_path = Path(cache_cfg.get("path", "data/cache/generation.sqlite3"))
+    if not db_path.is_absolute():
+        db_path = project_root / db_path
+
+    policy = str(cache_cfg.get("policy", "off"))
+    if policy not in CACHE_POLICIES:
+        print(f"⚠️ Unknown generation cache policy '{policy}', using 'off'")
+        policy = "off"
+
+    return {
+        "policy": policy,
+        "path": db_path,
+        "ttl_hours": cache_cfg.get("ttl_hours", 168),
+        "max_size_mb": cache_cfg.get("max_size_mb", 256),
+        "variants": max(1, int(cache_cfg.get("variants", 3))),
+        "min_relevance": cache_cfg.get("min_relevance", 0.7),
+    }
+
+
+def normalize_reference_text(text: str) -> str:
+    """Normalize a reference question so formatting differences share a key"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def make_generation_key(
+    reference_text: str, kb_name: str, model: str, temperature: float, prompt_template: str
+) -> str:
+    """Build the cache key for one generation request"""
+    parts = [
+        normalize_reference_text(reference_text),
+        kb_name or "",
+        model,
+        repr(float(temperature)),
+        hashlib.sha256(prompt_template.encode("utf-8")).hexdigest(),
+    ]
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def is_valid_generation(result: dict[str, Any], min_relevance: float = 0.7) -> bool:
+    """Check that a stored generation is complete and rated relevant enough"""
+    question = result.get("question") or {}
+    if not isinstance(question, dict) or not question.get("question") or not question.get("answer"):
+        return False
+
+    relevance = (result.get("validation") or {}).get("relevance")
+    if relevance is None:
+        return True
+    try:
+        return float(relevance) >= min_relevance
+    except (TypeError, ValueError):
+        return False
+
+
+class GenerationCache:
+    """SQLite-backed store of generated questions with TTL and size eviction"""
+
+    def __init__(
+        self,
+        db_path: Path,
+        policy: str = "reuse",
+        ttl_hours: float = 168,
+        max_size_mb: float = 256,
+        variants: int = 3,
+        min_relevance: float = 0.7,
+    ):
+        self.db_path = Path(db_path)
+        self.policy = policy
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.variants = variants if policy == "n-variants" else 1
+        self.min_relevance = min_relevance
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10)
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return a stored generation for a key, or None if one should be generated"""
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            rows = conn.execute(
+                "SELECT variant, result FROM generations WHERE key = ? AND created >= ? "
+                "ORDER BY last_access ASC",
+                (key, now - self.ttl_seconds),
+            ).fetchall()
+
+            # n-variants keeps generating until the pool for this key is full
+            if len(rows) < self.variants:
+                return None
+
+            for variant, raw in rows:
+                try:
+                    result = json.loads(raw)
+                except ValueError:
+                    continue
+                if self.policy == "reuse-if-valid" and not is_valid_generation(
+                    result, self.min_relevance
+                ):
+                    continue
+                conn.execute(
+                    "UPDATE generations SET last_access = ? WHERE key = ? AND variant = ?",
+                    (now, key, variant),
+                )
+                return result
+        return None
+
+    def put(self, key: str, result: dict[str, Any]):
+        """Store a generation and evict expired or least recently used rows"""
+        now = time.time()
+        raw = json.dumps(result, ensure_ascii=False)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "DELETE FROM generations WHERE key = ? AND created < ?",
+                (key, now - self.ttl_seconds),
+            )
+            count = conn.execute(
+                "SELECT COUNT(*), COALESCE(MAX(variant), -1) FROM generations WHERE key = ?",
+                (key,),
+            ).fetchone()
+            # A full pool is refreshed by replacing its least recently used variant
+            if count[0] >= self.variants:
+                variant = conn.execute(
+                    "SELECT variant FROM generations WHERE key = ? ORDER BY last_access ASC LIMIT 1",
+                    (key,),
+                ).fetchone()[0]
+            else:
+                variant = count[1] + 1
+
+            conn.execute(
+                "INSERT OR REPLACE INTO generations (key, variant, result, size, created, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, variant, raw, len(raw.encode("utf-8")), now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        conn.execute("DELETE FROM generations WHERE created < ?", (now - self.ttl_seconds,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM generations").fetchone()[0]
+        if total <= self.max_size_bytes:
+            return
+
+        for key, variant, size in conn.execute(
+            "SELECT key, variant, size FROM generations ORDER BY last_access ASC"
+        ).fetchall():
+            conn.execute(
+                "DELETE FROM generations WHERE key = ? AND variant = ?", (key, variant)
+            )
+            total -= size
+            if total <= self.max_size_bytes:
+                break
+
+
+_caches: dict[tuple, GenerationCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_generation_cache() -> GenerationCache | None:
+    """
+    Get the configured generation cache, or None when the policy is off
+
+    The cache is built once per process for each configuration, so its
+    table is created once rather than for every question.
+    """
+    settings = get_generation_cache_settings()
+    if settings["policy"] == "off":
+        return None
+
+    cache_id = tuple(settings.values())
+    with _caches_lock:
+        cache = _caches.get(cache_id)
+        if cache is not None:
+            return cache
+        try:
+            cache = GenerationCache(
+                settings["path"],
+                policy=settings["policy"],
+                ttl_hours=settings["ttl_hours"],
+                max_size_mb=settings["max_size_mb"],
+                variants=settings["variants"],
+                min_relevance=settings["min_relevance"],
+            )
+        except sqlite3.Error as e:
+            print(f"⚠️ Generation cache unavailable: {e}")
+            return None
+        _caches[cache_id] = cache
+    return cache
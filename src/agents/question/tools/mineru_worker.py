@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Persistent MinerU parser worker
+
+A long-lived child process imports MinerU once and keeps its layout/OCR
+models loaded between jobs, so only the first PDF pays the model loading
+cost. Jobs are sent over a multiprocessing queue and produce the same
+``<temp_output>/<pdf_name>/auto/`` layout as the MinerU CLI, which lets
+pdf_parser reuse its normal output collection.
+"""
+
+import asyncio
+import importlib.util
+import itertools
+import multiprocessing
+from pathlib import Path
+import queue
+import sys
+import threading
+from typing import Any
+
+project_root = Path(__file__).parent.parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.config import load_config_with_main
+
+
+class MinerUWorkerUnavailable(RuntimeError):
+    """The MinerU Python API cannot be used by the worker"""
+
+
+def _load_mineru_backend():
+    """Import the installed MinerU Python API (magic-pdf 1.x or mineru 2.x)"""
+    try:
+        from magic_pdf.config.enums import SupportedPdfParseMethod
+        from magic_pdf.data.data_reader_writer import FileBasedDataWriter
+        from magic_pdf.data.dataset import PymuDocDataset
+        from magic_pdf.model.doc_analyze_by_custom_model import doc_analyze
+
+        def parse(pdf_bytes: bytes, pdf_name: str, output_dir: Path):
+            auto_dir = output_dir / pdf_name / "auto"
+            image_dir = auto_dir / "images"
+            image_dir.mkdir(parents=True, exist_ok=True)
+            image_writer = FileBasedDataWriter(str(image_dir))
+            md_writer = FileBasedDataWriter(str(auto_dir))
+
+            dataset = PymuDocDataset(pdf_bytes)
+            if dataset.classify() == SupportedPdfParseMethod.OCR:
+                pipe_result = dataset.apply(doc_analyze, ocr=True).pipe_ocr_mode(image_writer)
+            else:
+                pipe_result = dataset.apply(doc_analyze, ocr=False).pipe_txt_mode(image_writer)
+
+            pipe_result.dump_md(md_writer, f"{pdf_name}.md", "images")
+            pipe_result.dump_content_list(md_writer, f"{pdf_name}_content_list.json", "images")
+
+        return parse
+    except ImportError:
+        pass
+
+    try:
+        from mineru.cli.common import do_parse
+
+        def parse(pdf_bytes: bytes, pdf_name: str, output_dir: Path):
+            do_parse(str(output_dir), [pdf_name], [pdf_bytes], ["ch"])
+
+        return parse
+    except ImportError:
+        return None
+
+
+def _worker_main(job_queue, result_queue, current_job, load_backend=_load_mineru_backend):
+    """Child process loop: load MinerU once, then serve parse jobs until None"""
+    parse = load_backend()
+
+    while True:
+        job = job_queue.get()
+        if job is None:
+            break
+
+        job_id, pdf_path, temp_output = job
+        if parse is None:
+            result_queue.put((job_id, False, "unavailable: MinerU Python API not importable"))
+            continue
+
+        # Lets the parent start the job timeout now rather than at enqueue time.
+        # current_job is shared memory, so it survives a crash that loses queued messages
+        current_job.value = job_id
+        result_queue.put((job_id, None, ""))
+        try:
+            pdf_path = Path(pdf_path)
+            parse(pdf_path.read_bytes(), pdf_path.stem, Path(temp_output))
+            result_queue.put((job_id, True, ""))
+        except Exception as e:
+            result_queue.put((job_id, False, f"{type(e).__name__}: {e}"))
+
+
+class _PendingJob:
+    """Futures for one job: dequeued by the worker, and finished"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.started = loop.create_future()
+        self.done = loop.create_future()
+
+    def start(self):
+        self._call(_set_future_result, self.started, True)
+
+    def finish(self, ok: bool, error: str):
+        self._call(self._finish, (ok, error))
+
+    def _finish(self, result: tuple[bool, str]):
+        # A job that never started resolves "started" as False, so callers can retry it
+        _set_future_result(self.done, result)
+        _set_future_result(self.started, False)
+
+    def _call(self, callback, *args):
+        try:
+            self.loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            # The caller's event loop is gone; nobody is waiting for this job
+            pass
+
+
+class _WorkerProcess:
+    """
+    One worker process with its own queues, reader thread and pending jobs
+
+    Jobs are tracked per process, so a process that exits (or is stopped
+    after a timeout) only fails the jobs that were sent to it, never those
+    of the process that replaced it.
+    """
+
+    def __init__(self, ctx, generation: int, load_backend):
+        self.generation = generation
+        self.job_queue = ctx.Queue()
+        self.result_queue = ctx.Queue()
+        self.current_job = ctx.Value("q", 0, lock=False)
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(self.job_queue, self.result_queue, self.current_job, load_backend),
+            name=f"mineru-worker-{generation}",
+            daemon=True,
+        )
+        self.pending: dict[int, _PendingJob] = {}
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        self.process.start()
+        threading.Thread(
+            target=self._read_results,
+            name=f"mineru-worker-results-{self.generation}",
+            daemon=True,
+        ).start()
+
+    def is_alive(self) -> bool:
+        return not self.closed and self.process.is_alive()
+
+    def submit(self, job_id: int, job: _PendingJob, pdf_path: str, temp_output: str) -> bool:
+        """Send a job to this process; False if it has already gone away"""
+        with self._lock:
+            if self.closed:
+                return False
+            self.pending[job_id] = job
+        self.job_queue.put((job_id, pdf_path, temp_output))
+        return True
+
+    def discard(self, job_id: int):
+        with self._lock:
+            self.pending.pop(job_id, None)
+
+    def _read_results(self):
+        """Resolve job futures as results arrive from this process"""
+        while True:
+            try:
+                job_id, ok, error = self.result_queue.get(timeout=1.0)
+            except queue.Empty:
+                if not self.process.is_alive():
+                    self.fail_pending("MinerU worker process exited")
+                    return
+                continue
+            except (EOFError, OSError):
+                self.fail_pending("MinerU worker process exited")
+                return
+
+            with self._lock:
+                job = self.pending.get(job_id) if ok is None else self.pending.pop(job_id, None)
+            if job is None:
+                continue
+            if ok is None:
+                job.start()
+            else:
+                job.finish(ok, error)
+
+    def fail_pending(self, reason: str):
+        """Fail every job of this process and refuse new ones"""
+        with self._lock:
+            self.closed = True
+            pending, self.pending = self.pending, {}
+        running = self.current_job.value
+        for job_id, job in pending.items():
+            if job_id == running:
+                job.start()
+            job.finish(False, reason)
+
+    def stop(self):
+        with self._lock:
+            self.closed = True
+        try:
+            self.job_queue.put_nowait(None)
+        except Exception:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+        self.fail_pending("MinerU worker stopped")
+
+
+class MinerUWorker:
+    """Parent-side handle for the persistent MinerU worker process"""
+
+    # Times a job that never reached a worker (it died or was restarted) is resent
+    max_submit_attempts = 3
+
+    def __init__(self, job_timeout: float = 1800.0, load_backend=_load_mineru_backend):
+        self.job_timeout = job_timeout
+        self._ctx = multiprocessing.get_context("spawn")
+        self._load_backend = load_backend
+        self._current: _WorkerProcess | None = None
+        self._generations = itertools.count(1)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> _WorkerProcess:
+        with self._lock:
+            if self._current is not None and self._current.is_alive():
+                return self._current
+
+            worker = _WorkerProcess(self._ctx, next(self._generations), self._load_backend)
+            worker.start()
+            self._current = worker
+            print(f"🔥 Started persistent MinerU worker (pid {worker.process.pid})")
+            return worker
+
+    def _retire(self, worker: _WorkerProcess):
+        """Stop one worker process; the next job starts a fresh one"""
+        with self._lock:
+            if self._current is worker:
+                self._current = None
+        worker.stop()
+
+    async def parse(self, pdf_path: str, temp_output: str) -> tuple[bool, str]:
+        """
+        Parse a PDF into temp_output with the warm worker
+
+        The timeout covers the parse itself, not the time the job waits
+        behind other jobs in the queue.
+
+        Returns:
+            (success, error message)
+
+        Raises:
+            MinerUWorkerUnavailable: the worker cannot import MinerU
+        """
+        loop = asyncio.get_running_loop()
+        job_id = next(self._ids)
+
+        for _ in range(self.max_submit_attempts):
+            worker = await asyncio.to_thread(self._ensure_started)
+            job = _PendingJob(loop)
+            if not worker.submit(job_id, job, pdf_path, temp_output):
+                continue
+            try:
+                started = await job.started
+            except asyncio.CancelledError:
+                worker.discard(job_id)
+                raise
+            if started or job.done.result()[1].startswith("unavailable:"):
+                break
+        else:
+            return False, "MinerU worker process exited before running the job"
+
+        try:
+            ok, error = await asyncio.wait_for(job.done, timeout=self.job_timeout)
+        except asyncio.TimeoutError:
+            worker.discard(job_id)
+            # A stuck job blocks the queue; restart the worker on next use
+            await asyncio.to_thread(self._retire, worker)
+            return False, f"MinerU worker timed out after {self.job_timeout:.0f}s"
+
+        if not ok and error.startswith("unavailable:"):
+            raise MinerUWorkerUnavailable(error)
+        return ok, error
+
+    def stop(self):
+        """Stop the worker process"""
+        with self._lock:
+            worker, self._current = self._current, None
+
+        if worker is not None:
+            worker.stop()
+
+
+def _set_future_result(future: asyncio.Future, result: Any):
+    if not future.done():
+        future.set_result(result)
+
+
+_worker: MinerUWorker | None = None
+_worker_disabled = False
+
+
+def get_mineru_worker() -> MinerUWorker | None:
+    """Get the shared MinerU worker, or None if disabled or MinerU is not installed"""
+    global _worker
+
+    if _worker is not None or _worker_disabled:
+        return _worker
+
+    config = load_config_with_main("question_config.yaml", project_root)
+    parsing_cfg = config.get("parsing", {})
+    if not parsing_cfg.get("mineru_worker", True):
+        return None
+    if importlib.util.find_spec("magic_pdf") is None and importlib.util.find_spec("mineru") is None:
+        return None
+
+    _worker = MinerUWorker(job_timeout=parsing_cfg.get("mineru_job_timeout", 1800))
+    return _worker
+
+
+def disable_mineru_worker():
+    """Stop the shared worker and fall back to the CLI for this process"""
+    global _worker, _worker_disabled
+
+    _worker_disabled = True
+    if _worker is not None:
+        _worker.stop()
+    _worker = None
+
+
+def shutdown_mineru_worker():
+    """Stop the shared MinerU worker (application shutdown)"""
+    global _worker
+
+    if _worker is not None:
+        _worker.stop()
+        _worker = None
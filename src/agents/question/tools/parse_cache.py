@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Content-addressed cache for parsed PDF output
+
+Entries are keyed on the SHA-256 of the PDF bytes plus the parser mode and
+parser version, and hold a copy of the parsed ``<pdf_name>/`` tree (the
+``auto/`` folder with markdown, content_list and images). A hit is restored
+into the requested output directory with hardlinks, so re-uploading the same
+paper skips MinerU/PyMuPDF entirely.
+
+Eviction is LRU (by last access time) with an entry count and total size cap.
+"""
+
+import hashlib
+from importlib import metadata
+import json
+import os
+from pathlib import Path
+import shutil
+import sys
+import time
+import uuid
+
+project_root = Path(__file__).parent.parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.config import load_config_with_main
+
+# Bump when the layout of cached entries changes
+PARSE_CACHE_VERSION = 1
+
+_PARSER_PACKAGES = {
+    "mineru": ["magic-pdf", "mineru"],
+    "pymupdf": ["PyMuPDF", "pymupdf"],
+}
+
+META_FILE = "meta.json"
+TREE_DIR = "tree"
+
+
+def get_parse_cache_settings() -> dict:
+    """Get parse cache settings from config/main.yaml"""
+    config = load_config_with_main("question_config.yaml", project_root)
+    cache_cfg = config.get("cache", {}).get("parse", {})
+
+    cache_dir = Path(cache_cfg.get("dir", "data/cache/parsed"))
+    if not cache_dir.is_absolute():
+        cache_dir = project_root / cache_dir
+
+    return {
+        "enabled": cache_cfg.get("enabled", True),
+        "dir": cache_dir,
+        "max_entries": cache_cfg.get("max_entries", 200),
+        "max_size_mb": cache_cfg.get("max_size_mb", 2048),
+    }
+
+
+def hash_pdf(pdf_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Compute the SHA-256 of a PDF file without loading it whole"""
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_parser_version(mode: str) -> str:
+    """Get the installed version of the parser backing a mode"""
+    for package in _PARSER_PACKAGES.get(mode, []):
+        try:
+            return metadata.version(package)
+        except metadata.PackageNotFoundError:
+            continue
+    return "unknown"
+
+
+def make_cache_key(pdf_hash: str, mode: str, parser_version: str | None = None) -> str:
+    """Build the cache key for a PDF hash, parser mode and version"""
+    if parser_version is None:
+        parser_version = get_parser_version(mode)
+    raw = f"v{PARSE_CACHE_VERSION}|{pdf_hash}|{mode}|{parser_version}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _link_tree(src: Path, dst: Path):
+    """Recreate a directory tree using hardlinks (copy across devices)"""
+
+    def link_or_copy(s, d):
+        try:
+            os.link(s, d)
+        except OSError:
+            shutil.copy2(s, d)
+
+    shutil.copytree(src, dst, copy_function=link_or_copy)
+
+
+def _tree_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+class ParseCache:
+    """On-disk LRU cache of parsed PDF trees"""
+
+    def __init__(self, cache_dir: Path, max_entries: int = 200, max_size_mb: int = 2048):
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    def lookup(self, key: str) -> Path | None:
+        """Return the cached tree for a key and mark it as recently used"""
+        entry = self._entry_dir(key)
+        tree = entry / TREE_DIR
+        meta = entry / META_FILE
+        if not tree.is_dir() or not meta.exists():
+            return None
+
+        try:
+            os.utime(meta)
+        except OSError:
+            pass
+        return tree
+
+    def restore(self, key: str, output_dir: Path) -> bool:
+        """Materialize a cached tree at output_dir; returns False on a miss"""
+        tree = self.lookup(key)
+        if tree is None:
+            return False
+
+        try:
+            _link_tree(tree, output_dir)
+            # copytree keeps the cache entry's old mtime; the restored
+            # paper is the newest parse in its output directory
+            os.utime(output_dir)
+        except OSError as e:
+            print(f"⚠️ Parse cache restore failed: {e}")
+            shutil.rmtree(output_dir, ignore_errors=True)
+            return False
+        return True
+
+    def store(self, key: str, source_dir: Path, info: dict | None = None) -> bool:
+        """Add a parsed tree to the cache and evict old entries if needed"""
+        entry = self._entry_dir(key)
+        if entry.exists():
+            return True
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_entry = self.cache_dir / f".tmp_{uuid.uuid4().hex}"
+
+        try:
+            _link_tree(source_dir, tmp_entry / TREE_DIR)
+            meta = {
+                "key": key,
+                "created": time.time(),
+                "size_bytes": _tree_size(tmp_entry / TREE_DIR),
+                **(info or {}),
+            }
+            with open(tmp_entry / META_FILE, "w", encoding="utf-8") as f:
+                json.dump(meta, f, ensure_ascii=False, indent=2)
+
+            # Atomic publish; another process may have stored the same key
+            os.replace(tmp_entry, entry)
+        except OSError as e:
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            if not entry.exists():
+                print(f"⚠️ Parse cache store failed: {e}")
+                return False
+            return True
+
+        self.evict()
+        return True
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        """List (last_access, size, path) for every complete entry"""
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+
+        for entry in self.cache_dir.iterdir():
+            meta_file = entry / META_FILE
+            if entry.name.startswith(".") or not meta_file.exists():
+                continue
+            try:
+                with open(meta_file, encoding="utf-8") as f:
+                    size = json.load(f).get("size_bytes", 0)
+                entries.append((meta_file.stat().st_mtime, size, entry))
+            except (OSError, ValueError):
+                continue
+        return entries
+
+    def evict(self):
+        """Drop least recently used entries beyond the count and size caps"""
+        entries = sorted(self._entries(), key=lambda e: e[0])
+        total_size = sum(size for _, size, _ in entries)
+
+        while entries and (
+            len(entries) > self.max_entries or total_size > self.max_size_bytes
+        ):
+            _, size, path = entries.pop(0)
+            shutil.rmtree(path, ignore_errors=True)
+            total_size -= size
+
+
+def get_parse_cache() -> ParseCache | None:
+    """Get the configured parse cache, or None when disabled"""
+    settings = get_parse_cache_settings()
+    if not settings["enabled"]:
+        return None
+    return ParseCache(
+        settings["dir"],
+        max_entries=settings["max_entries"],
+        max_size_mb=settings["max_size_mb"],
+    )
@@ -5,15 +5,47 @@ Parse PDF files using MinerU and save results to reference_papers directory
 """
 
 import argparse
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+import multiprocessing
+import os
 from pathlib import Path
 import shutil
 import subprocess
 import sys
 
+project_root = Path(__file__).parent.parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.agents.question.tools.mineru_worker import (
+    MinerUWorkerUnavailable,
+    disable_mineru_worker,
+    get_mineru_worker,
+)
+from src.agents.question.tools.parse_cache import get_parse_cache, hash_pdf, make_cache_key
+from src.services.config import load_config_with_main
+from src.services.metrics import record_cache, stage_timer
+
+# Shared process pool for PyMuPDF parsing (created on first use)
+_parser_pool = None
+
+
+# MinerU command detected by check_mineru_installed (remembered for the process)
+_mineru_cmd = None
+
 
 def check_mineru_installed():
-    """Check if MinerU is installed"""
+    """Check if MinerU is installed (the detected command is cached)"""
+    global _mineru_cmd
+
+    if _mineru_cmd is None:
+        _mineru_cmd = _detect_mineru_command()
+    return _mineru_cmd
+
+
+def _detect_mineru_command():
+    """Locate the MinerU CLI"""
     # 1. Check global command
     try:
         result = subprocess.run(
@@ -57,121 +89,331 @@ def check_mineru_installed():
     return None
 
 
-def _parse_pdf_with_mineru(pdf_path: str, output_base_dir: str = None):
+def _backup_existing_output(output_dir: Path):
+    """Move an existing parse output directory out of the way"""
+    if output_dir.exists():
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        backup_dir = output_dir.parent / f"{output_dir.name}_backup_{timestamp}"
+        print(f"⚠️ Directory already exists, backing up to: {backup_dir.name}")
+        shutil.move(str(output_dir), str(backup_dir))
+
+
+def _check_parse_cache(
+    mode: str, pdf_path: Path, output_base_dir: Path, pdf_sha256: str | None = None
+):
     """
-    Internal: Parse PDF file using MinerU
+    Look up a PDF in the content-addressed parse cache
+
+    On a hit the cached tree is hardlinked to output_base_dir/<pdf_name> and
+    (True, None) is returned. On a miss, returns (False, store) where
+    store(produced_by) adds the freshly parsed tree to the cache under the
+    key of the parser that actually produced it (store is None if caching
+    is off). pdf_sha256 skips re-hashing when the digest is already known
+    (e.g. from upload).
     """
-    mineru_cmd = check_mineru_installed()
-    if not mineru_cmd:
-        print("✗ Error: MinerU installation not detected")
-        print("Please install MinerU first:")
-        print("  pip install magic-pdf[full]")
-        print("or")
-        print("  pip install mineru")
-        print("or visit: https://github.com/opendatalab/MinerU")
-        return False
+    cache = get_parse_cache()
+    if cache is None or not pdf_path.is_file():
+        return False, None
+
+    pdf_hash = pdf_sha256 or hash_pdf(pdf_path)
+    key = make_cache_key(pdf_hash, mode)
+    output_dir = output_base_dir / pdf_path.stem
+
+    if cache.lookup(key) is not None:
+        _backup_existing_output(output_dir)
+        output_base_dir.mkdir(parents=True, exist_ok=True)
+        if cache.restore(key, output_dir):
+            record_cache("parse", True)
+            print(f"⚡ Parse cache hit ({mode}), reusing cached output")
+            print(f"📦 Files saved to: {output_dir}")
+            return True, None
+    record_cache("parse", False)
+
+    # Never parse into a tree that may share inodes with a cache entry
+    _backup_existing_output(output_dir)
+
+    def store(produced_by: str = mode):
+        if output_dir.is_dir():
+            store_key = key if produced_by == mode else make_cache_key(pdf_hash, produced_by)
+            cache.store(store_key, output_dir, {"mode": produced_by, "pdf_name": pdf_path.name})
+
+    return False, store
 
-    print(f"✓ Detected MinerU command: {mineru_cmd}")
 
+def _parse_with_cache(
+    mode: str, pdf_path: Path, output_base_dir: Path, parse_fn, fallback_fn=None
+) -> Path | None:
+    """
+    Run a parser behind the content-addressed parse cache
+
+    If parse_fn fails, fallback_fn (PyMuPDF) is tried and its output is
+    cached under the pymupdf key, so a transient failure of the preferred
+    parser is not served from the cache later. Returns the parsed paper
+    directory, or None if parsing failed.
+    """
+    with stage_timer(f"parse_{mode}"):
+        output_dir = output_base_dir / pdf_path.stem
+        hit, store = _check_parse_cache(mode, pdf_path, output_base_dir)
+        if hit:
+            return output_dir
+
+        produced_by = mode
+        success = parse_fn(pdf_path, output_base_dir)
+        if not success and fallback_fn is not None:
+            print(f"\n⚡ {mode} parsing failed, attempting fallback to PyMuPDF...")
+            produced_by = "pymupdf"
+            success = fallback_fn(pdf_path, output_base_dir)
+        if not success:
+            return None
+        if store:
+            store(produced_by)
+        return output_dir
+
+
+async def _parse_with_cache_async(
+    mode: str,
+    pdf_path: Path,
+    output_base_dir: Path,
+    parse_fn,
+    pdf_sha256: str | None = None,
+    fallback_fn=None,
+) -> Path | None:
+    """Async variant of _parse_with_cache; parse_fn and fallback_fn are coroutine functions"""
+    with stage_timer(f"parse_{mode}"):
+        output_dir = output_base_dir / pdf_path.stem
+        hit, store = await asyncio.to_thread(
+            _check_parse_cache, mode, pdf_path, output_base_dir, pdf_sha256
+        )
+        if hit:
+            return output_dir
+
+        produced_by = mode
+        success = await parse_fn(pdf_path, output_base_dir)
+        if not success and fallback_fn is not None:
+            print(f"\n⚡ {mode} parsing failed, attempting fallback to PyMuPDF...")
+            produced_by = "pymupdf"
+            success = await fallback_fn(pdf_path, output_base_dir)
+        if not success:
+            return None
+        if store:
+            await asyncio.to_thread(store, produced_by)
+        return output_dir
+
+
+def _resolve_output_base(output_base_dir: str | Path | None) -> Path:
+    """Resolve the parse output base directory (default: reference_papers)"""
+    if output_base_dir is None:
+        return project_root / "reference_papers"
+    return Path(output_base_dir)
+
+
+def _print_mineru_missing():
+    print("✗ Error: MinerU installation not detected")
+    print("Please install MinerU first:")
+    print("  pip install magic-pdf[full]")
+    print("or")
+    print("  pip install mineru")
+    print("or visit: https://github.com/opendatalab/MinerU")
+
+
+def _prepare_mineru_job(pdf_path: str, output_base_dir: str | None):
+    """
+    Internal: Validate input and set up directories for a MinerU run
+
+    Returns:
+        (pdf_path, temp_output, output_dir), or None if the input is invalid
+    """
     pdf_path = Path(pdf_path).resolve()
     if not pdf_path.exists():
         print(f"✗ Error: PDF file does not exist: {pdf_path}")
-        return False
+        return None
 
     if not pdf_path.suffix.lower() == ".pdf":
         print(f"✗ Error: File is not PDF format: {pdf_path}")
-        return False
-
-    script_dir = Path(__file__).parent.parent.parent.parent.parent
-    if output_base_dir is None:
-        output_base_dir = script_dir / "reference_papers"
-    else:
-        output_base_dir = Path(output_base_dir)
+        return None
 
+    output_base_dir = _resolve_output_base(output_base_dir)
     output_base_dir.mkdir(parents=True, exist_ok=True)
 
     pdf_name = pdf_path.stem
     output_dir = output_base_dir / pdf_name
 
-    if output_dir.exists():
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_dir = output_base_dir / f"{pdf_name}_backup_{timestamp}"
-        print(f"⚠️ Directory already exists, backing up to: {backup_dir.name}")
-        shutil.move(str(output_dir), str(backup_dir))
+    _backup_existing_output(output_dir)
 
     print(f"📄 PDF file: {pdf_path}")
     print(f"📁 Output directory: {output_dir}")
     print("→ Starting parsing...")
 
-    try:
-        temp_output = output_base_dir / "temp_mineru_output"
-        temp_output.mkdir(parents=True, exist_ok=True)
+    temp_output = output_base_dir / "temp_mineru_output"
+    temp_output.mkdir(parents=True, exist_ok=True)
 
-        cmd = [mineru_cmd, "-p", str(pdf_path), "-o", str(temp_output)]
+    return pdf_path, temp_output, output_dir
 
-        print(f"🔧 Executing command: {' '.join(cmd)}")
 
-        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+def _mineru_command(mineru_cmd: str, pdf_path: Path, temp_output: Path) -> list[str]:
+    cmd = [mineru_cmd, "-p", str(pdf_path), "-o", str(temp_output)]
 
-        if result.returncode != 0:
-            print("✗ MinerU parsing failed:")
-            print(f"Stdout: {result.stdout}")
-            print(f"Stderr: {result.stderr}")
-            if temp_output.exists():
-                shutil.rmtree(temp_output)
-            return False
+    print(f"🔧 Executing command: {' '.join(cmd)}")
 
-        print("✓ MinerU parsing completed!")
+    return cmd
 
-        generated_folders = list(temp_output.iterdir())
 
-        if not generated_folders:
-            print("⚠️ Warning: No generated files found in temp directory")
-            if temp_output.exists():
-                shutil.rmtree(temp_output)
-            return False
+def _collect_mineru_output(
+    returncode: int, stdout: str, stderr: str, temp_output: Path, output_dir: Path
+) -> bool:
+    """
+    Internal: Move MinerU output from the temp directory into output_dir
+    """
+    if returncode != 0:
+        print("✗ MinerU parsing failed:")
+        print(f"Stdout: {stdout}")
+        print(f"Stderr: {stderr}")
+        if temp_output.exists():
+            shutil.rmtree(temp_output)
+        return False
 
-        source_folder = generated_folders[0] if generated_folders[0].is_dir() else temp_output
-
-        # Create target directory and move content
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        # Move MinerU-generated content to target directory
-        if source_folder.exists() and source_folder.is_dir():
-            # If source_folder is the PDF-named directory, move its contents
-            for item in source_folder.iterdir():
-                dest_item = output_dir / item.name
-                if dest_item.exists():
-                    if dest_item.is_dir():
-                        shutil.rmtree(dest_item)
-                    else:
-                        dest_item.unlink()
-                shutil.move(str(item), str(dest_item))
-            print(f"📦 Files saved to: {output_dir}")
-        else:
-            if output_dir.exists():
-                shutil.rmtree(output_dir)
-            shutil.move(str(source_folder), str(output_dir))
-            print(f"📦 Files saved to: {output_dir}")
+    print("✓ MinerU parsing completed!")
 
+    generated_folders = list(temp_output.iterdir())
+
+    if not generated_folders:
+        print("⚠️ Warning: No generated files found in temp directory")
         if temp_output.exists():
             shutil.rmtree(temp_output)
+        return False
 
-        print("\n📋 Generated files:")
-        md_found = False
-        for item in output_dir.rglob("*"):
-            if item.is_file():
-                rel_path = item.relative_to(output_dir)
-                print(f"  - {rel_path}")
-                if item.suffix == ".md":
-                    md_found = True
-        
-        if not md_found:
-            print("✗ Error: No markdown file generated by MinerU")
-            # Cleanup if needed? Or keep for debug?
+    source_folder = generated_folders[0] if generated_folders[0].is_dir() else temp_output
+
+    # Create target directory and move content
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Move MinerU-generated content to target directory
+    if source_folder.exists() and source_folder.is_dir():
+        # If source_folder is the PDF-named directory, move its contents
+        for item in source_folder.iterdir():
+            dest_item = output_dir / item.name
+            if dest_item.exists():
+                if dest_item.is_dir():
+                    shutil.rmtree(dest_item)
+                else:
+                    dest_item.unlink()
+            shutil.move(str(item), str(dest_item))
+        print(f"📦 Files saved to: {output_dir}")
+    else:
+        if output_dir.exists():
+            shutil.rmtree(output_dir)
+        shutil.move(str(source_folder), str(output_dir))
+        print(f"📦 Files saved to: {output_dir}")
+
+    if temp_output.exists():
+        shutil.rmtree(temp_output)
+
+    print("\n📋 Generated files:")
+    md_found = False
+    for item in output_dir.rglob("*"):
+        if item.is_file():
+            rel_path = item.relative_to(output_dir)
+            print(f"  - {rel_path}")
+            if item.suffix == ".md":
+                md_found = True
+    
+    if not md_found:
+        print("✗ Error: No markdown file generated by MinerU")
+        # Cleanup if needed? Or keep for debug?
+        return False
+
+    return True
+
+
+def _parse_pdf_with_mineru(pdf_path: str, output_base_dir: str = None):
+    """
+    Internal: Parse PDF file using MinerU
+    """
+    mineru_cmd = check_mineru_installed()
+    if not mineru_cmd:
+        _print_mineru_missing()
+        return False
+
+    print(f"✓ Detected MinerU command: {mineru_cmd}")
+
+    job = _prepare_mineru_job(pdf_path, output_base_dir)
+    if job is None:
+        return False
+    pdf_path, temp_output, output_dir = job
+
+    try:
+        cmd = _mineru_command(mineru_cmd, pdf_path, temp_output)
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+
+        return _collect_mineru_output(
+            result.returncode, result.stdout, result.stderr, temp_output, output_dir
+        )
+
+    except Exception as e:
+        print(f"✗ Error occurred during parsing: {e!s}")
+        import traceback
+
+        traceback.print_exc()
+        return False
+
+
+async def _parse_pdf_with_mineru_async(pdf_path: str, output_base_dir: str = None):
+    """
+    Internal: Parse PDF file using MinerU without blocking the event loop
+
+    Uses the persistent MinerU worker (models stay loaded between jobs) when
+    available, otherwise the MinerU CLI via an async subprocess.
+    """
+    worker = get_mineru_worker()
+    mineru_cmd = None
+    if worker is None:
+        mineru_cmd = await asyncio.to_thread(check_mineru_installed)
+        if not mineru_cmd:
+            _print_mineru_missing()
             return False
+        print(f"✓ Detected MinerU command: {mineru_cmd}")
 
-        return True
+    job = await asyncio.to_thread(_prepare_mineru_job, pdf_path, output_base_dir)
+    if job is None:
+        return False
+    pdf_path, temp_output, output_dir = job
+
+    try:
+        if worker is not None:
+            print("🔥 Parsing with persistent MinerU worker")
+            try:
+                ok, error = await worker.parse(str(pdf_path), str(temp_output))
+                return await asyncio.to_thread(
+                    _collect_mineru_output, 0 if ok else 1, "", error, temp_output, output_dir
+                )
+            except MinerUWorkerUnavailable as e:
+                print(f"⚠️ MinerU worker unavailable ({e}), falling back to the CLI")
+                disable_mineru_worker()
+
+            mineru_cmd = await asyncio.to_thread(check_mineru_installed)
+            if not mineru_cmd:
+                _print_mineru_missing()
+                return False
+
+        cmd = _mineru_command(mineru_cmd, pdf_path, temp_output)
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+
+        return await asyncio.to_thread(
+            _collect_mineru_output,
+            process.returncode,
+            stdout.decode("utf-8", errors="replace"),
+            stderr.decode("utf-8", errors="replace"),
+            temp_output,
+            output_dir,
+        )
 
     except Exception as e:
         print(f"✗ Error occurred during parsing: {e!s}")
@@ -181,36 +423,56 @@ def _parse_pdf_with_mineru(pdf_path: str, output_base_dir: str = None):
         return False
 
 
-def parse_pdf_with_pymupdf(pdf_path: Path, output_base_dir: Path) -> bool:
-    """Fallback parser using PyMuPDF (fitz)"""
+def _extract_page_texts(pdf_path: str, start: int = 0, stop: int | None = None) -> list[str]:
+    """Extract plain text for pages [start, stop) of a PDF (process-pool safe)"""
+    import fitz  # PyMuPDF
+
+    with fitz.open(pdf_path) as doc:
+        if stop is None:
+            stop = doc.page_count
+        return [doc[i].get_text() for i in range(start, min(stop, doc.page_count))]
+
+
+def _count_pdf_pages(pdf_path: str) -> int:
+    import fitz  # PyMuPDF
+
+    with fitz.open(pdf_path) as doc:
+        return doc.page_count
+
+
+def _build_pymupdf_markdown(page_texts: list[str]) -> str:
+    """Join page texts into the fast-mode markdown layout in a single pass"""
+    return "".join(f"\n\n## Page {i+1}\n\n{text}" for i, text in enumerate(page_texts))
+
+
+def _write_pymupdf_output(pdf_path: Path, output_base_dir: Path, markdown_content: str) -> Path:
+    """Write the MinerU-compatible auto/ layout for fast-mode output"""
+    # Setup output structure mimicking MinerU
+    pdf_name = pdf_path.stem
+    output_dir = output_base_dir / pdf_name
+    auto_dir = output_dir / "auto"
+    auto_dir.mkdir(parents=True, exist_ok=True)
+
+    # Save markdown
+    md_file = auto_dir / f"{pdf_name}.md"
+    with open(md_file, "w", encoding="utf-8") as f:
+        f.write(markdown_content)
+
+    # Create empty images dir for compatibility
+    images_dir = auto_dir / "images"
+    images_dir.mkdir(exist_ok=True)
+
+    return output_dir
+
+
+def _parse_pdf_with_pymupdf(pdf_path: Path, output_base_dir: Path) -> bool:
+    """Internal: Fallback parser using PyMuPDF (fitz)"""
     print(f"⚠️ Switching to PyMuPDF fallback parsing...")
     try:
-        import fitz  # PyMuPDF
-        
-        doc = fitz.open(pdf_path)
-        markdown_content = ""
-        
-        # Extract text from each page
-        for i, page in enumerate(doc):
-            text = page.get_text()
-            markdown_content += f"\n\n## Page {i+1}\n\n{text}"
-            
-        doc.close()
-        
-        # Setup output structure mimicking MinerU
-        pdf_name = pdf_path.stem
-        output_dir = output_base_dir / pdf_name
-        auto_dir = output_dir / "auto"
-        auto_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Save markdown
-        md_file = auto_dir / f"{pdf_name}.md"
-        with open(md_file, "w", encoding="utf-8") as f:
-            f.write(markdown_content)
-            
-        # Create empty images dir for compatibility
-        images_dir = auto_dir / "images"
-        images_dir.mkdir(exist_ok=True)
+        page_texts = _extract_page_texts(str(pdf_path))
+        output_dir = _write_pymupdf_output(
+            pdf_path, output_base_dir, _build_pymupdf_markdown(page_texts)
+        )
         
         print(f"✓ PyMuPDF parsing completed!")
         print(f"📦 Files saved to: {output_dir}")
@@ -223,28 +485,155 @@ def parse_pdf_with_pymupdf(pdf_path: Path, output_base_dir: Path) -> bool:
         print(f"✗ PyMuPDF parsing failed: {e}")
         return False
 
-def parse_pdf_with_mineru(pdf_path: str, output_base_dir: str = None) -> bool:
+
+async def _parse_pdf_with_pymupdf_parallel(pdf_path: Path, output_base_dir: Path) -> bool:
     """
-    Parse PDF file using MinerU (with PyMuPDF fallback)
+    Internal: PyMuPDF parsing with page ranges split across the parser pool
+
+    Page texts come back in order, are joined once and written in one go,
+    so large scanned packets scale with the number of pool workers.
     """
-    # Try MinerU first
-    success = _parse_pdf_with_mineru(pdf_path, output_base_dir)
-    
-    if success:
+    print(f"⚠️ Switching to PyMuPDF fallback parsing...")
+    loop = asyncio.get_running_loop()
+    pool = get_parser_pool()
+
+    try:
+        page_count = await loop.run_in_executor(pool, _count_pdf_pages, str(pdf_path))
+
+        settings = get_parsing_settings()
+        # Enough ranges to keep every worker busy, but not smaller than pages_per_task
+        range_size = max(
+            settings["pages_per_task"], -(-page_count // max(1, settings["process_workers"]))
+        )
+        ranges = [(start, start + range_size) for start in range(0, page_count, range_size)]
+
+        page_ranges = await asyncio.gather(
+            *(
+                loop.run_in_executor(pool, _extract_page_texts, str(pdf_path), start, stop)
+                for start, stop in ranges
+            )
+        )
+        page_texts = [text for texts in page_ranges for text in texts]
+
+        output_dir = await asyncio.to_thread(
+            _write_pymupdf_output, pdf_path, output_base_dir, _build_pymupdf_markdown(page_texts)
+        )
+
+        print(f"✓ PyMuPDF parsing completed! ({page_count} pages in {len(ranges)} ranges)")
+        print(f"📦 Files saved to: {output_dir}")
         return True
-        
-    # Failed? Try fallback
-    print("\n⚡ MinerU failed, attempting fallback to PyMuPDF...")
-    
-    # Resolve output base for fallback
-    path_obj = Path(pdf_path)
-    script_dir = Path(__file__).parent.parent.parent.parent.parent
-    if output_base_dir is None:
-        out_path = script_dir / "reference_papers"
-    else:
-        out_path = Path(output_base_dir)
-        
-    return parse_pdf_with_pymupdf(path_obj, out_path)
+
+    except ImportError:
+        print("✗ PyMuPDF (fitz) not installed.")
+        return False
+    except Exception as e:
+        print(f"✗ PyMuPDF parsing failed: {e}")
+        return False
+
+def parse_pdf_with_pymupdf(pdf_path: Path, output_base_dir: Path) -> Path | None:
+    """
+    Fallback parser using PyMuPDF (fitz), served from the parse cache when possible
+
+    Returns the parsed paper directory, or None on failure.
+    """
+    return _parse_with_cache(
+        "pymupdf", Path(pdf_path), _resolve_output_base(output_base_dir), _parse_pdf_with_pymupdf
+    )
+
+
+def _parse_pdf_with_mineru_cached(pdf_path: Path, output_base_dir: Path) -> bool:
+    """Internal: _parse_pdf_with_mineru with the (pdf_path, output_base_dir) parser signature"""
+    return _parse_pdf_with_mineru(str(pdf_path), str(output_base_dir))
+
+
+async def _parse_pdf_with_mineru_cached_async(pdf_path: Path, output_base_dir: Path) -> bool:
+    """Internal: async variant of _parse_pdf_with_mineru_cached"""
+    return await _parse_pdf_with_mineru_async(str(pdf_path), str(output_base_dir))
+
+
+def get_parsing_settings() -> dict:
+    """Get PDF parsing settings from config/main.yaml"""
+    config = load_config_with_main("question_config.yaml", project_root)
+    parsing_cfg = config.get("parsing", {})
+
+    return {
+        "process_workers": parsing_cfg.get("process_workers") or os.cpu_count() or 1,
+        "pages_per_task": parsing_cfg.get("pages_per_task", 16),
+    }
+
+
+def get_parser_pool() -> ProcessPoolExecutor:
+    """Get the shared process pool used for CPU-bound PyMuPDF parsing"""
+    global _parser_pool
+
+    if _parser_pool is None:
+        max_workers = get_parsing_settings()["process_workers"]
+        # spawn: forking a process that runs an event loop and threads is unsafe
+        _parser_pool = ProcessPoolExecutor(
+            max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _parser_pool
+
+
+def shutdown_parser_pool():
+    """Shut down the shared parser process pool"""
+    global _parser_pool
+
+    pool = _parser_pool
+    _parser_pool = None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def parse_pdf_with_pymupdf_async(
+    pdf_path: Path, output_base_dir: Path, pdf_sha256: str | None = None
+) -> Path | None:
+    """
+    In-process fast parser: PyMuPDF split by page range across the parser pool,
+    served from the parse cache when possible
+
+    Returns the parsed paper directory, or None on failure.
+    """
+    return await _parse_with_cache_async(
+        "pymupdf",
+        Path(pdf_path),
+        _resolve_output_base(output_base_dir),
+        _parse_pdf_with_pymupdf_parallel,
+        pdf_sha256,
+    )
+
+
+async def parse_pdf_with_mineru_async(
+    pdf_path: str, output_base_dir: str = None, pdf_sha256: str | None = None
+) -> Path | None:
+    """
+    Parse PDF file using MinerU (with PyMuPDF fallback) without blocking the event loop
+
+    Returns the parsed paper directory, or None on failure.
+    """
+    return await _parse_with_cache_async(
+        "mineru",
+        Path(pdf_path).resolve(),
+        _resolve_output_base(output_base_dir),
+        _parse_pdf_with_mineru_cached_async,
+        pdf_sha256,
+        fallback_fn=_parse_pdf_with_pymupdf_parallel,
+    )
+
+
+def parse_pdf_with_mineru(pdf_path: str, output_base_dir: str = None) -> Path | None:
+    """
+    Parse PDF file using MinerU (with PyMuPDF fallback)
+
+    Returns the parsed paper directory, or None on failure.
+    """
+    return _parse_with_cache(
+        "mineru",
+        Path(pdf_path).resolve(),
+        _resolve_output_base(output_base_dir),
+        _parse_pdf_with_mineru_cached,
+        fallback_fn=_parse_pdf_with_pymupdf,
+    )
 
 
 def main():
@@ -8,19 +8,79 @@ uses LLM to analyze and extract all questions, including question content and re
 """
 
 import argparse
+import asyncio
+import copy
 from datetime import datetime
+from difflib import SequenceMatcher
 import json
 from pathlib import Path
+import re
 import sys
-from typing import Any
+from typing import Any, Awaitable, Callable
 
 project_root = Path(__file__).parent.parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
-from openai import OpenAI
+from src.agents.question.tools.extraction_cache import get_extraction_cache, make_extraction_key
+from src.services.config import get_agent_params, load_config_with_main
+from src.services.llm import LLMConfig, close_llm_clients, get_async_llm_client, get_llm_config
+from src.services.llm_resilience import create_chat_completion
+from src.services.llm_scheduler import estimate_tokens
+from src.services.metrics import record_cache, stage_timer
 
-from src.services.config import get_agent_params
-from src.services.llm import get_llm_config
+# Async callback receiving newly extracted questions while extraction runs
+QuestionsCallback = Callable[[list[dict[str, Any]]], Awaitable[Any]]
+
+
+EXTRACTION_SYSTEM_PROMPT = """You are a professional exam paper analysis assistant. Your task is to extract all question information from the provided exam paper content.
+
+Please carefully analyze the exam paper content and extract the following information for each question:
+1. Question number (e.g., "1.", "Question 1", etc.)
+2. Complete question text content (if multiple choice, include all options)
+3. Related image file names (if the question references images)
+
+For multiple choice questions, please merge the stem and all options into one complete question text, for example:
+"1. Which of the following descriptions about neural networks is correct? ()\nA. Option A content\nB. Option B content\nC. Option C content\nD. Option D content"
+
+Please return results in JSON format as follows:
+```json
+{
+    "questions": [
+        {
+            "question_number": "1",
+            "question_text": "Complete question content (including options)...",
+            "images": ["image_001.jpg", "image_002.jpg"]
+        },
+        {
+            "question_number": "2",
+            "question_text": "Complete content of another question...",
+            "images": []
+        }
+    ]
+}
+```
+
+Important Notes:
+1. Ensure all questions are extracted, do not miss any
+2. Keep the original question text, do not modify or summarize
+3. For multiple choice questions, must merge stem and options in question_text
+4. If a question has no associated images, set images field to empty array []
+5. Image file names should be actual existing file names
+6. Ensure the returned format is valid JSON
+"""
+
+
+IMAGE_SUFFIXES = [".jpg", ".jpeg", ".png", ".gif", ".webp"]
+
+
+def list_paper_images(images_dir: Path) -> list[str]:
+    """List image file names available to a parsed paper"""
+    image_list = []
+    if images_dir.exists():
+        for img_file in sorted(images_dir.glob("*")):
+            if img_file.suffix.lower() in IMAGE_SUFFIXES:
+                image_list.append(img_file.name)
+    return image_list
 
 
 def load_parsed_paper(paper_dir: Path) -> tuple[str | None, list[dict] | None, Path]:
@@ -68,16 +128,238 @@ def load_parsed_paper(paper_dir: Path) -> tuple[str | None, list[dict] | None, P
     return markdown_content, content_list, images_dir
 
 
-def extract_questions_with_llm(
+def get_extraction_settings() -> dict:
+    """Get chunked extraction settings from config/main.yaml"""
+    config = load_config_with_main("question_config.yaml", project_root)
+    extraction_cfg = config.get("extraction", {})
+
+    return {
+        "chunked": extraction_cfg.get("chunked", True),
+        "chunk_chars": extraction_cfg.get("chunk_chars", 12000),
+        "overlap_chars": extraction_cfg.get("overlap_chars", 800),
+        "max_concurrency": extraction_cfg.get("max_concurrency", 4),
+        "max_chars": extraction_cfg.get("max_chars", 15000),
+    }
+
+
+# Lines that start a new page (PyMuPDF "## Page N") or a new numbered question
+_BOUNDARY_PATTERN = re.compile(
+    r"^(?:#{1,6}\s*Page\s+\d+"
+    r"|\s*(?:#{1,6}\s*)?(?:\*\*)?(?:Question|Q)\s*\d+"
+    r"|\s*(?:#{1,6}\s*)?(?:\*\*)?\(?\d{1,3}\s*[.)．、])",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def _split_long_segment(segment: str, max_chars: int) -> list[str]:
+    """Hard-split a segment that exceeds max_chars at line breaks"""
+    pieces = []
+    while len(segment) > max_chars:
+        cut = segment.rfind("\n", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(segment[:cut])
+        segment = segment[cut:]
+    if segment:
+        pieces.append(segment)
+    return pieces
+
+
+def split_markdown_into_chunks(
+    markdown_content: str, chunk_chars: int = 12000, overlap_chars: int = 800
+) -> list[str]:
+    """
+    Split paper markdown into chunks on page or question-number boundaries
+
+    Each chunk after the first is prefixed with up to overlap_chars of the
+    previous chunk (snapped to a line start) so a question cut at a chunk
+    edge is seen whole by at least one extraction call.
+    """
+    if len(markdown_content) <= chunk_chars:
+        return [markdown_content]
+
+    starts = sorted({0, *(m.start() for m in _BOUNDARY_PATTERN.finditer(markdown_content))})
+    segments = []
+    for begin, stop in zip(starts, starts[1:] + [len(markdown_content)]):
+        segments.extend(_split_long_segment(markdown_content[begin:stop], chunk_chars))
+
+    chunks = []
+    current = ""
+    for segment in segments:
+        if current and len(current) + len(segment) > chunk_chars:
+            chunks.append(current)
+            current = ""
+        current += segment
+    if current:
+        chunks.append(current)
+
+    if overlap_chars <= 0:
+        return chunks
+
+    overlapped = [chunks[0]]
+    for previous, chunk in zip(chunks, chunks[1:]):
+        tail = previous[-overlap_chars:]
+        line_start = tail.find("\n")
+        if 0 <= line_start < len(tail) - 1:
+            tail = tail[line_start + 1 :]
+        overlapped.append(tail + chunk)
+    return overlapped
+
+
+def _normalize_question_text(text: str) -> str:
+    return " ".join(str(text).split()).lower()
+
+
+def _is_duplicate_question(a: dict[str, Any], b: dict[str, Any]) -> bool:
+    """Whether two extracted questions are the same question seen twice"""
+    if str(a.get("question_number", "")).strip() != str(b.get("question_number", "")).strip():
+        return False
+
+    text_a = _normalize_question_text(a.get("question_text", ""))
+    text_b = _normalize_question_text(b.get("question_text", ""))
+    if not text_a or not text_b:
+        return text_a == text_b
+    if text_a in text_b or text_b in text_a:
+        return True
+    return SequenceMatcher(None, text_a, text_b).ratio() >= 0.9
+
+
+def _merge_questions_into(
+    merged: list[dict[str, Any]], questions: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """
+    Merge one chunk's questions into merged, returning only the new ones
+
+    Questions repeated across a chunk edge are deduplicated, keeping the
+    longest (most complete) text and the union of their images.
+    """
+    added = []
+    for question in questions:
+        if not isinstance(question, dict) or not question.get("question_text"):
+            continue
+
+        # Duplicates can only come from the overlap with recent questions
+        for existing in merged[-10:]:
+            if _is_duplicate_question(existing, question):
+                if len(str(question["question_text"])) > len(str(existing["question_text"])):
+                    existing["question_text"] = question["question_text"]
+                images = list(existing.get("images") or [])
+                for image in question.get("images") or []:
+                    if image not in images:
+                        images.append(image)
+                existing["images"] = images
+                break
+        else:
+            merged.append(dict(question))
+            added.append(merged[-1])
+    return added
+
+
+def _held_back(added: list[dict[str, Any]], overlap: str) -> int:
+    """
+    Index of the first of a chunk's new questions that the next chunk may still change
+
+    The next chunk starts with overlap, the end of this chunk, so questions
+    found there can be deduplicated against a longer version later. The
+    last question is always held back, since it may be cut at the chunk edge.
+    """
+    zone = _normalize_question_text(overlap)
+    for index, question in enumerate(added):
+        start = _normalize_question_text(question.get("question_text", ""))[:40]
+        if start and start in zone:
+            return index
+    return max(0, len(added) - 1)
+
+
+def merge_chunk_questions(chunk_results: list[list[dict[str, Any]]]) -> list[dict[str, Any]]:
+    """Merge per-chunk question lists in document order, deduplicating chunk edges"""
+    merged: list[dict[str, Any]] = []
+    for questions in chunk_results:
+        _merge_questions_into(merged, questions)
+    return merged
+
+
+async def _extract_chunk_async(
+    client,
+    model: str,
+    chunk: str,
+    image_list: list[str],
+    chunk_index: int,
+    total_chunks: int,
+    agent_params: dict,
+) -> list[dict[str, Any]] | None:
+    """Run one extraction request for a single markdown chunk (None if it failed)"""
+    part_note = ""
+    if total_chunks > 1:
+        part_note = (
+            f"\nThis is part {chunk_index + 1} of {total_chunks} of the exam paper. "
+            "The beginning may repeat the end of the previous part. "
+            "Extract every question that appears in this part.\n"
+        )
+
+    user_prompt = f"""Exam paper content (Markdown format):
+{part_note}
+{chunk}
+
+Available image files:
+{json.dumps(image_list, ensure_ascii=False, indent=2)}
+
+Please analyze the above exam paper content, extract all question information, and return in JSON format.
+"""
+
+    result_text = ""
+    try:
+        with stage_timer("extract_chunk"):
+            response, _ = await create_chat_completion(
+                client,
+                tokens=estimate_tokens(
+                    EXTRACTION_SYSTEM_PROMPT, user_prompt, max_tokens=agent_params["max_tokens"]
+                ),
+                model=model,
+                messages=[
+                    {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+                    {"role": "user", "content": user_prompt},
+                ],
+                temperature=agent_params["temperature"],
+                max_tokens=agent_params["max_tokens"],
+                response_format={"type": "json_object"},
+            )
+
+        result_text = response.choices[0].message.content
+        result = json.loads(result_text)
+        return result.get("questions", [])
+
+    except json.JSONDecodeError as e:
+        print(f"✗ JSON parsing error in chunk {chunk_index + 1}: {e!s}")
+        print(f"LLM response content: {result_text[:500]}...")
+        return None
+    except Exception as e:
+        print(f"✗ LLM call failed for chunk {chunk_index + 1}: {e!s}")
+        import traceback
+
+        traceback.print_exc()
+        return None
+
+
+async def extract_questions_with_llm_async(
     markdown_content: str,
     content_list: list[dict] | None,
     images_dir: Path,
     api_key: str,
     base_url: str,
     model: str,
+    on_questions: QuestionsCallback | None = None,
 ) -> list[dict[str, Any]]:
     """
-    Use LLM to analyze markdown content and extract questions
+    Use LLM to analyze markdown content and extract questions (async)
+
+    Long papers are split into overlapping chunks on page/question
+    boundaries; the chunks are extracted concurrently (bounded by
+    extraction.max_concurrency) and merged with cross-edge deduplication.
+    If on_questions is given, it is awaited with each batch of newly
+    merged questions as soon as the chunks before it have finished.
+    If any chunk fails, the extraction stops and returns an empty list,
+    even if on_questions has already received some questions.
 
     Args:
         markdown_content: Document content in Markdown format
@@ -86,108 +368,107 @@ def extract_questions_with_llm(
         api_key: OpenAI API key
         base_url: API endpoint URL
         model: Model name
+        on_questions: Optional async callback receiving new questions in order
 
-        Returns:
-        Question list, each question contains:
-        {
-            "question_number": Question number,
-            "question_text": Question text content (multiple choice includes options),
-            "images": [List of relative paths to related images]
-        }
+    Returns:
+        Question list (see extract_questions_with_llm)
     """
-    client = OpenAI(api_key=api_key, base_url=base_url)
-
-    image_list = []
-    if images_dir.exists():
-        for img_file in sorted(images_dir.glob("*")):
-            if img_file.suffix.lower() in [".jpg", ".jpeg", ".png", ".gif", ".webp"]:
-                image_list.append(img_file.name)
-
-    system_prompt = """You are a professional exam paper analysis assistant. Your task is to extract all question information from the provided exam paper content.
-
-Please carefully analyze the exam paper content and extract the following information for each question:
-1. Question number (e.g., "1.", "Question 1", etc.)
-2. Complete question text content (if multiple choice, include all options)
-3. Related image file names (if the question references images)
-
-For multiple choice questions, please merge the stem and all options into one complete question text, for example:
-"1. Which of the following descriptions about neural networks is correct? ()\nA. Option A content\nB. Option B content\nC. Option C content\nD. Option D content"
-
-Please return results in JSON format as follows:
-```json
-{
-    "questions": [
-        {
-            "question_number": "1",
-            "question_text": "Complete question content (including options)...",
-            "images": ["image_001.jpg", "image_002.jpg"]
-        },
-        {
-            "question_number": "2",
-            "question_text": "Complete content of another question...",
-            "images": []
-        }
-    ]
-}
-```
-
-Important Notes:
-1. Ensure all questions are extracted, do not miss any
-2. Keep the original question text, do not modify or summarize
-3. For multiple choice questions, must merge stem and options in question_text
-4. If a question has no associated images, set images field to empty array []
-5. Image file names should be actual existing file names
-6. Ensure the returned format is valid JSON
-"""
+    client = get_async_llm_client(LLMConfig(api_key=api_key, base_url=base_url, model=model))
 
-    user_prompt = f"""Exam paper content (Markdown format):
-
-{markdown_content[:15000]}
+    image_list = list_paper_images(images_dir)
+    settings = get_extraction_settings()
 
-Available image files:
-{json.dumps(image_list, ensure_ascii=False, indent=2)}
-
-Please analyze the above exam paper content, extract all question information, and return in JSON format.
-"""
+    if settings["chunked"]:
+        chunks = split_markdown_into_chunks(
+            markdown_content, settings["chunk_chars"], settings["overlap_chars"]
+        )
+    else:
+        chunks = [markdown_content[: settings["max_chars"]]]
 
     print("\n🤖 Using LLM to analyze questions...")
     print(f"📊 Model: {model}")
     print(f"📝 Document length: {len(markdown_content)} characters")
+    print(f"🧩 Chunks: {len(chunks)}")
     print(f"🖼️ Available images: {len(image_list)}")
 
     # Get agent parameters from unified config
     agent_params = get_agent_params("question")
+    semaphore = asyncio.Semaphore(max(1, settings["max_concurrency"]))
+
+    async def run_chunk(index: int, chunk: str) -> list[dict[str, Any]]:
+        async with semaphore:
+            return await _extract_chunk_async(
+                client, model, chunk, image_list, index, len(chunks), agent_params
+            )
 
+    tasks = [asyncio.create_task(run_chunk(i, c)) for i, c in enumerate(chunks)]
+    questions: list[dict[str, Any]] = []
+    held: list[dict[str, Any]] = []
     try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=agent_params["temperature"],
-            max_tokens=agent_params["max_tokens"],
-            response_format={"type": "json_object"},
-        )
+        # Chunks run concurrently but are merged (and emitted) in document order.
+        # Questions in the overlap with the next chunk are emitted once that
+        # chunk is merged, and as copies: merging updates them in place.
+        for index, task in enumerate(tasks):
+            chunk_questions = await task
+            if chunk_questions is None:
+                # A partial paper must not be cached, saved or reported as complete
+                print(f"✗ Extraction failed: chunk {index + 1} of {len(chunks)} could not be extracted")
+                return []
+            added = _merge_questions_into(questions, chunk_questions)
+            if index < len(chunks) - 1:
+                overlap_chars = max(0, settings["overlap_chars"])
+                cut = _held_back(added, chunks[index][len(chunks[index]) - overlap_chars :])
+                ready, held = held + added[:cut], added[cut:]
+            else:
+                ready, held = held + added, []
+            if ready and on_questions:
+                await on_questions(copy.deepcopy(ready))
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    if questions:
+        print(f"✓ Successfully extracted {len(questions)} questions")
+    return questions
 
-        result_text = response.choices[0].message.content
-        result = json.loads(result_text)
 
-        questions = result.get("questions", [])
-        print(f"✓ Successfully extracted {len(questions)} questions")
+def extract_questions_with_llm(
+    markdown_content: str,
+    content_list: list[dict] | None,
+    images_dir: Path,
+    api_key: str,
+    base_url: str,
+    model: str,
+) -> list[dict[str, Any]]:
+    """
+    Use LLM to analyze markdown content and extract questions
 
-        return questions
+    Args:
+        markdown_content: Document content in Markdown format
+        content_list: MinerU-generated content_list (optional)
+        images_dir: Image directory path
+        api_key: OpenAI API key
+        base_url: API endpoint URL
+        model: Model name
 
-    except json.JSONDecodeError as e:
-        print(f"✗ JSON parsing error: {e!s}")
-        print(f"LLM response content: {result_text[:500]}...")
-        return []
-    except Exception as e:
-        print(f"✗ LLM call failed: {e!s}")
-        import traceback
+        Returns:
+        Question list, each question contains:
+        {
+            "question_number": Question number,
+            "question_text": Question text content (multiple choice includes options),
+            "images": [List of relative paths to related images]
+        }
+    """
 
-        traceback.print_exc()
-        return []
+    async def run():
+        try:
+            return await extract_questions_with_llm_async(
+                markdown_content, content_list, images_dir, api_key, base_url, model
+            )
+        finally:
+            await close_llm_clients()
+
+    return asyncio.run(run())
 
 
 def save_questions_json(questions: list[dict[str, Any]], output_dir: Path, paper_name: str) -> Path:
@@ -228,13 +509,18 @@ def save_questions_json(questions: list[dict[str, Any]], output_dir: Path, paper
     return output_file
 
 
-def extract_questions_from_paper(paper_dir: str, output_dir: str | None = None) -> bool:
+async def extract_questions_from_paper_async(
+    paper_dir: str,
+    output_dir: str | None = None,
+    on_questions: QuestionsCallback | None = None,
+) -> bool:
     """
-    Extract questions from parsed exam paper
+    Extract questions from parsed exam paper (async)
 
     Args:
         paper_dir: MinerU-parsed directory path
         output_dir: Output directory (default: paper_dir)
+        on_questions: Optional async callback streaming questions as they are extracted
 
     Returns:
         Whether extraction was successful
@@ -246,7 +532,9 @@ def extract_questions_from_paper(paper_dir: str, output_dir: str | None = None)
 
     print(f"📁 Paper directory: {paper_dir}")
 
-    markdown_content, content_list, images_dir = load_parsed_paper(paper_dir)
+    markdown_content, content_list, images_dir = await asyncio.to_thread(
+        load_parsed_paper, paper_dir
+    )
 
     if not markdown_content:
         print("✗ Error: Unable to load paper content")
@@ -261,14 +549,35 @@ def extract_questions_from_paper(paper_dir: str, output_dir: str | None = None)
         )
         return False
 
-    questions = extract_questions_with_llm(
-        markdown_content=markdown_content,
-        content_list=content_list,
-        images_dir=images_dir,
-        api_key=llm_config.api_key,
-        base_url=llm_config.base_url,
-        model=llm_config.model,
+    cache = await asyncio.to_thread(get_extraction_cache)
+    # Chunking settings change the output, so they are part of the prompt fingerprint
+    cache_key = make_extraction_key(
+        markdown_content,
+        list_paper_images(images_dir),
+        llm_config.model,
+        EXTRACTION_SYSTEM_PROMPT + json.dumps(get_extraction_settings(), sort_keys=True),
     )
+    questions = await asyncio.to_thread(cache.get, cache_key) if cache else None
+    if cache:
+        record_cache("extraction", bool(questions))
+
+    if questions:
+        print(f"⚡ Extraction cache hit: reusing {len(questions)} questions")
+        if on_questions:
+            await on_questions(questions)
+    else:
+        with stage_timer("extract"):
+            questions = await extract_questions_with_llm_async(
+                markdown_content=markdown_content,
+                content_list=content_list,
+                images_dir=images_dir,
+                api_key=llm_config.api_key,
+                base_url=llm_config.base_url,
+                model=llm_config.model,
+                on_questions=on_questions,
+            )
+        if questions and cache:
+            await asyncio.to_thread(cache.put, cache_key, llm_config.model, questions)
 
     if not questions:
         print("⚠️ Warning: No questions extracted")
@@ -280,7 +589,7 @@ def extract_questions_from_paper(paper_dir: str, output_dir: str | None = None)
         output_dir = Path(output_dir)
 
     paper_name = paper_dir.name
-    output_file = save_questions_json(questions, output_dir, paper_name)
+    output_file = await asyncio.to_thread(save_questions_json, questions, output_dir, paper_name)
 
     print("\n✓ Question extraction completed!")
     print(f"📄 View results: {output_file}")
@@ -288,6 +597,27 @@ def extract_questions_from_paper(paper_dir: str, output_dir: str | None = None)
     return True
 
 
+def extract_questions_from_paper(paper_dir: str, output_dir: str | None = None) -> bool:
+    """
+    Extract questions from parsed exam paper
+
+    Args:
+        paper_dir: MinerU-parsed directory path
+        output_dir: Output directory (default: paper_dir)
+
+    Returns:
+        Whether extraction was successful
+    """
+
+    async def run():
+        try:
+            return await extract_questions_from_paper_async(paper_dir, output_dir)
+        finally:
+            await close_llm_clients()
+
+    return asyncio.run(run())
+
+
 def main():
     """Main function"""
     parser = argparse.ArgumentParser(
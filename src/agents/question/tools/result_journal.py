@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Append-only result journal for mimic sessions
+
+Every finished reference question is appended to ``mimic_results.jsonl`` in
+the session's output directory as soon as it completes, so a crash or
+disconnect only loses questions that were still in flight. A resumed session
+reads the journal back and skips references that already succeeded, and the
+final ``*_generated_questions.json`` is written by streaming over the journal
+rather than from results held in memory.
+
+A run holds ``mimic_results.lock`` for as long as it uses the journal, so two
+runs writing to the same directory (e.g. the paper folder, the CLI default)
+cannot truncate or interleave each other's results.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Any, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: runs are not locked against each other
+    fcntl = None
+
+JOURNAL_NAME = "mimic_results.jsonl"
+LOCK_NAME = "mimic_results.lock"
+# Name of the summary file written from the journal, so a resumed run
+# replaces exactly that file
+SUMMARY_RECORD_NAME = "mimic_results.summary"
+
+
+class JournalBusy(RuntimeError):
+    """Another run is using the journal in this directory"""
+
+
+def reference_key(ref_question: dict[str, Any]) -> str:
+    """Stable identity of a reference question across runs"""
+    raw = f"{ref_question.get('question_number', '')}\n{ref_question.get('question_text', '')}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+class ResultJournal:
+    """JSON Lines journal of per-reference generation results"""
+
+    def __init__(self, output_dir: Path):
+        self.path = Path(output_dir) / JOURNAL_NAME
+        self._lock = threading.Lock()
+        self._lock_file = None
+
+    def acquire(self):
+        """
+        Take the directory's journal lock for this run
+
+        Raises:
+            JournalBusy: another run holds the lock
+        """
+        if self._lock_file is not None or fcntl is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(self.path.parent / LOCK_NAME, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise JournalBusy(f"Another run is using {self.path}")
+        self._lock_file = lock_file
+
+    def release(self):
+        """Release the journal lock (safe to call more than once)"""
+        lock_file, self._lock_file = self._lock_file, None
+        if lock_file is not None:
+            lock_file.close()
+
+    def reset(self):
+        """Start a fresh journal (a non-resumed run in the same directory)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8"):
+            pass
+        (self.path.parent / SUMMARY_RECORD_NAME).unlink(missing_ok=True)
+
+    def previous_summary(self) -> Path | None:
+        """Summary file last written from this journal, if any"""
+        record = self.path.parent / SUMMARY_RECORD_NAME
+        if not record.exists():
+            return None
+        name = record.read_text(encoding="utf-8").strip()
+        return self.path.parent / name if name else None
+
+    def append(self, index: int, key: str, result: dict[str, Any]):
+        """Durably append one result"""
+        line = json.dumps({"index": index, "key": key, "result": result}, ensure_ascii=False)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _scan(self) -> Iterator[tuple[int, dict[str, Any]]]:
+        """Yield (byte offset, entry) for every complete line"""
+        if not self.path.exists():
+            return
+        with open(self.path, "rb") as f:
+            offset = 0
+            for raw in f:
+                start, offset = offset, offset + len(raw)
+                if not raw.endswith(b"\n"):
+                    # Torn write from a crash mid-append
+                    break
+                try:
+                    yield start, json.loads(raw)
+                except ValueError:
+                    continue
+
+    def load_completed(self) -> dict[str, dict[str, Any]]:
+        """Map reference key -> successful result already journaled"""
+        completed = {}
+        for _, entry in self._scan():
+            if entry.get("result", {}).get("success"):
+                completed[entry["key"]] = entry["result"]
+        return completed
+
+    def iter_results(self, keys: list[str]) -> Iterator[dict[str, Any]]:
+        """
+        Stream the latest result of each key, in the order of keys
+
+        Only byte offsets are held in memory; each result is read back from
+        the journal when it is yielded.
+        """
+        offsets = {entry["key"]: offset for offset, entry in self._scan()}
+        if not offsets:
+            return
+
+        with open(self.path, "rb") as f:
+            for key in keys:
+                if key not in offsets:
+                    continue
+                f.seek(offsets[key])
+                yield json.loads(f.readline())["result"]
+
+    def write_summary(self, output_file: Path, header: dict[str, Any], keys: list[str]) -> dict[str, int]:
+        """
+        Write the final generated-questions JSON by streaming over the journal
+
+        Returns:
+            Counts of successful and failed generations
+        """
+        counts = {"successful": 0, "failed": 0}
+        for result in self.iter_results(keys):
+            counts["successful" if result.get("success") else "failed"] += 1
+
+        def dump(value: Any) -> str:
+            return json.dumps(value, ensure_ascii=False, indent=2).replace("\n", "\n    ")
+
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write("{\n")
+            for name, value in {
+                **header,
+                "successful_generations": counts["successful"],
+                "failed_generations": counts["failed"],
+            }.items():
+                f.write(f"  {json.dumps(name)}: {json.dumps(value, ensure_ascii=False)},\n")
+
+            for name, success in (("generated_questions", True), ("failed_questions", False)):
+                f.write(f'  "{name}": [')
+                first = True
+                for result in self.iter_results(keys):
+                    if bool(result.get("success")) != success:
+                        continue
+                    f.write("\n    " if first else ",\n    ")
+                    f.write(dump(result))
+                    first = False
+                f.write("]" if first else "\n  ]")
+                f.write(",\n" if success else "\n")
+            f.write("}\n")
+
+        (self.path.parent / SUMMARY_RECORD_NAME).write_text(output_file.name, encoding="utf-8")
+        return counts
@@ -1,14 +1,26 @@
 """Paper Mimic API - Main Application"""
 
+import asyncio
 from contextlib import asynccontextmanager
+import os
 from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 
-from src.api.routers import question, history
+from src.api.routers import question, history, jobs
+from src.agents.question.tools.mineru_worker import shutdown_mineru_worker
+from src.agents.question.tools.pdf_parser import shutdown_parser_pool
 from src.logging.logger import get_logger
+from src.services.job_worker import start_worker_pool, stop_worker_pool
+from src.services.jobs import get_job_settings, get_job_store
+from src.services.llm import close_llm_clients, preload_llm_sdk
+from src.services.loop_monitor import start_loop_monitor
+from src.services.metrics import get_metrics_settings, render_metrics
+from src.services.progress import uninstall_stdout_capture
+from src.services.progress_bus import close_progress_bus
 
 logger = get_logger("API")
 
@@ -21,8 +33,26 @@ async def lifespan(app: FastAPI):
     """
     # Execute on startup
     logger.info("Application startup")
+    loop_monitor = await start_loop_monitor()
+    await preload_llm_sdk()
+    # Create the job database schema once, before requests use the store
+    await asyncio.to_thread(get_job_store)
+    # With several API workers, run_server.py starts the job workers once
+    job_workers = []
+    if int(os.getenv("API_WORKERS", 1)) <= 1:
+        job_workers = start_worker_pool(get_job_settings()["workers"])
+    if job_workers:
+        logger.info(f"Started {len(job_workers)} job worker process(es)")
     yield
     # Execute on shutdown
+    stop_worker_pool(job_workers)
+    await close_progress_bus()
+    await close_llm_clients()
+    shutdown_parser_pool()
+    shutdown_mineru_worker()
+    uninstall_stdout_capture()
+    if loop_monitor is not None:
+        await loop_monitor.stop()
     logger.info("Application shutdown")
 
 
@@ -40,6 +70,7 @@ app.add_middleware(
 # Include routers
 app.include_router(question.router, prefix="/api/question", tags=["question"])
 app.include_router(history.router)
+app.include_router(jobs.router)
 
 
 # Health check endpoint
@@ -49,6 +80,18 @@ async def health():
     return {"status": "healthy", "service": "Paper Mimic"}
 
 
+if get_metrics_settings()["enabled"]:
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        """Prometheus metrics of this API process"""
+        # Scraping reads the job queue from SQLite, so keep it off the event loop
+        return PlainTextResponse(
+            await asyncio.to_thread(render_metrics),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -1,11 +1,21 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
 from pathlib import Path
 from typing import List, Optional
 from pydantic import BaseModel
+import asyncio
 import json
 import os
 from datetime import datetime
 
+from src.services.history_index import HistoryIndex, get_history_index_path, get_history_index
+from src.services.session_files import (
+    ensure_gzip,
+    etag_matches,
+    read_question,
+    session_etag,
+)
+
 router = APIRouter(prefix="/api/history", tags=["history"])
 
 class HistoryItem(BaseModel):
@@ -17,91 +27,98 @@ class HistoryItem(BaseModel):
     preview_path: str
 
 @router.get("/", response_model=List[HistoryItem])
-async def list_history():
-    """List all past generation sessions"""
-    # Define root path for history
-    project_root = Path(__file__).parent.parent.parent.parent
-    history_dir = project_root / "data" / "user" / "question" / "mimic_papers"
-    
-    if not history_dir.exists():
-        return []
-    
-    items = []
-    
-    # Sort by modification time (newest first)
-    dirs = sorted(
-        [d for d in history_dir.iterdir() if d.is_dir()],
-        key=lambda x: x.stat().st_mtime,
-        reverse=True
-    )
-    
-    for d in dirs:
-        try:
-            # Find the questions JSON file
-            json_files = list(d.glob("*_generated_questions.json"))
-            if not json_files:
-                continue
-                
-            json_file = json_files[0]
-            
-            # Read metadata (light read)
-            with open(json_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                
-            # Create ID from folder name
-            folder_name = d.name
-            
-            # Extract basic info
-            generated_qs = data.get("generated_questions", [])
-            total = data.get("total_reference_questions", 0)
-            
-            # Try to parse timestamp from folder name mimic_YYYYMMDD_HHMMSS_paper
-            # Format: mimic_%Y%m%d_%H%M%S_name
-            parts = folder_name.split("_")
-            display_time = "Unknown"
-            paper_name = "Unknown"
-            
-            if len(parts) >= 3:
-                date_str = f"{parts[1]}_{parts[2]}"
-                try:
-                    dt = datetime.strptime(date_str, "%Y%m%d_%H%M%S")
-                    display_time = dt.strftime("%Y-%m-%d %H:%M")
-                except:
-                    pass
-                paper_name = "_".join(parts[3:])
-            
-            items.append(HistoryItem(
-                id=folder_name,
-                timestamp=display_time,
-                paper_name=paper_name,
-                total_questions=total,
-                success_count=len(generated_qs),
-                preview_path=str(json_file)
-            ))
-            
-        except Exception as e:
-            print(f"Error parsing history for {d}: {e}")
-            continue
-            
-    return items
+async def list_history(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+):
+    """
+    List past generation sessions, newest first
 
-@router.get("/{session_id}")
-async def get_history_session(session_id: str):
-    """Get full data for a specific session"""
+    Served from the history index. Pass ``limit`` to page through results;
+    when more sessions exist the ``X-Next-Cursor`` response header holds the
+    ``cursor`` value for the next page.
+    """
+    try:
+        index = await asyncio.to_thread(get_history_index)
+        rows, next_cursor = await asyncio.to_thread(index.list, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return [
+        HistoryItem(
+            id=row["id"],
+            timestamp=row["timestamp"],
+            paper_name=row["paper_name"],
+            total_questions=row["total_questions"],
+            success_count=row["success_count"],
+            preview_path=row["preview_path"],
+        )
+        for row in rows
+    ]
+
+def _find_session_file(session_id: str) -> Path:
+    """Locate a session's generated questions JSON (404 if missing)"""
     project_root = Path(__file__).parent.parent.parent.parent
     history_dir = project_root / "data" / "user" / "question" / "mimic_papers"
-    
+
     target_dir = history_dir / session_id
-    
+
     if not target_dir.exists():
         raise HTTPException(status_code=404, detail="Session not found")
-        
+
     json_files = list(target_dir.glob("*_generated_questions.json"))
     if not json_files:
         raise HTTPException(status_code=404, detail="Data file not found")
-        
-    with open(json_files[0], "r", encoding="utf-8") as f:
-        return json.load(f)
+
+    return json_files[0]
+
+@router.get("/{session_id}")
+async def get_history_session(session_id: str, request: Request):
+    """
+    Get full data for a specific session
+
+    The file is streamed from disk (precompressed when the client accepts
+    gzip) and revalidated with ETag / If-None-Match.
+    """
+    json_file = await asyncio.to_thread(_find_session_file, session_id)
+    etag = session_etag(json_file)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        gz_file = await asyncio.to_thread(ensure_gzip, json_file)
+        headers["Content-Encoding"] = "gzip"
+        return FileResponse(gz_file, media_type="application/json", headers=headers)
+
+    return FileResponse(json_file, media_type="application/json", headers=headers)
+
+@router.get("/{session_id}/questions/{n}")
+async def get_history_question(session_id: str, n: int, request: Request):
+    """
+    Get one generated question (0-based position in generated_questions)
+
+    Served from the session's JSONL layout with one seek and read; the total
+    count is returned in the X-Total-Count header.
+    """
+    json_file = await asyncio.to_thread(_find_session_file, session_id)
+    etag = session_etag(json_file).rstrip('"') + f'-{n}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    content, total = await asyncio.to_thread(read_question, json_file, n)
+    headers["X-Total-Count"] = str(total)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Question not found", headers=headers)
+
+    return Response(content=content, media_type="application/json", headers=headers)
 
 @router.delete("/{session_id}")
 async def delete_history_session(session_id: str):
@@ -117,7 +134,9 @@ async def delete_history_session(session_id: str):
         raise HTTPException(status_code=404, detail="Session not found")
         
     try:
-        shutil.rmtree(target_dir)
+        await asyncio.to_thread(shutil.rmtree, target_dir)
+        index = await asyncio.to_thread(HistoryIndex, get_history_index_path())
+        await asyncio.to_thread(index.delete, session_id)
         return {"status": "success", "message": f"Session {session_id} deleted"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete session: {str(e)}")
@@ -0,0 +1,175 @@
+"""Paper Mimic API - Job Router"""
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, AsyncIterator, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from src.api.routers.question import MimicRequestError, resolve_mimic_inputs
+from src.logging.logger import get_logger
+from src.services.jobs import TERMINAL_STATES, get_job_settings, get_job_store
+from src.services.uploads import UploadError, get_upload
+
+logger = get_logger("JobAPI")
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+class JobRequest(BaseModel):
+    mode: str = "parsed"  # "file", "parsed" or "resume"
+    upload_id: Optional[str] = None  # file mode: id returned by /api/question/upload
+    paper_path: Optional[str] = None  # parsed mode
+    session_id: Optional[str] = None  # resume mode
+    kb_name: str = "default"
+    max_questions: Optional[int] = None
+    streaming: bool = True
+
+
+def _public_job(job: dict[str, Any]) -> dict[str, Any]:
+    output_dir = job["params"].get("output_dir")
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "created": job["created"],
+        "started": job["started"],
+        "finished": job["finished"],
+        "attempts": job["attempts"],
+        "error": job["error"],
+        # History session the results are written to
+        "session_id": Path(output_dir).name if output_dir else None,
+    }
+
+
+async def _get_job_or_404(job_id: str) -> dict[str, Any]:
+    store = await asyncio.to_thread(get_job_store)
+    job = await asyncio.to_thread(store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+async def follow_job_events(job_id: str, after: int = 0) -> AsyncIterator[tuple[int, dict[str, Any]]]:
+    """
+    Yield (seq, event) from a job's event log, starting after ``after``
+
+    Replays stored events, then polls for new ones until the job has
+    finished and every event has been delivered.
+    """
+    store = await asyncio.to_thread(get_job_store)
+    poll_interval = get_job_settings()["poll_interval"]
+
+    while True:
+        # Check the status first so events written just before finishing are not missed
+        job = await asyncio.to_thread(store.get, job_id)
+        events = await asyncio.to_thread(store.events_after, job_id, after)
+        for seq, event in events:
+            after = seq
+            yield seq, event
+
+        if not events:
+            if job is None or job["status"] in TERMINAL_STATES:
+                return
+            await asyncio.sleep(poll_interval)
+
+
+@router.post("", status_code=202)
+async def submit_job(request: JobRequest):
+    """
+    Queue a mimic generation job and return its id
+
+    The job runs in a worker process whether or not a client is connected.
+    Follow it with GET /api/jobs/{job_id}/events (SSE) or the
+    /api/jobs/{job_id}/ws WebSocket.
+    """
+    data = request.model_dump()
+    try:
+        record = None
+        if request.mode == "file":
+            record = await asyncio.to_thread(get_upload, request.upload_id or "")
+        inputs = await resolve_mimic_inputs(data, record)
+    except (MimicRequestError, UploadError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    params = {
+        **inputs,
+        "kb_name": request.kb_name,
+        "max_questions": request.max_questions,
+        "streaming": request.streaming,
+    }
+    store = await asyncio.to_thread(get_job_store)
+    job_id = await asyncio.to_thread(store.submit, params)
+    logger.info(f"Queued job {job_id} (mode: {request.mode}, kb: {request.kb_name})")
+
+    return _public_job(await asyncio.to_thread(store.get, job_id))
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    """Status of a job"""
+    return _public_job(await _get_job_or_404(job_id))
+
+
+@router.post("/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a queued job, or ask the worker running it to stop"""
+    await _get_job_or_404(job_id)
+    store = await asyncio.to_thread(get_job_store)
+    return _public_job(await asyncio.to_thread(store.cancel, job_id))
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    after: int = Query(0, ge=0),
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Server-Sent Events stream of a job's progress
+
+    Each event's id is its sequence number, so a reconnecting EventSource
+    (Last-Event-ID) or ``?after=`` continues where it left off. The stream
+    ends once the job has finished.
+    """
+    await _get_job_or_404(job_id)
+    if last_event_id and last_event_id.isdigit():
+        after = max(after, int(last_event_id))
+
+    async def events():
+        async for seq, event in follow_job_events(job_id, after):
+            yield f"id: {seq}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/{job_id}/ws")
+async def websocket_job_events(websocket: WebSocket, job_id: str, after: int = 0):
+    """
+    WebSocket stream of a job's progress
+
+    Sends the same messages as /api/question/mimic, each with an added
+    ``seq``; reconnect with ``?after=<last seq>`` to continue.
+    """
+    await websocket.accept()
+    try:
+        store = await asyncio.to_thread(get_job_store)
+        if await asyncio.to_thread(store.get, job_id) is None:
+            await websocket.send_json({"type": "error", "content": f"Job not found: {job_id}"})
+            return
+
+        async for seq, event in follow_job_events(job_id, after):
+            await websocket.send_json({**event, "seq": seq})
+    except WebSocketDisconnect:
+        logger.debug(f"Client disconnected from job {job_id}")
+    finally:
+        try:
+            await websocket.close()
+        except:
+            pass
@@ -3,11 +3,12 @@
 import asyncio
 import base64
 from datetime import datetime
+import json
 from pathlib import Path
-import re
 import sys
+import uuid
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
 
 from src.agents.question import AgentCoordinator
 from src.agents.question.tools.exam_mimic import mimic_exam_questions
@@ -17,6 +18,19 @@ project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.logging.logger import get_logger
+from src.services.llm_scheduler import LLMSession, current_llm_session
+from src.services.progress import SessionChannel, current_channel, install_stdout_capture
+from src.services.progress_bus import TopicPublisher, get_progress_bus
+from src.services.uploads import (
+    UploadError,
+    UploadTooLarge,
+    UploadWriter,
+    claim_upload,
+    get_max_upload_bytes,
+    get_upload,
+    receive_multipart_upload,
+    sweep_stale_uploads_if_due,
+)
 
 # Setup module logger
 logger = get_logger("QuestionAPI")
@@ -27,15 +41,199 @@ router = APIRouter()
 PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
 MIMIC_OUTPUT_DIR = PROJECT_ROOT / "data" / "user" / "question" / "mimic_papers"
 
+# Per-session metadata in the batch directory (e.g. the parsed paper it uses)
+SESSION_META_NAME = "session.json"
+
+
+@router.post("/upload")
+async def upload_pdf(request: Request, filename: str | None = None):
+    """
+    Stream a PDF to disk and return a file reference for /mimic.
+
+    Accepts either a raw body (application/pdf or application/octet-stream,
+    name in the ``filename`` query parameter) or multipart/form-data with a
+    ``file`` field. The SHA-256 is computed while the bytes are written, and
+    the returned ``upload_id`` is passed to the WebSocket in ``file`` mode.
+    """
+    max_bytes = get_max_upload_bytes()
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise HTTPException(status_code=413, detail="Upload exceeds the size limit")
+
+    await sweep_stale_uploads_if_due()
+
+    content_type = request.headers.get("content-type", "")
+    writer = None
+    try:
+        if content_type.startswith("multipart/form-data"):
+            # Parsed as it arrives: the file part is hashed and written directly
+            record = await receive_multipart_upload(
+                content_type, request.stream(), filename, max_bytes=max_bytes
+            )
+        else:
+            writer = UploadWriter(filename, max_bytes=max_bytes)
+            async for chunk in request.stream():
+                await writer.write(chunk)
+            record = await writer.finish()
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except BaseException:
+        if writer:
+            await writer.abort()
+        raise
+
+    logger.info(f"Stored upload {record.upload_id}: {record.pdf_name} ({record.size} bytes)")
+    return {
+        "upload_id": record.upload_id,
+        "pdf_name": record.pdf_name,
+        "size": record.size,
+        "sha256": record.sha256,
+    }
+
+
+async def receive_binary_upload(websocket: WebSocket, pdf_name: str, size: int | None):
+    """
+    Receive a PDF as binary WebSocket frames, written to disk as they arrive.
+
+    The upload ends when ``size`` bytes have been received, on an empty binary
+    frame, or on a ``{"type": "upload_end"}`` text message.
+    """
+    await sweep_stale_uploads_if_due()
+
+    writer = UploadWriter(pdf_name)
+    try:
+        while size is None or writer.size < size:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+
+            chunk = message.get("bytes")
+            if chunk is None:
+                # Text frame: only an end marker is expected mid-upload
+                if '"upload_end"' in (message.get("text") or ""):
+                    break
+                continue
+            if not chunk:
+                break
+            await writer.write(chunk)
+
+        return await writer.finish()
+    except BaseException:
+        await writer.abort()
+        raise
+
+
+async def attach_session_stream(websocket: WebSocket, stream_id: str, after: int = 0):
+    """Replay and follow a session's published events on a new connection"""
+    bus = get_progress_bus()
+    if not stream_id or not await bus.exists(stream_id):
+        await websocket.send_json({"type": "error", "content": f"Session stream not found: {stream_id}"})
+        return
+
+    logger.info(f"Client re-attached to {stream_id} after event {after}")
+    async for seq, event in bus.subscribe(stream_id, int(after or 0)):
+        await websocket.send_json({**event, "seq": seq})
+
+
+class MimicRequestError(Exception):
+    """Invalid mimic request; the message is shown to the client"""
+
+
+def new_session_dir(name: str) -> Path:
+    """Batch directory for a new mimic session"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return MIMIC_OUTPUT_DIR / f"mimic_{timestamp}_{name}"
+
+
+def write_session_meta(batch_dir: Path, meta: dict):
+    """Record what a resumed session needs that is not in its batch directory"""
+    batch_dir.mkdir(parents=True, exist_ok=True)
+    (batch_dir / SESSION_META_NAME).write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+
+
+def find_resume_paper(batch_dir: Path, session_id: str) -> str | None:
+    """paper_dir to resume a session with, or None if it has no parsed paper"""
+    meta_path = batch_dir / SESSION_META_NAME
+    if meta_path.is_file():
+        try:
+            paper_dir = json.loads(meta_path.read_text(encoding="utf-8")).get("paper_dir")
+        except ValueError:
+            paper_dir = None
+        if paper_dir:
+            return paper_dir
+
+    # PDF sessions parse the paper into the batch directory itself
+    paper_dirs = [d for d in batch_dir.iterdir() if (d / "auto").is_dir()]
+    if not paper_dirs:
+        return None
+    return f"{session_id}/{paper_dirs[0].name}"
+
+
+async def resolve_mimic_inputs(data: dict, record=None) -> dict:
+    """
+    Workflow arguments for a stored upload, a parsed paper or a resumed session
+
+    ``record`` is the upload for the "upload_stream" and "file" modes; it is
+    moved into a new session directory. Raises MimicRequestError for invalid
+    requests.
+    """
+    mode = data.get("mode", "parsed")
+    inputs = {"pdf_path": None, "paper_dir": None, "pdf_sha256": None, "resume": False}
+
+    if record is not None:
+        batch_dir = new_session_dir(Path(record.pdf_name).stem)
+        inputs["pdf_path"] = str(await asyncio.to_thread(claim_upload, record, batch_dir))
+        inputs["pdf_sha256"] = record.sha256
+        inputs["output_dir"] = str(batch_dir)
+
+    elif mode == "parsed":
+        paper_path = data.get("paper_path")
+        if not paper_path:
+            raise MimicRequestError("paper_path is required for parsed mode")
+
+        # Create batch directory for parsed mode too
+        # The paper stays outside the batch directory, so remember it for resume
+        batch_dir = new_session_dir(Path(paper_path).name)
+        await asyncio.to_thread(write_session_meta, batch_dir, {"paper_dir": paper_path})
+        inputs["paper_dir"] = paper_path
+        inputs["output_dir"] = str(batch_dir)
+
+    elif mode == "resume":
+        # Continue an interrupted session in its own batch directory;
+        # references already in its result journal are not regenerated
+        session_id = data.get("session_id", "")
+        batch_dir = MIMIC_OUTPUT_DIR / session_id
+        if not session_id or "/" in session_id or ".." in session_id or not batch_dir.is_dir():
+            raise MimicRequestError(f"Session not found: {session_id}")
+
+        paper_dir = await asyncio.to_thread(find_resume_paper, batch_dir, session_id)
+        if not paper_dir:
+            raise MimicRequestError("Session has no parsed paper to resume")
+
+        inputs["paper_dir"] = paper_dir
+        inputs["output_dir"] = str(batch_dir)
+        inputs["resume"] = True
+
+    else:
+        raise MimicRequestError(f"Unknown mode: {mode}")
+
+    return inputs
+
 
 @router.websocket("/mimic")
 async def websocket_mimic_generate(websocket: WebSocket):
     """
     WebSocket endpoint for mimic exam paper question generation.
 
-    Supports two modes:
-    1. Upload PDF directly via WebSocket (base64 encoded)
-    2. Use a pre-parsed paper directory path
+    Supports these modes:
+    1. Upload PDF directly via WebSocket (base64 encoded, legacy)
+    2. Stream the PDF as binary WebSocket frames ("upload_stream")
+    3. Reference a PDF already sent to POST /upload ("file")
+    4. Use a pre-parsed paper directory path
+    5. Resume an interrupted session ("resume")
+    6. Re-attach to a running session's events after a reconnect ("attach")
 
     Message format for PDF upload:
     {
@@ -43,7 +241,23 @@ async def websocket_mimic_generate(websocket: WebSocket):
         "pdf_data": "base64_encoded_pdf_content",
         "pdf_name": "exam.pdf",
         "kb_name": "knowledge_base_name",
-        "max_questions": 5  // optional
+        "max_questions": 5,  // optional
+        "streaming": true  // optional, generate while extraction runs
+    }
+
+    Message format for binary streaming (followed by binary frames):
+    {
+        "mode": "upload_stream",
+        "pdf_name": "exam.pdf",
+        "size": 123456,  // optional, otherwise end with an empty binary frame
+        "kb_name": "knowledge_base_name"
+    }
+
+    Message format for a previous POST /upload:
+    {
+        "mode": "file",
+        "upload_id": "id returned by /upload",
+        "kb_name": "knowledge_base_name"
     }
 
     Message format for pre-parsed:
@@ -53,11 +267,27 @@ async def websocket_mimic_generate(websocket: WebSocket):
         "kb_name": "knowledge_base_name",
         "max_questions": 5  // optional
     }
+
+    Message format for resuming a session (id from /api/history):
+    {
+        "mode": "resume",
+        "session_id": "mimic_20250101_120000_exam",
+        "kb_name": "knowledge_base_name"
+    }
+
+    Message format for re-attaching (stream_id from the first status message,
+    after = the last "seq" received):
+    {
+        "mode": "attach",
+        "stream_id": "ws-0123456789ab",
+        "after": 42
+    }
     """
     await websocket.accept()
 
-    pusher_task = None
-    original_stdout = sys.stdout
+    channel = None
+    channel_token = None
+    llm_session_token = None
 
     try:
         # 1. Wait for config
@@ -66,188 +296,198 @@ async def websocket_mimic_generate(websocket: WebSocket):
         kb_name = data.get("kb_name", "default")
         max_questions = data.get("max_questions")
 
-        logger.info(f"Starting mimic generation (mode: {mode}, kb: {kb_name})")
+        if mode == "attach":
+            await attach_session_stream(websocket, data.get("stream_id", ""), data.get("after", 0))
+            return
 
-        # 2. Setup Log Queue
-        log_queue = asyncio.Queue()
+        logger.info(f"Starting mimic generation (mode: {mode}, kb: {kb_name})")
 
-        async def log_pusher():
-            while True:
-                entry = await log_queue.get()
+        # Everything sent to the client is also published to the progress
+        # bus, so a client that reconnects (to any worker) can re-attach.
+        # Publishing happens in the background, off the live send path.
+        stream_id = f"ws-{uuid.uuid4().hex[:12]}"
+        publisher = TopicPublisher(get_progress_bus(), stream_id)
+        client_connected = True
+
+        async def deliver(event: dict):
+            nonlocal client_connected
+            if event.get("type") == "question_partial":
+                # Cumulative text, superseded by the next frame: live only
+                event = {**event, "seq": publisher.seq}
+            else:
+                event = {**event, "seq": publisher.publish(event)}
+            if client_connected:
                 try:
-                    await websocket.send_json(entry)
+                    await websocket.send_json(event)
                 except Exception:
-                    break
-                log_queue.task_done()
-
-        pusher_task = asyncio.create_task(log_pusher())
-
-        # 3. Stdout interceptor for capturing prints
-        # ANSI escape sequence pattern for stripping color codes
-        ANSI_ESCAPE_PATTERN = re.compile(r"\x1b\[[0-9;]*[a-zA-Z]")
-
-        class StdoutInterceptor:
-            def __init__(self, queue):
-                self.queue = queue
-                self.original_stdout = sys.stdout
-
-            def write(self, message):
-                # Write to terminal first (with ANSI codes for color)
-                self.original_stdout.write(message)
-                # Strip ANSI escape codes before sending to frontend
-                clean_message = ANSI_ESCAPE_PATTERN.sub("", message).strip()
-                # Then send to frontend (non-blocking)
-                if clean_message:
-                    try:
-                        self.queue.put_nowait(
-                            {
-                                "type": "log",
-                                "content": clean_message,
-                                "timestamp": asyncio.get_event_loop().time(),
-                            }
-                        )
-                    except (asyncio.QueueFull, RuntimeError):
-                        pass
-
-            def flush(self):
-                self.original_stdout.flush()
-
-        sys.stdout = StdoutInterceptor(log_queue)
-
-        try:
-            await websocket.send_json(
-                {"type": "status", "stage": "init", "content": "Initializing..."}
-            )
-
-            pdf_path = None
-            paper_dir = None
-
-            # Handle PDF upload mode
-            if mode == "upload":
-                pdf_data = data.get("pdf_data")
-                pdf_name = data.get("pdf_name", "exam.pdf")
-
-                if not pdf_data:
-                    await websocket.send_json(
-                        {"type": "error", "content": "PDF data is required for upload mode"}
+                    # Keep the session running for a client that re-attaches
+                    client_connected = False
+
+        # 2. Per-session channel: the only writer to this socket. Prints made
+        # while this session's code runs (including worker threads) are routed
+        # to it via a contextvar instead of swapping sys.stdout globally.
+        install_stdout_capture()
+        channel = SessionChannel.from_config(deliver)
+        channel_token = current_channel.set(channel)
+        send = channel.send_event
+
+        # LLM calls from this connection share one fair-queuing slot in the
+        # process-wide scheduler
+        llm_session_token = current_llm_session.set(LLMSession(session_id=stream_id))
+
+        await send(
+            {
+                "type": "status",
+                "stage": "init",
+                "content": "Initializing...",
+                "stream_id": stream_id,
+            }
+        )
+
+        inputs = {"pdf_path": None, "paper_dir": None, "pdf_sha256": None, "resume": False}
+
+        # Handle streamed/referenced uploads: the PDF is already on disk and hashed
+        if mode in ("upload_stream", "file"):
+            try:
+                if mode == "upload_stream":
+                    await send(
+                        {"type": "status", "stage": "upload", "content": "Ready for PDF data"}
+                    )
+                    size = data.get("size")
+                    record = await receive_binary_upload(
+                        websocket, data.get("pdf_name", "exam.pdf"), int(size) if size else None
                     )
-                    return
+                else:
+                    record = await asyncio.to_thread(get_upload, data.get("upload_id", ""))
+            except UploadError as e:
+                await send({"type": "error", "content": str(e)})
+                return
 
-                # Create batch directory for this mimic session
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                pdf_stem = Path(pdf_name).stem
-                batch_dir = MIMIC_OUTPUT_DIR / f"mimic_{timestamp}_{pdf_stem}"
-                batch_dir.mkdir(parents=True, exist_ok=True)
+            inputs = await resolve_mimic_inputs(data, record)
 
-                # Save uploaded PDF in batch directory
-                pdf_path = batch_dir / pdf_name
+            await send(
+                {
+                    "type": "progress",
+                    "stage": "parsing",
+                    "status": "running",
+                    "message": "Parsing PDF exam paper...",
+                }
+            )
+            logger.info(f"Using uploaded PDF: {inputs['pdf_path']} ({record.size} bytes)")
 
-                await websocket.send_json(
-                    {"type": "status", "stage": "upload", "content": f"Saving PDF: {pdf_name}"}
-                )
+        # Handle PDF upload mode
+        elif mode == "upload":
+            pdf_data = data.get("pdf_data")
+            pdf_name = data.get("pdf_name", "exam.pdf")
 
-                # Decode and save PDF
-                pdf_bytes = base64.b64decode(pdf_data)
-                with open(pdf_path, "wb") as f:
-                    f.write(pdf_bytes)
-
-                await websocket.send_json(
-                    {
-                        "type": "progress",
-                        "stage": "parsing",
-                        "status": "running",
-                        "message": "Parsing PDF exam paper...",
-                    }
+            if not pdf_data:
+                await send(
+                    {"type": "error", "content": "PDF data is required for upload mode"}
                 )
-                logger.info(f"Saved uploaded PDF to: {pdf_path}")
-
-                # Pass batch_dir as output directory
-                pdf_path = str(pdf_path)
-                output_dir = str(batch_dir)
+                return
 
-            elif mode == "parsed":
-                paper_path = data.get("paper_path")
-                if not paper_path:
-                    await websocket.send_json(
-                        {"type": "error", "content": "paper_path is required for parsed mode"}
-                    )
-                    return
-                paper_dir = paper_path
+            # Create batch directory for this mimic session
+            batch_dir = new_session_dir(Path(pdf_name).stem)
+            batch_dir.mkdir(parents=True, exist_ok=True)
 
-                # Create batch directory for parsed mode too
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                batch_dir = MIMIC_OUTPUT_DIR / f"mimic_{timestamp}_{Path(paper_path).name}"
-                batch_dir.mkdir(parents=True, exist_ok=True)
-                output_dir = str(batch_dir)
+            # Save uploaded PDF in batch directory
+            pdf_path = batch_dir / pdf_name
 
-            else:
-                await websocket.send_json({"type": "error", "content": f"Unknown mode: {mode}"})
-                return
+            await send(
+                {"type": "status", "stage": "upload", "content": f"Saving PDF: {pdf_name}"}
+            )
 
-            # Create WebSocket callback for real-time progress updates
-            async def ws_callback(event_type: str, data: dict):
-                """Send progress updates to the frontend via WebSocket."""
-                try:
-                    message = {"type": event_type, **data}
-                    await websocket.send_json(message)
-                except Exception as e:
-                    logger.debug(f"WebSocket send failed: {e}")
+            # Decode and save PDF
+            pdf_bytes = base64.b64decode(pdf_data)
+            del pdf_data, data["pdf_data"]
+            await asyncio.to_thread(pdf_path.write_bytes, pdf_bytes)
+            del pdf_bytes
 
-            # Run the complete mimic workflow with callback
-            await websocket.send_json(
+            await send(
                 {
-                    "type": "status",
-                    "stage": "processing",
-                    "content": "Executing question generation workflow...",
+                    "type": "progress",
+                    "stage": "parsing",
+                    "status": "running",
+                    "message": "Parsing PDF exam paper...",
                 }
             )
+            logger.info(f"Saved uploaded PDF to: {pdf_path}")
 
-            result = await mimic_exam_questions(
-                pdf_path=pdf_path,
-                paper_dir=paper_dir,
-                kb_name=kb_name,
-                output_dir=output_dir,
-                max_questions=max_questions,
-                ws_callback=ws_callback,
-                fast_mode=True,  # Enable fast mode by default for performance
-            )
-
-            if result.get("success"):
-                # Results are already sent via ws_callback during generation
-                # Just send the final complete signal
-                total_ref = result.get("total_reference_questions", 0)
-                generated = result.get("generated_questions", [])
-                failed = result.get("failed_questions", [])
+            # Pass batch_dir as output directory
+            inputs["pdf_path"] = str(pdf_path)
+            inputs["output_dir"] = str(batch_dir)
 
-                logger.info(
-                    f"Mimic generation complete: {len(generated)} succeeded, {len(failed)} failed"
-                )
+        else:
+            try:
+                inputs = await resolve_mimic_inputs(data)
+            except MimicRequestError as e:
+                await send({"type": "error", "content": str(e)})
+                return
 
-                await websocket.send_json({"type": "complete"})
-            else:
-                error_msg = result.get("error", "Unknown error")
-                await websocket.send_json({"type": "error", "content": error_msg})
-                logger.error(f"Mimic generation failed: {error_msg}")
+        # Create WebSocket callback for real-time progress updates
+        async def ws_callback(event_type: str, data: dict):
+            """Send progress updates to the frontend via the session channel."""
+            coalesce_key = None
+            if event_type == "question_partial":
+                # Partial text is cumulative: a slow client only needs the latest
+                coalesce_key = f"partial:{data.get('question_id')}"
+            await send({"type": event_type, **data}, coalesce_key=coalesce_key)
+
+        # Run the complete mimic workflow with callback
+        await send(
+            {
+                "type": "status",
+                "stage": "processing",
+                "content": "Executing question generation workflow...",
+            }
+        )
+
+        result = await mimic_exam_questions(
+            **inputs,
+            kb_name=kb_name,
+            max_questions=max_questions,
+            ws_callback=ws_callback,
+            fast_mode=True,  # Enable fast mode by default for performance
+            streaming=data.get("streaming", True),
+        )
+
+        if result.get("success"):
+            # Results are already sent via ws_callback during generation
+            # Just send the final complete signal
+            total_ref = result.get("total_reference_questions", 0)
+            generated = result.get("generated_questions", [])
+            failed = result.get("failed_questions", [])
+
+            logger.info(
+                f"Mimic generation complete: {len(generated)} succeeded, {len(failed)} failed"
+            )
 
-        finally:
-            sys.stdout = original_stdout
+            await send({"type": "complete"})
+        else:
+            error_msg = result.get("error", "Unknown error")
+            await send({"type": "error", "content": error_msg})
+            logger.error(f"Mimic generation failed: {error_msg}")
 
     except WebSocketDisconnect:
         logger.debug("Client disconnected during mimic generation")
     except Exception as e:
         logger.error(f"Mimic generation error: {e}")
         try:
-            await websocket.send_json({"type": "error", "content": str(e)})
+            if channel:
+                await channel.send_event({"type": "error", "content": str(e)})
+            else:
+                await websocket.send_json({"type": "error", "content": str(e)})
         except:
             pass
     finally:
-        sys.stdout = original_stdout
-        if pusher_task:
-            try:
-                pusher_task.cancel()
-                await pusher_task
-            except:
-                pass
+        if llm_session_token is not None:
+            current_llm_session.reset(llm_session_token)
+        if channel_token is not None:
+            current_channel.reset(channel_token)
+        if channel:
+            # Flush queued events and log lines before closing the socket
+            await channel.close()
+            await publisher.aclose()
         try:
             await websocket.close()
         except:
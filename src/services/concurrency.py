@@ -0,0 +1,179 @@
+"""Adaptive concurrency limiting for LLM calls"""
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+import time
+
+from src.services.config import load_config_with_main
+
+
+def get_concurrency_settings() -> dict:
+    """Get adaptive LLM concurrency settings from config/main.yaml"""
+    config = load_config_with_main("question_config.yaml")
+    cfg = config.get("llm", {}).get("concurrency", {})
+
+    return {
+        "adaptive": cfg.get("adaptive", True),
+        "initial": cfg.get("initial", 4),
+        "min_limit": cfg.get("min", 1),
+        "max_limit": cfg.get("max", 20),
+        "backoff": cfg.get("backoff", 0.5),
+        "latency_tolerance": cfg.get("latency_tolerance", 2.0),
+    }
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Whether an exception is a provider rate limit / overload response"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status in (429, 503) or type(error).__name__ == "RateLimitError"
+
+
+def is_timeout_error(error: BaseException) -> bool:
+    return isinstance(error, (asyncio.TimeoutError, TimeoutError)) or type(error).__name__ in (
+        "APITimeoutError",
+        "ReadTimeout",
+        "ConnectTimeout",
+    )
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter
+
+    The limit grows by about one slot per limit's worth of successful calls
+    made while the limiter is saturated, and is cut multiplicatively on rate
+    limits, timeouts, or when smoothed latency exceeds latency_tolerance times
+    the best latency seen (queueing at the provider). Only calls started
+    after the last cut can cut again, so a burst of 429s from one window
+    counts once.
+    """
+
+    def __init__(
+        self,
+        initial: float = 4,
+        min_limit: int = 1,
+        max_limit: int = 20,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        smoothing: float = 0.2,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+
+        self.inflight = 0
+        self.avg_latency: float | None = None
+        self.best_latency: float | None = None
+        self.rate_limited = 0
+        self._last_decrease = 0.0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    def _wake(self):
+        free = int(self.limit) - self.inflight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    async def acquire(self):
+        while self.inflight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif waiter.done() and not waiter.cancelled():
+                    # Pass the wake-up on to the next waiter
+                    self._wake()
+                raise
+        self.inflight += 1
+
+    def release(self):
+        self.inflight -= 1
+        self._wake()
+
+    def _decrease(self, started: float):
+        if started < self._last_decrease:
+            return
+        self.limit = max(float(self.min_limit), self.limit * self.backoff)
+        self._last_decrease = time.monotonic()
+
+    def on_success(self, latency: float, started: float, inflight: int | None = None):
+        if self.avg_latency is None:
+            self.avg_latency = latency
+        else:
+            self.avg_latency += self.smoothing * (latency - self.avg_latency)
+        if self.best_latency is None or self.avg_latency < self.best_latency:
+            self.best_latency = self.avg_latency
+        else:
+            # Let the baseline drift up slowly so one fast outlier doesn't pin it
+            self.best_latency *= 1.01
+
+        if self.avg_latency > self.best_latency * self.latency_tolerance:
+            self._decrease(started)
+        elif (self.inflight if inflight is None else inflight) >= int(self.limit) - 1:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            self._wake()
+
+    def on_error(self, error: BaseException, started: float):
+        if is_rate_limit_error(error):
+            self.rate_limited += 1
+            self._decrease(started)
+        elif is_timeout_error(error):
+            self._decrease(started)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one concurrency slot for the duration of an LLM call"""
+        await self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.on_error(e, started)
+            raise
+        else:
+            self.on_success(time.monotonic() - started, started)
+        finally:
+            self.release()
+
+
+# One limiter per event loop; the learned limit carries over to new loops
+_limiter: AdaptiveLimiter | None = None
+_limiter_loop = None
+
+
+def get_llm_limiter() -> AdaptiveLimiter | None:
+    """Get the shared LLM limiter, or None when adaptive concurrency is disabled"""
+    global _limiter, _limiter_loop
+
+    settings = get_concurrency_settings()
+    if not settings["adaptive"]:
+        return None
+
+    loop = asyncio.get_running_loop()
+    if _limiter is not None and _limiter_loop is loop:
+        return _limiter
+
+    initial = _limiter.limit if _limiter is not None else settings["initial"]
+    _limiter = AdaptiveLimiter(
+        initial=initial,
+        min_limit=settings["min_limit"],
+        max_limit=settings["max_limit"],
+        backoff=settings["backoff"],
+        latency_tolerance=settings["latency_tolerance"],
+    )
+    _limiter_loop = loop
+    return _limiter
+
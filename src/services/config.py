@@ -1,8 +1,30 @@
 """Configuration module for Paper Mimic"""
 
+import copy
 from pathlib import Path
+import threading
+
 import yaml
 
+# Parsed YAML files by path, with the (mtime, size) they were parsed at
+_yaml_cache: dict[Path, tuple[tuple[int, int], dict]] = {}
+_yaml_cache_lock = threading.Lock()
+
+
+def _load_yaml(path: Path) -> dict:
+    """Parse a YAML file, cached by (mtime, size); callers get a copy"""
+    stat = path.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _yaml_cache_lock:
+        cached = _yaml_cache.get(path)
+    if cached is None or cached[0] != version:
+        with open(path, encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+        cached = (version, data)
+        with _yaml_cache_lock:
+            _yaml_cache[path] = cached
+    return copy.deepcopy(cached[1])
+
 
 def load_config_with_main(config_name: str, project_root: Path = None):
     """Load configuration from YAML files"""
@@ -17,15 +39,12 @@ def load_config_with_main(config_name: str, project_root: Path = None):
         # Return default config if not found
         return _get_default_config()
     
-    with open(main_config_path, encoding="utf-8") as f:
-        config = yaml.safe_load(f) or {}
+    config = _load_yaml(main_config_path)
     
     # Try to load specific config
     specific_config_path = config_dir / config_name
     if specific_config_path.exists():
-        with open(specific_config_path, encoding="utf-8") as f:
-            specific_config = yaml.safe_load(f) or {}
-            config.update(specific_config)
+        config.update(_load_yaml(specific_config_path))
     
     return config
 
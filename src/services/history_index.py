@@ -0,0 +1,261 @@
+"""
+History index for mimic sessions
+
+One SQLite row per session under data/user/question/mimic_papers holds the
+summary fields shown in the history sidebar, so listing sessions no longer
+scans every directory and loads every generated-questions JSON.
+
+mimic_exam_questions records a row when a session finishes. Sessions created
+before the index existed are backfilled with:
+
+    python -m src.services.history_index --rebuild
+"""
+
+from contextlib import closing
+from datetime import datetime
+import json
+from pathlib import Path
+import sqlite3
+import sys
+from typing import Any
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.config import load_config_with_main
+
+HISTORY_DIR = project_root / "data" / "user" / "question" / "mimic_papers"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    created REAL NOT NULL,
+    timestamp TEXT NOT NULL,
+    paper_name TEXT NOT NULL,
+    kb_name TEXT,
+    total_questions INTEGER NOT NULL,
+    success_count INTEGER NOT NULL,
+    failed_count INTEGER NOT NULL,
+    preview_path TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_created ON sessions (created DESC, id DESC);
+"""
+
+_COLUMNS = (
+    "id",
+    "created",
+    "timestamp",
+    "paper_name",
+    "kb_name",
+    "total_questions",
+    "success_count",
+    "failed_count",
+    "preview_path",
+)
+
+
+def get_history_index_path() -> Path:
+    """Get the history index database path from config/main.yaml"""
+    config = load_config_with_main("question_config.yaml", project_root)
+    db_path = Path(
+        config.get("history", {}).get("index_path", "data/user/question/history.sqlite3")
+    )
+    if not db_path.is_absolute():
+        db_path = project_root / db_path
+    return db_path
+
+
+def parse_session_name(folder_name: str) -> tuple[str, str]:
+    """
+    Get (display time, paper name) from a session folder name
+
+    Folder format: mimic_%Y%m%d_%H%M%S_name
+    """
+    parts = folder_name.split("_")
+    display_time = "Unknown"
+    paper_name = "Unknown"
+
+    if len(parts) >= 3:
+        date_str = f"{parts[1]}_{parts[2]}"
+        try:
+            dt = datetime.strptime(date_str, "%Y%m%d_%H%M%S")
+            display_time = dt.strftime("%Y-%m-%d %H:%M")
+        except ValueError:
+            pass
+        paper_name = "_".join(parts[3:])
+
+    return display_time, paper_name
+
+
+def build_session_row(
+    session_dir: Path, output_file: Path, output_data: dict[str, Any], created: float
+) -> dict[str, Any]:
+    """Build an index row from a session's generated-questions data"""
+    display_time, paper_name = parse_session_name(session_dir.name)
+    generated = output_data.get("generated_questions", [])
+    failed = output_data.get("failed_questions", [])
+
+    return {
+        "id": session_dir.name,
+        "created": created,
+        "timestamp": display_time,
+        "paper_name": paper_name,
+        "kb_name": output_data.get("kb_name"),
+        "total_questions": output_data.get("total_reference_questions", 0),
+        "success_count": output_data.get("successful_generations", len(generated)),
+        "failed_count": output_data.get("failed_generations", len(failed)),
+        "preview_path": str(output_file),
+    }
+
+
+def encode_cursor(row: dict[str, Any]) -> str:
+    """Opaque keyset cursor pointing just after a row"""
+    return f"{row['created']!r}|{row['id']}"
+
+
+def decode_cursor(cursor: str) -> tuple[float, str]:
+    """Parse a cursor produced by encode_cursor"""
+    created, _, session_id = cursor.partition("|")
+    try:
+        return float(created), session_id
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+class HistoryIndex:
+    """SQLite index of mimic sessions, newest first"""
+
+    def __init__(self, db_path: Path, history_dir: Path = HISTORY_DIR):
+        self.db_path = Path(db_path)
+        self.history_dir = Path(history_dir)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def upsert(self, row: dict[str, Any]):
+        """Insert or replace one session row"""
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO sessions ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+                tuple(row[c] for c in _COLUMNS),
+            )
+
+    def delete(self, session_id: str):
+        """Remove a session row"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def count(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def list(
+        self, limit: int | None = None, cursor: str | None = None
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        """
+        List sessions newest first
+
+        Returns:
+            (rows, next cursor or None when there are no more rows)
+        """
+        query = f"SELECT {', '.join(_COLUMNS)} FROM sessions"
+        params: list[Any] = []
+        if cursor:
+            created, session_id = decode_cursor(cursor)
+            query += " WHERE (created < ?) OR (created = ? AND id < ?)"
+            params += [created, created, session_id]
+        query += " ORDER BY created DESC, id DESC"
+        if limit is not None:
+            # Fetch one extra row to know whether another page exists
+            query += " LIMIT ?"
+            params.append(limit + 1)
+
+        with closing(self._connect()) as conn:
+            rows = [dict(r) for r in conn.execute(query, params).fetchall()]
+
+        next_cursor = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1])
+        return rows, next_cursor
+
+    def rebuild(self) -> int:
+        """Re-index every session directory on disk; returns the number indexed"""
+        rows = []
+        if self.history_dir.exists():
+            for session_dir in self.history_dir.iterdir():
+                if not session_dir.is_dir():
+                    continue
+                json_files = list(session_dir.glob("*_generated_questions.json"))
+                if not json_files:
+                    continue
+                try:
+                    with open(json_files[0], encoding="utf-8") as f:
+                        data = json.load(f)
+                    rows.append(
+                        build_session_row(
+                            session_dir, json_files[0], data, session_dir.stat().st_mtime
+                        )
+                    )
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ Error parsing history for {session_dir}: {e}")
+
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM sessions")
+            conn.executemany(
+                f"INSERT OR REPLACE INTO sessions ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+                [tuple(r[c] for c in _COLUMNS) for r in rows],
+            )
+        return len(rows)
+
+
+def get_history_index() -> HistoryIndex:
+    """Get the history index, backfilling it from disk on first use"""
+    index = HistoryIndex(get_history_index_path())
+    if index.count() == 0 and HISTORY_DIR.exists() and any(HISTORY_DIR.iterdir()):
+        index.rebuild()
+    return index
+
+
+def record_session(output_dir: Path, output_file: Path, output_data: dict[str, Any], created: float):
+    """Index a finished session (no-op for output directories outside the history dir)"""
+    output_dir = Path(output_dir)
+    if output_dir.resolve().parent != HISTORY_DIR.resolve():
+        return
+    try:
+        HistoryIndex(get_history_index_path()).upsert(
+            build_session_row(output_dir, Path(output_file), output_data, created)
+        )
+    except sqlite3.Error as e:
+        print(f"⚠️ Failed to update history index: {e}")
+
+
+def main():
+    """Command-line entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Mimic session history index")
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Re-index every session directory under data/user/question/mimic_papers",
+    )
+    args = parser.parse_args()
+
+    index = HistoryIndex(get_history_index_path())
+    if args.rebuild:
+        count = index.rebuild()
+        print(f"✓ Indexed {count} sessions into {index.db_path}")
+    else:
+        print(f"📚 {index.count()} sessions indexed in {index.db_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Worker processes for the mimic job queue
+
+Each worker process claims queued jobs from the job store and runs
+mimic_exam_questions for them, up to jobs.jobs_per_worker at a time. A job's
+progress events and log lines are appended to its event log, where the
+API's WebSocket/SSE endpoints pick them up. Workers send heartbeats while a
+job runs; jobs of a worker that died are requeued and resumed from their
+result journal by another worker.
+
+The API server starts jobs.workers worker processes itself. More workers,
+on the same machine and database, can be started separately:
+
+    python -m src.services.job_worker --workers 2
+"""
+
+import asyncio
+import multiprocessing
+import os
+from pathlib import Path
+import signal
+import socket
+import sys
+import time
+from typing import Any
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.jobs import JobStore, get_job_settings, get_job_store
+from src.services.llm_scheduler import LLMSession, current_llm_session
+from src.services.loop_monitor import start_loop_monitor
+from src.services.progress import SessionChannel, current_channel, install_stdout_capture
+
+
+async def run_job(store: JobStore, job: dict[str, Any], worker_id: str, heartbeat_interval: float):
+    """Run one claimed job, publishing its events to the job's event log"""
+    # Lazy import: the workflow pulls in the parsers and agents
+    from src.agents.question.tools.exam_mimic import mimic_exam_questions
+
+    job_id = job["id"]
+    params = dict(job["params"])
+    if job["attempts"] > 1:
+        # A previous worker died mid-run: keep what its journal already holds
+        params["resume"] = True
+
+    async def publish(event: dict[str, Any]):
+        await asyncio.to_thread(store.append_events, job_id, [event])
+
+    install_stdout_capture()
+    channel = SessionChannel.from_config(publish)
+    channel_token = current_channel.set(channel)
+    llm_session_token = current_llm_session.set(LLMSession(session_id=job_id))
+
+    async def finish(status: str, error: str | None = None):
+        if not await asyncio.to_thread(store.finish, job_id, worker_id, status, error):
+            # recover_stale gave the job to another attempt while this one was stalled
+            print(f"⚠️ Job {job_id} is no longer assigned to {worker_id}; not recording {status}")
+
+    async def job_callback(event_type: str, data: dict):
+        # Partial text is transient; only the final result is worth storing
+        if event_type != "question_partial":
+            await channel.send_event({"type": event_type, **data})
+
+    work = None
+    try:
+        await channel.send_event(
+            {"type": "status", "stage": "init", "content": f"Job {job_id} started (attempt {job['attempts']})"}
+        )
+        work = asyncio.create_task(
+            mimic_exam_questions(**params, ws_callback=job_callback, fast_mode=True)
+        )
+
+        cancelled = False
+        while not work.done():
+            await asyncio.wait({work}, timeout=heartbeat_interval)
+            if not work.done() and await asyncio.to_thread(store.heartbeat, job_id, worker_id):
+                cancelled = True
+                work.cancel()
+                try:
+                    await work
+                except asyncio.CancelledError:
+                    pass
+
+        if cancelled:
+            print(f"🛑 Job {job_id} cancelled")
+            await channel.send_event({"type": "error", "content": "Job cancelled"})
+            await finish("cancelled")
+            return
+
+        result = work.result()
+        if result.get("success"):
+            await channel.send_event({"type": "complete"})
+            await finish("succeeded")
+        else:
+            error_msg = result.get("error", "Unknown error")
+            await channel.send_event({"type": "error", "content": error_msg})
+            await finish("failed", error_msg)
+
+    except asyncio.CancelledError:
+        # The worker is shutting down: leave the job for another worker
+        if work is not None:
+            work.cancel()
+        store.requeue(job_id)
+        raise
+    except Exception as e:
+        print(f"✗ Job {job_id} failed: {e}")
+        await channel.send_event({"type": "error", "content": str(e)})
+        await finish("failed", str(e))
+    finally:
+        current_llm_session.reset(llm_session_token)
+        current_channel.reset(channel_token)
+        await channel.close()
+
+
+async def worker_loop(worker_id: str, stop: asyncio.Event):
+    """Claim and run jobs until stop is set"""
+    from src.services.llm import close_llm_clients
+
+    settings = get_job_settings()
+    store = await asyncio.to_thread(get_job_store)
+    running: set[asyncio.Task] = set()
+    last_recovery = 0.0
+
+    print(f"👷 Job worker {worker_id} started")
+    try:
+        while not stop.is_set():
+            if time.monotonic() - last_recovery > settings["stale_after"] / 2:
+                last_recovery = time.monotonic()
+                for job_id in await asyncio.to_thread(
+                    store.recover_stale, settings["stale_after"], settings["max_attempts"]
+                ):
+                    print(f"♻️ Requeued job {job_id} from a lost worker")
+                pruned = await asyncio.to_thread(store.prune, settings["retention"])
+                if pruned:
+                    print(f"🧹 Deleted {pruned} expired job(s) and their events")
+
+            while len(running) < settings["jobs_per_worker"]:
+                job = await asyncio.to_thread(store.claim, worker_id)
+                if job is None:
+                    break
+                print(f"▶️ [{worker_id}] Running job {job['id']}")
+                task = asyncio.create_task(
+                    run_job(store, job, worker_id, settings["heartbeat_interval"])
+                )
+                running.add(task)
+                task.add_done_callback(running.discard)
+
+            try:
+                await asyncio.wait_for(stop.wait(), settings["poll_interval"])
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        await close_llm_clients()
+        print(f"👷 Job worker {worker_id} stopped")
+
+
+def worker_main(index: int = 0):
+    """Entry point of one worker process"""
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+    async def main():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except NotImplementedError:
+                pass
+        # Blocks are only logged here: worker processes do not serve /metrics
+        loop_monitor = await start_loop_monitor()
+        try:
+            await worker_loop(worker_id, stop)
+        finally:
+            if loop_monitor is not None:
+                await loop_monitor.stop()
+
+    asyncio.run(main())
+
+
+def start_worker_pool(count: int) -> list[multiprocessing.Process]:
+    """Start worker processes (not daemonic: the parsers use child processes)"""
+    ctx = multiprocessing.get_context("spawn")
+    processes = []
+    for index in range(count):
+        process = ctx.Process(target=worker_main, args=(index,), name=f"job-worker-{index}")
+        process.start()
+        processes.append(process)
+    return processes
+
+
+def stop_worker_pool(processes: list[multiprocessing.Process], timeout: float = 15.0):
+    """Stop worker processes; running jobs are requeued for the next start"""
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    deadline = time.monotonic() + timeout
+    for process in processes:
+        process.join(max(0.0, deadline - time.monotonic()))
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+
+def main():
+    """Command-line entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run mimic job worker processes")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Number of worker processes (default: 1)"
+    )
+    args = parser.parse_args()
+
+    if args.workers <= 1:
+        worker_main()
+        return
+
+    processes = start_worker_pool(args.workers)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        stop_worker_pool(processes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Persistent job queue for mimic generation
+
+Jobs submitted through POST /api/jobs are stored in a local SQLite database
+and run by worker processes (src/services/job_worker.py), so a generation
+keeps going when the browser tab that started it closes. Every progress
+event a job emits is appended to the job's event log in the same database;
+WebSocket and SSE subscribers replay the log from any position and then
+follow it, which lets clients reconnect without losing events.
+
+Job states: queued -> running -> succeeded | failed | cancelled. A running
+job whose worker stops sending heartbeats is put back in the queue and
+resumed from its result journal.
+"""
+
+from contextlib import closing
+import json
+from pathlib import Path
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any
+import uuid
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.config import load_config_with_main
+
+TERMINAL_STATES = ("succeeded", "failed", "cancelled")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    heartbeat REAL,
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished);
+CREATE TABLE IF NOT EXISTS job_events (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+_JOB_COLUMNS = (
+    "id",
+    "status",
+    "params",
+    "created",
+    "started",
+    "finished",
+    "heartbeat",
+    "worker",
+    "attempts",
+    "cancel_requested",
+    "error",
+)
+
+
+def get_job_settings() -> dict:
+    """Get job queue and worker settings from config/main.yaml"""
+    config = load_config_with_main("question_config.yaml", project_root)
+    jobs_cfg = config.get("jobs", {})
+
+    db_path = Path(jobs_cfg.get("db_path", "data/user/question/jobs.sqlite3"))
+    if not db_path.is_absolute():
+        db_path = project_root / db_path
+
+    return {
+        "db_path": db_path,
+        "workers": jobs_cfg.get("workers", 1),
+        "jobs_per_worker": max(1, int(jobs_cfg.get("jobs_per_worker", 2))),
+        "poll_interval": jobs_cfg.get("poll_interval", 0.5),
+        "heartbeat_interval": jobs_cfg.get("heartbeat_interval", 10.0),
+        "stale_after": jobs_cfg.get("stale_after", 60.0),
+        "max_attempts": jobs_cfg.get("max_attempts", 3),
+        "retention": jobs_cfg.get("retention_hours", 168) * 3600,
+    }
+
+
+def _job_from_row(row: sqlite3.Row) -> dict[str, Any]:
+    job = dict(zip(_JOB_COLUMNS, row))
+    job["params"] = json.loads(job["params"])
+    job["cancel_requested"] = bool(job["cancel_requested"])
+    return job
+
+
+class JobStore:
+    """SQLite-backed job queue and per-job event log"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            # WAL lets subscribers read the event log while workers append to it
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def submit(self, params: dict[str, Any]) -> str:
+        """Queue a job and return its id"""
+        job_id = f"job_{uuid.uuid4().hex[:16]}"
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, params, created) VALUES (?, 'queued', ?, ?)",
+                (job_id, json.dumps(params, ensure_ascii=False), time.time()),
+            )
+        return job_id
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(_JOB_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return _job_from_row(row) if row else None
+
+    def queue_depth(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    def claim(self, worker: str) -> dict[str, Any] | None:
+        """Atomically take the oldest queued job for a worker"""
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            # Take the write lock before reading so two workers never claim the same job
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, started = ?, heartbeat = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (worker, now, now, row[0]),
+            )
+        return self.get(row[0])
+
+    def heartbeat(self, job_id: str, worker: str) -> bool:
+        """Record that a worker is still running a job; returns whether cancel was requested"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE jobs SET heartbeat = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (time.time(), job_id, worker),
+            )
+            row = conn.execute(
+                "SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def finish(self, job_id: str, worker: str, status: str, error: str | None = None) -> bool:
+        """
+        Record the outcome of a worker's attempt at a job
+
+        Returns False if the job is no longer running on this worker (it was
+        requeued and reclaimed, or failed by recover_stale); the row is then
+        left to the current attempt.
+        """
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, finished = ?, error = ? "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (status, time.time(), error, job_id, worker),
+            )
+        return cursor.rowcount > 0
+
+    def requeue(self, job_id: str):
+        """Put a job that was interrupted (not failed) back in the queue"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', worker = NULL WHERE id = ? AND status = 'running'",
+                (job_id,),
+            )
+
+    def cancel(self, job_id: str) -> dict[str, Any] | None:
+        """Cancel a queued job now, or ask the worker running it to stop"""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id),
+            )
+            conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = 'running'",
+                (job_id,),
+            )
+        return self.get(job_id)
+
+    def recover_stale(self, stale_after: float, max_attempts: int) -> list[str]:
+        """Requeue running jobs whose worker stopped sending heartbeats"""
+        cutoff = time.time() - stale_after
+        with closing(self._connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")
+            stale = conn.execute(
+                "SELECT id, attempts FROM jobs WHERE status = 'running' AND heartbeat < ?",
+                (cutoff,),
+            ).fetchall()
+            for job_id, attempts in stale:
+                if attempts >= max_attempts:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'failed', finished = ?, "
+                        "error = 'Worker lost too many times' WHERE id = ?",
+                        (time.time(), job_id),
+                    )
+                else:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'queued', worker = NULL WHERE id = ?",
+                        (job_id,),
+                    )
+        return [job_id for job_id, _ in stale]
+
+    def prune(self, retention: float) -> int:
+        """Delete finished jobs, and their event logs, older than retention seconds"""
+        cutoff = time.time() - retention
+        placeholders = ", ".join("?" for _ in TERMINAL_STATES)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")
+            expired = [
+                row[0]
+                for row in conn.execute(
+                    f"SELECT id FROM jobs WHERE status IN ({placeholders}) AND finished < ?",
+                    (*TERMINAL_STATES, cutoff),
+                )
+            ]
+            for job_id in expired:
+                conn.execute("DELETE FROM job_events WHERE job_id = ?", (job_id,))
+                conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        return len(expired)
+
+    def append_events(self, job_id: str, events: list[dict[str, Any]]) -> int:
+        """Append events to a job's log; returns the last sequence number"""
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")
+            seq = conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM job_events WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+            conn.executemany(
+                "INSERT INTO job_events (job_id, seq, event, created) VALUES (?, ?, ?, ?)",
+                [
+                    (job_id, seq + i, json.dumps(event, ensure_ascii=False), now)
+                    for i, event in enumerate(events, 1)
+                ],
+            )
+        return seq + len(events)
+
+    def events_after(self, job_id: str, after: int = 0, limit: int = 500) -> list[tuple[int, dict[str, Any]]]:
+        """Events with a sequence number greater than after, oldest first"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT seq, event FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?",
+                (job_id, after, limit),
+            ).fetchall()
+        return [(seq, json.loads(event)) for seq, event in rows]
+
+
+_stores: dict[Path, JobStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """Get the configured job store; its schema is set up once per process"""
+    db_path = get_job_settings()["db_path"]
+    with _stores_lock:
+        store = _stores.get(db_path)
+        if store is None:
+            store = _stores[db_path] = JobStore(db_path)
+    return store
@@ -1,9 +1,14 @@
 """LLM Configuration module"""
 
+import asyncio
+import importlib.util
 import os
 from dataclasses import dataclass
+from typing import Any
 from dotenv import load_dotenv
 
+from src.services.config import load_config_with_main
+
 load_dotenv()
 
 
@@ -32,3 +37,117 @@ def get_llm_config() -> LLMConfig:
         base_url=base_url,
         model=model,
     )
+
+
+# Process-wide clients shared by every coordinator and extractor, keyed by
+# (event loop, API key, base URL)
+_async_clients: dict[tuple, Any] = {}
+
+
+def get_pool_settings() -> dict:
+    """Get HTTP connection pool settings for the shared LLM client"""
+    config = load_config_with_main("question_config.yaml")
+    llm_cfg = config.get("llm", {})
+
+    return {
+        "max_connections": llm_cfg.get("max_connections", 20),
+        "max_keepalive_connections": llm_cfg.get("max_keepalive_connections", 10),
+        "keepalive_expiry": llm_cfg.get("keepalive_expiry", 30.0),
+        "timeout": llm_cfg.get("timeout", 120.0),
+        "http2": llm_cfg.get("http2", True),
+    }
+
+
+def _build_http_client(settings: dict):
+    """Build a bounded keep-alive httpx client (HTTP/2 if h2 is installed)"""
+    import httpx
+
+    http2 = bool(settings["http2"]) and importlib.util.find_spec("h2") is not None
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings["max_connections"],
+            max_keepalive_connections=settings["max_keepalive_connections"],
+            keepalive_expiry=settings["keepalive_expiry"],
+        ),
+        timeout=httpx.Timeout(settings["timeout"], connect=10.0),
+    )
+
+
+def get_async_llm_client(llm_config: LLMConfig = None):
+    """
+    Get the shared AsyncOpenAI client
+
+    The client (and its connection pool) is created once per event loop and
+    API key/base URL, and reused by every caller, so TLS connections stay
+    warm across questions. Clients stay open until close_llm_clients() runs
+    on their loop, so requests still using an older key are not cut off.
+    """
+    from openai import AsyncOpenAI
+
+    if llm_config is None:
+        llm_config = get_llm_config()
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    # httpx connections are bound to the loop that opened them
+    key = (loop, llm_config.api_key, llm_config.base_url)
+    client = _async_clients.get(key)
+    if client is not None:
+        return client
+
+    # Clients of a loop that has been closed without close_llm_clients() can
+    # no longer be closed; their sockets go with the loop
+    for stale in [k for k in _async_clients if k[0] is not None and k[0].is_closed()]:
+        del _async_clients[stale]
+
+    client = AsyncOpenAI(
+        api_key=llm_config.api_key,
+        base_url=llm_config.base_url,
+        http_client=_build_http_client(get_pool_settings()),
+    )
+    _async_clients[key] = client
+
+    return client
+
+
+def _preload_llm_sdk():
+    importlib.import_module("openai")
+    # httpx imports httpcore and loads the CA bundle when the first client is built
+    _build_http_client(get_pool_settings())
+
+
+async def preload_llm_sdk():
+    """
+    Import the OpenAI SDK and its HTTP stack in a worker thread
+
+    Together they take most of a second, which would otherwise block the
+    event loop inside the first request's get_async_llm_client().
+    """
+    await asyncio.to_thread(_preload_llm_sdk)
+
+
+async def close_llm_clients():
+    """
+    Close the shared LLM clients of the running event loop
+
+    Releases their pooled connections. Clients of other loops still
+    running (e.g. a sync wrapper's asyncio.run in a worker thread) are left
+    to their own loop.
+    """
+    loop = asyncio.get_running_loop()
+
+    clients = []
+    for key in list(_async_clients):
+        owner = key[0]
+        if owner is loop or owner is None:
+            clients.append(_async_clients.pop(key))
+        elif owner.is_closed():
+            del _async_clients[key]
+
+    for client in clients:
+        await client.close()
@@ -0,0 +1,311 @@
+"""
+Retries, timeouts and hedging for LLM calls
+
+create_chat_completion() wraps one chat.completions.create request:
+
+- every attempt takes its own scheduler slot and has a hard timeout
+- 429, 5xx, timeouts and connection errors are retried with exponential
+  backoff and full jitter, waiting at least as long as Retry-After asks
+- with hedging enabled, a duplicate request is fired once an attempt runs
+  past the recent p95 latency for the model, and the first answer wins
+
+stream_chat_completion() does the same for stream=True requests (without
+hedging), forwarding content deltas as they arrive.
+
+The OpenAI client's own retries are disabled for these calls so attempts are
+not multiplied.
+"""
+
+import asyncio
+from collections import deque
+from email.utils import parsedate_to_datetime
+import random
+import time
+from typing import Any, Awaitable, Callable
+
+from src.services.concurrency import is_timeout_error
+from src.services.config import load_config_with_main
+from src.services.llm_scheduler import estimate_tokens, llm_slot
+from src.services.metrics import record_llm_call, usage_from_response
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+def get_retry_settings() -> dict:
+    """Get LLM retry/hedging settings from config/main.yaml"""
+    config = load_config_with_main("question_config.yaml")
+    cfg = config.get("llm", {}).get("retry", {})
+
+    return {
+        "max_attempts": max(1, int(cfg.get("max_attempts", 4))),
+        "base_delay": cfg.get("base_delay", 1.0),
+        "max_delay": cfg.get("max_delay", 30.0),
+        "attempt_timeout": cfg.get("attempt_timeout", 90.0),
+        "hedge": cfg.get("hedge", False),
+        "hedge_quantile": cfg.get("hedge_quantile", 0.95),
+        "hedge_min_samples": cfg.get("hedge_min_samples", 20),
+    }
+
+
+def _status_code(error: BaseException) -> int | None:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Transient provider errors worth another attempt"""
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS or status >= 500
+    return is_timeout_error(error) or type(error).__name__ in (
+        "APIConnectionError",
+        "ConnectError",
+        "RemoteProtocolError",
+    )
+
+
+def retry_after_seconds(error: BaseException) -> float | None:
+    """Delay requested by the provider (Retry-After / retry-after-ms headers)"""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float, retry_after: float | None = None) -> float:
+    """Full-jitter exponential backoff, never shorter than Retry-After"""
+    delay = random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, max_delay * 4))
+    return delay
+
+
+class LatencyTracker:
+    """Recent call latencies per model, for hedging decisions"""
+
+    def __init__(self, size: int = 200):
+        self.size = size
+        self._samples: dict[str, deque[float]] = {}
+
+    def add(self, key: str, latency: float):
+        self._samples.setdefault(key, deque(maxlen=self.size)).append(latency)
+
+    def quantile(self, key: str, q: float, min_samples: int = 20) -> float | None:
+        samples = self._samples.get(key)
+        if not samples or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+latency_tracker = LatencyTracker()
+
+
+def _outcome(error: BaseException) -> str:
+    """Metrics label for a failed attempt"""
+    if is_timeout_error(error):
+        return "timeout"
+    status = _status_code(error)
+    return f"http_{status}" if status is not None else "error"
+
+
+async def _single_attempt(client, tokens: int, timeout: float, started: asyncio.Event, kwargs: dict):
+    model = kwargs.get("model", "")
+    async with llm_slot(tokens) as ticket:
+        started.set()
+        began = time.monotonic()
+        try:
+            response = await asyncio.wait_for(client.chat.completions.create(**kwargs), timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            record_llm_call(model, time.monotonic() - began, _outcome(e))
+            raise
+        usage = getattr(response, "usage", None)
+        ticket.record_usage(getattr(usage, "total_tokens", None))
+        latency_tracker.add(model, time.monotonic() - began)
+        record_llm_call(model, time.monotonic() - began, usage=usage_from_response(usage))
+        return response
+
+
+async def _hedged_attempt(client, tokens: int, settings: dict, kwargs: dict):
+    """One attempt, duplicated if it runs past the p95 latency"""
+    primary_started = asyncio.Event()
+    primary = asyncio.create_task(
+        _single_attempt(client, tokens, settings["attempt_timeout"], primary_started, kwargs)
+    )
+    tasks = {primary}
+    try:
+        threshold = None
+        if settings["hedge"]:
+            threshold = latency_tracker.quantile(
+                kwargs.get("model", ""), settings["hedge_quantile"], settings["hedge_min_samples"]
+            )
+
+        if threshold is not None:
+            # The hedge clock starts once the primary holds a slot, not while queued
+            started_wait = asyncio.create_task(primary_started.wait())
+            await asyncio.wait({primary, started_wait}, return_when=asyncio.FIRST_COMPLETED)
+            started_wait.cancel()
+
+            if not primary.done():
+                done, _ = await asyncio.wait({primary}, timeout=threshold)
+                if not done:
+                    print(f"⏱️ LLM call exceeded p95 ({threshold:.1f}s), sending hedged request")
+                    tasks.add(
+                        asyncio.create_task(
+                            _single_attempt(
+                                client, tokens, settings["attempt_timeout"], asyncio.Event(), kwargs
+                            )
+                        )
+                    )
+
+        error = None
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if task.done() and not task.cancelled():
+                task.exception()  # mark a losing failure as retrieved
+            task.cancel()
+
+
+async def _stream_attempt(client, tokens: int, timeout: float, attempt: int, on_delta, kwargs: dict) -> str:
+    model = kwargs.get("model", "")
+    async with llm_slot(tokens) as ticket:
+        began = time.monotonic()
+        usage = {}
+
+        async def consume() -> str:
+            parts = []
+            stream = await client.chat.completions.create(stream=True, **kwargs)
+            async for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    # Only sent by providers that report usage for streams
+                    usage.update(usage_from_response(chunk.usage))
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    await on_delta(delta, attempt)
+            return "".join(parts)
+
+        try:
+            text = await asyncio.wait_for(consume(), timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            record_llm_call(model, time.monotonic() - began, _outcome(e))
+            raise
+        if not usage:
+            # Estimate from the text when the provider sent no usage
+            prompt = estimate_tokens(*(str(m.get("content", "")) for m in kwargs.get("messages", [])))
+            completion = estimate_tokens(text)
+            usage = {
+                "prompt_tokens": prompt,
+                "completion_tokens": completion,
+                "total_tokens": prompt + completion,
+            }
+        ticket.record_usage(usage["total_tokens"])
+        latency_tracker.add(model, time.monotonic() - began)
+        record_llm_call(model, time.monotonic() - began, usage=usage)
+        return text
+
+
+async def stream_chat_completion(
+    client, on_delta: Callable[[str, int], Awaitable[Any]], tokens: int = 0, **kwargs: Any
+) -> tuple[str, int]:
+    """
+    Streaming variant of create_chat_completion (stream=True)
+
+    on_delta(text, attempt) is awaited for every content delta; a new attempt
+    number means a retry restarted the output. Streams are retried like
+    ordinary calls but never hedged.
+
+    Returns:
+        (full response text, number of attempts made)
+    """
+    settings = get_retry_settings()
+    client = client.with_options(max_retries=0)
+
+    attempt = 1
+    while True:
+        try:
+            text = await _stream_attempt(
+                client, tokens, settings["attempt_timeout"], attempt, on_delta, kwargs
+            )
+            return text, attempt
+        except Exception as e:
+            if attempt >= settings["max_attempts"] or not is_retryable_error(e):
+                raise
+
+            delay = backoff_delay(
+                attempt, settings["base_delay"], settings["max_delay"], retry_after_seconds(e)
+            )
+            print(
+                f"🔁 LLM stream failed ({type(e).__name__}), "
+                f"retry {attempt}/{settings['max_attempts'] - 1} in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+async def create_chat_completion(client, tokens: int = 0, **kwargs: Any) -> tuple[Any, int]:
+    """
+    Call chat.completions.create with retries, timeouts and optional hedging
+
+    Args:
+        client: AsyncOpenAI client
+        tokens: Estimated tokens for the scheduler's TPM budget
+        **kwargs: Arguments for chat.completions.create
+
+    Returns:
+        (response, number of attempts made)
+    """
+    settings = get_retry_settings()
+    client = client.with_options(max_retries=0)
+
+    attempt = 1
+    while True:
+        try:
+            return await _hedged_attempt(client, tokens, settings, kwargs), attempt
+        except Exception as e:
+            if attempt >= settings["max_attempts"] or not is_retryable_error(e):
+                raise
+
+            delay = backoff_delay(
+                attempt, settings["base_delay"], settings["max_delay"], retry_after_seconds(e)
+            )
+            print(
+                f"🔁 LLM call failed ({type(e).__name__}), "
+                f"retry {attempt}/{settings['max_attempts'] - 1} in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -0,0 +1,281 @@
+"""
+Process-wide LLM request scheduler
+
+Every LLM call in the process asks the scheduler for a slot. A slot is only
+granted while all of these budgets allow it:
+
+- a global concurrency cap (further limited by the adaptive AIMD limit when
+  enabled)
+- requests per minute and tokens per minute over a sliding 60s window
+
+Waiting requests are queued per session and served with weighted
+round-robin, so one session with hundreds of questions cannot starve a
+session with a handful. The session is taken from a contextvar that the
+API sets for each WebSocket connection; calls made outside a session share
+the "default" session.
+"""
+
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import time
+from typing import Iterator
+
+from src.services.concurrency import AdaptiveLimiter, get_llm_limiter
+from src.services.config import load_config_with_main
+from src.services.metrics import llm_queue_seconds
+
+WINDOW_SECONDS = 60.0
+
+
+@dataclass
+class LLMSession:
+    """Identity and scheduling weight of the session making LLM calls"""
+    session_id: str = "default"
+    weight: int = 1
+
+
+current_llm_session: ContextVar[LLMSession] = ContextVar(
+    "current_llm_session", default=LLMSession()
+)
+
+
+@contextmanager
+def llm_session(session_id: str, weight: int = 1) -> Iterator[LLMSession]:
+    """Attribute LLM calls made in this context (and tasks it starts) to a session"""
+    session = LLMSession(session_id=session_id, weight=max(1, int(weight)))
+    token = current_llm_session.set(session)
+    try:
+        yield session
+    finally:
+        current_llm_session.reset(token)
+
+
+def get_scheduler_settings() -> dict:
+    """Get LLM scheduler budgets from config/main.yaml (0 disables a budget)"""
+    config = load_config_with_main("question_config.yaml")
+    cfg = config.get("llm", {}).get("scheduler", {})
+
+    return {
+        "max_concurrency": cfg.get("max_concurrency", 20),
+        "rpm": cfg.get("rpm", 0),
+        "tpm": cfg.get("tpm", 0),
+    }
+
+
+@dataclass
+class _Request:
+    session: LLMSession
+    tokens: int
+    future: asyncio.Future
+
+
+@dataclass
+class LLMTicket:
+    """A granted slot; report actual usage so the TPM window stays accurate"""
+    tokens: int
+    granted_at: float
+    _entry: list = field(repr=False, default_factory=list)
+
+    def record_usage(self, total_tokens: int | None):
+        if total_tokens:
+            self._entry[1] = total_tokens
+
+
+class LLMScheduler:
+    """Fair, budgeted admission of LLM calls"""
+
+    def __init__(
+        self,
+        max_concurrency: int = 20,
+        rpm: int = 0,
+        tpm: int = 0,
+        limiter: AdaptiveLimiter | None = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.rpm = rpm
+        self.tpm = tpm
+        self.limiter = limiter
+
+        self.inflight = 0
+        # Kept up to date on enqueue/dequeue so /metrics can read it from
+        # another thread without iterating _queues while the loop changes it
+        self._queued = 0
+        self._queues: OrderedDict[str, deque[_Request]] = OrderedDict()
+        self._credits: dict[str, int] = {}
+        # [grant time, tokens] for every grant in the last WINDOW_SECONDS
+        self._window: deque[list] = deque()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def capacity(self) -> int:
+        if self.limiter is None:
+            return self.max_concurrency
+        return max(1, min(self.max_concurrency, int(self.limiter.limit)))
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    def _budget_wait(self, tokens: int, now: float) -> float:
+        """Seconds until the RPM/TPM window admits a request of this size"""
+        while self._window and self._window[0][0] <= now - WINDOW_SECONDS:
+            self._window.popleft()
+
+        wait = 0.0
+        if self.rpm and len(self._window) >= self.rpm:
+            wait = max(wait, self._window[len(self._window) - self.rpm][0] + WINDOW_SECONDS - now)
+
+        if self.tpm:
+            used = sum(entry[1] for entry in self._window)
+            # Oversized requests are admitted alone rather than never
+            excess = used + min(tokens, self.tpm) - self.tpm
+            for granted, spent in self._window:
+                if excess <= 0:
+                    break
+                excess -= spent
+                wait = max(wait, granted + WINDOW_SECONDS - now)
+        return wait
+
+    def _next_request(self) -> _Request | None:
+        """Weighted round-robin over sessions with queued requests"""
+        while self._queues:
+            session_id, queue = next(iter(self._queues.items()))
+            while queue and queue[0].future.done():
+                queue.popleft()  # cancelled while waiting
+                self._queued -= 1
+            if not queue:
+                del self._queues[session_id]
+                self._credits.pop(session_id, None)
+                continue
+            return queue[0]
+        return None
+
+    def _on_timer(self):
+        self._timer = None
+        self._dispatch()
+
+    def _dispatch(self):
+        loop = asyncio.get_running_loop()
+
+        while self.inflight < self.capacity:
+            request = self._next_request()
+            if request is None:
+                return
+
+            now = time.monotonic()
+            wait = self._budget_wait(request.tokens, now)
+            if wait > 0:
+                if self._timer is None:
+                    self._timer = loop.call_later(wait, self._on_timer)
+                return
+
+            session_id = request.session.session_id
+            queue = self._queues[session_id]
+            queue.popleft()
+            self._queued -= 1
+
+            credits = self._credits.get(session_id, request.session.weight) - 1
+            if credits <= 0 or not queue:
+                # Turn used up: move this session to the back of the rotation
+                self._queues.move_to_end(session_id)
+                self._credits.pop(session_id, None)
+                if not queue:
+                    del self._queues[session_id]
+            else:
+                self._credits[session_id] = credits
+
+            entry = [now, request.tokens]
+            self._window.append(entry)
+            self.inflight += 1
+            request.future.set_result(entry)
+
+    async def acquire(self, tokens: int = 0) -> LLMTicket:
+        session = current_llm_session.get()
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(session.session_id, deque()).append(
+            _Request(session=session, tokens=tokens, future=future)
+        )
+        self._queued += 1
+        self._dispatch()
+
+        try:
+            entry = await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled: give the slot back
+                self.release()
+            raise
+        return LLMTicket(tokens=tokens, granted_at=entry[0], _entry=entry)
+
+    def release(self):
+        self.inflight -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 0):
+        """Hold a scheduled slot for one LLM call"""
+        requested = time.monotonic()
+        ticket = await self.acquire(tokens)
+        started = time.monotonic()
+        llm_queue_seconds.observe(started - requested)
+        try:
+            yield ticket
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if self.limiter is not None:
+                self.limiter.on_error(e, started)
+            raise
+        else:
+            if self.limiter is not None:
+                self.limiter.on_success(
+                    time.monotonic() - started, started, inflight=self.inflight
+                )
+        finally:
+            self.release()
+
+
+# One scheduler per event loop (the API server runs a single loop)
+_scheduler: LLMScheduler | None = None
+_scheduler_loop = None
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Get the process-wide LLM scheduler for the running event loop"""
+    global _scheduler, _scheduler_loop
+
+    loop = asyncio.get_running_loop()
+    limiter = get_llm_limiter()
+    if _scheduler is not None and _scheduler_loop is loop:
+        _scheduler.limiter = limiter
+        return _scheduler
+
+    settings = get_scheduler_settings()
+    _scheduler = LLMScheduler(
+        max_concurrency=settings["max_concurrency"],
+        rpm=settings["rpm"],
+        tpm=settings["tpm"],
+        limiter=limiter,
+    )
+    _scheduler_loop = loop
+    return _scheduler
+
+
+def estimate_tokens(*texts: str, max_tokens: int = 0) -> int:
+    """Rough token estimate for budgeting (about 4 characters per token)"""
+    return sum(len(t) for t in texts) // 4 + max_tokens
+
+
+@asynccontextmanager
+async def llm_slot(tokens: int = 0):
+    """
+    Run one LLM call under the process-wide scheduler
+
+    Yields an LLMTicket; pass the response's total token usage to
+    record_usage() so the TPM budget reflects actual consumption.
+    """
+    async with get_llm_scheduler().slot(tokens) as ticket:
+        yield ticket
@@ -0,0 +1,225 @@
+"""
+Event-loop lag and blocking-call detector (opt-in diagnostics)
+
+A heartbeat task sleeps for diagnostics.interval seconds in a loop and
+records how late it wakes up; that lateness is the event-loop lag. A
+watchdog thread watches the heartbeat. When it is overdue by more than
+diagnostics.block_threshold, something is running on the loop without
+yielding. The watchdog then samples the loop thread's stack, which shows
+the blocking call while it is still running.
+
+When the loop recovers, the block is logged with its duration and stack.
+It is also counted in /metrics by call site, which is the innermost frame
+in this project's code.
+
+Enable with diagnostics.loop_monitor in config/main.yaml or LOOP_DIAGNOSTICS=1.
+"""
+
+import asyncio
+import os
+from pathlib import Path
+import sys
+import threading
+import time
+import traceback
+
+from src.logging.logger import get_logger
+from src.services.config import load_config_with_main
+from src.services.metrics import registry
+
+project_root = Path(__file__).parent.parent.parent
+
+logger = get_logger("LoopMonitor")
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+loop_lag_seconds = registry.histogram(
+    "paper_mimic_event_loop_lag_seconds",
+    "How late the event loop woke the diagnostics heartbeat",
+    buckets=LAG_BUCKETS,
+)
+loop_blocks = registry.counter(
+    "paper_mimic_event_loop_blocks_total",
+    "Callbacks that blocked the event loop longer than the threshold, by call site",
+    ("site",),
+)
+loop_blocked_seconds = registry.counter(
+    "paper_mimic_event_loop_blocked_seconds_total",
+    "Time the event loop spent blocked, by call site",
+    ("site",),
+)
+
+
+def get_diagnostics_settings() -> dict:
+    """Get event-loop diagnostics settings from config/main.yaml"""
+    config = load_config_with_main("question_config.yaml")
+    cfg = config.get("diagnostics", {})
+
+    enabled = cfg.get("loop_monitor", False)
+    env = os.getenv("LOOP_DIAGNOSTICS")
+    if env is not None:
+        enabled = env.lower() in ("1", "true", "yes", "on")
+
+    return {
+        "enabled": bool(enabled),
+        "interval": cfg.get("interval", 0.1),
+        "block_threshold": cfg.get("block_threshold", 0.1),
+        "stack_depth": cfg.get("stack_depth", 12),
+        "max_sites": cfg.get("max_sites", 50),
+    }
+
+
+# Reported when the loop thread was waiting for I/O: nothing on the loop was
+# running, the thread could not get the GIL (or a CPU) from other threads
+STARVED_SITE = "starved (GIL or CPU held elsewhere)"
+
+
+def _site_index(stack: traceback.StackSummary) -> int:
+    """Index of the innermost frame in this project's code (else the innermost)"""
+    root = str(project_root)
+    for index in range(len(stack) - 1, -1, -1):
+        filename = stack[index].filename
+        if filename.startswith(root) and not filename.endswith("loop_monitor.py"):
+            return index
+    return len(stack) - 1
+
+
+def _format_site(frame: traceback.FrameSummary) -> str:
+    filename = frame.filename
+    if filename.startswith(str(project_root)):
+        filename = os.path.relpath(filename, project_root)
+    else:
+        filename = Path(filename).name
+    return f"{filename}:{frame.lineno} ({frame.name})"
+
+
+class LoopMonitor:
+    """Heartbeat task plus watchdog thread for one event loop"""
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        block_threshold: float = 0.1,
+        stack_depth: int = 12,
+        max_sites: int = 50,
+    ):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.stack_depth = stack_depth
+        self.max_sites = max_sites
+
+        self._sites: set[str] = set()
+        self._lock = threading.Lock()
+        self._sample: tuple[str, list[str]] | None = None
+        self._beat = time.monotonic()
+        self._loop_thread: int | None = None
+        self._task: asyncio.Task | None = None
+        self._stop = threading.Event()
+        self._watchdog: threading.Thread | None = None
+
+    def start(self):
+        """Start monitoring the running event loop"""
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(
+            f"Event-loop monitor started (interval {self.interval}s, "
+            f"block threshold {self.block_threshold * 1000:.0f} ms)"
+        )
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join)
+            self._watchdog = None
+
+    async def _heartbeat(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - started - self.interval)
+            with self._lock:
+                self._beat = now
+                sample, self._sample = self._sample, None
+
+            loop_lag_seconds.observe(lag)
+            if lag >= self.block_threshold:
+                self._report(lag, sample)
+
+    def _watch(self):
+        """Watchdog thread: sample the loop thread's stack while it is blocked"""
+        check_every = max(0.005, self.block_threshold / 2)
+        while not self._stop.wait(check_every):
+            with self._lock:
+                overdue = time.monotonic() - self._beat - self.interval
+                if overdue < self.block_threshold or self._sample is not None:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is None:
+                    continue
+                stack = traceback.extract_stack(frame)
+                del frame
+                self._sample = self._describe(stack)
+
+    def _describe(self, stack: traceback.StackSummary) -> tuple[str, list[str]]:
+        """Call site and the frames to log for a sampled loop-thread stack"""
+        if not stack or stack[-1].filename.endswith("selectors.py"):
+            return STARVED_SITE, []
+
+        # Drop the event loop's own frames, down to the callback it is running
+        for index in range(len(stack) - 1, -1, -1):
+            if stack[index].filename.endswith(os.path.join("asyncio", "events.py")):
+                stack = traceback.StackSummary.from_list(stack[index + 1:])
+                break
+
+        # Frames leading to the call site, then the innermost frame (library code)
+        site = _site_index(stack)
+        lines = traceback.format_list(stack[max(0, site + 1 - self.stack_depth):site + 1])
+        hidden = len(stack) - site - 2
+        if hidden > 0:
+            lines.append(f"  ... {hidden} more frames\n")
+        if hidden >= 0:
+            lines += traceback.format_list(stack[-1:])
+        return _format_site(stack[site]), lines
+
+    def _report(self, lag: float, sample: tuple[str, list[str]] | None):
+        site, stack = sample if sample is not None else ("unknown", [])
+        if site not in self._sites:
+            if len(self._sites) >= self.max_sites:
+                site = "other"
+            else:
+                self._sites.add(site)
+
+        loop_blocks.inc(site=site)
+        loop_blocked_seconds.inc(lag, site=site)
+        message = f"⚠️ Event loop blocked for {lag * 1000:.0f} ms at {site}"
+        if stack:
+            message += "\n" + "".join(stack).rstrip()
+        logger.warning(message)
+
+
+async def start_loop_monitor() -> LoopMonitor | None:
+    """Start the configured monitor on the running loop (None if disabled)"""
+    settings = get_diagnostics_settings()
+    if not settings["enabled"]:
+        return None
+
+    monitor = LoopMonitor(
+        interval=settings["interval"],
+        block_threshold=settings["block_threshold"],
+        stack_depth=settings["stack_depth"],
+        max_sites=settings["max_sites"],
+    )
+    monitor.start()
+    return monitor
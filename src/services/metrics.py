@@ -0,0 +1,374 @@
+"""
+Stage timing, token accounting and Prometheus metrics
+
+Pipeline code wraps its stages in stage_timer("extract") (or reports a
+measured duration with observe_stage()). Every stage feeds a process-wide
+histogram and, when the code runs inside track_session(), the session's
+SessionStats, which becomes the timing breakdown of the summary event.
+
+LLM calls report their latency and token usage with record_llm_call(); the
+model and the stage the call was made in label the series. Token usage is
+also added to every collect_usage() dict active in the calling context,
+which is how AgentCoordinator.token_stats is filled.
+
+GET /metrics renders everything in the Prometheus text format. Metrics are
+per process: job worker processes keep their own.
+"""
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import functools
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+from src.services.config import load_config_with_main
+
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+
+TOKEN_KINDS = ("prompt_tokens", "completion_tokens", "total_tokens")
+
+
+def get_metrics_settings() -> dict:
+    """Get metrics settings from config/main.yaml"""
+    config = load_config_with_main("question_config.yaml")
+    metrics_cfg = config.get("metrics", {})
+
+    return {
+        "enabled": metrics_cfg.get("enabled", True),
+    }
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...], lock: threading.Lock):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = lock
+
+    def _key(self, labels: dict[str, Any]) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def _header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels: Any):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: tuple[float, ...] = STAGE_BUCKETS):
+        super().__init__(*args)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for key, series in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """A set of metrics plus callbacks that report gauges at scrape time"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], list[tuple[str, str, dict[str, Any], float]]]] = []
+
+    def counter(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, documentation, labels, self._lock)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> Gauge:
+        metric = Gauge(name, documentation, labels, self._lock)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self, name: str, documentation: str, labels: tuple[str, ...] = (), buckets=STAGE_BUCKETS
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labels, self._lock, buckets=buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], list[tuple[str, str, dict[str, Any], float]]]):
+        """Register a callback returning (name, help, labels, value) gauge samples"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            lines = [line for metric in self._metrics for line in metric.render()]
+
+        documented = set()
+        for collector in self._collectors:
+            try:
+                samples = collector()
+            except Exception as e:
+                print(f"⚠️ Metrics collector failed: {e}")
+                continue
+            for name, documentation, labels, value in samples:
+                if name not in documented:
+                    documented.add(name)
+                    lines += [f"# HELP {name} {documentation}", f"# TYPE {name} gauge"]
+                names = tuple(labels)
+                lines.append(
+                    f"{name}{_format_labels(names, tuple(labels.values()))} {_format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+stage_seconds = registry.histogram(
+    "paper_mimic_stage_seconds", "Duration of pipeline stages", ("stage",)
+)
+llm_request_seconds = registry.histogram(
+    "paper_mimic_llm_request_seconds",
+    "Latency of single LLM request attempts",
+    ("model", "stage", "outcome"),
+    buckets=LLM_BUCKETS,
+)
+llm_queue_seconds = registry.histogram(
+    "paper_mimic_llm_queue_wait_seconds",
+    "Time LLM requests waited for a scheduler slot",
+    buckets=LLM_BUCKETS,
+)
+llm_tokens = registry.counter(
+    "paper_mimic_llm_tokens_total", "LLM tokens used", ("model", "stage", "kind")
+)
+cache_requests = registry.counter(
+    "paper_mimic_cache_requests_total", "Cache lookups", ("cache", "result")
+)
+active_sessions = registry.gauge(
+    "paper_mimic_active_sessions", "Mimic sessions currently running in this process"
+)
+active_sessions.set(0)
+
+
+@dataclass
+class SessionStats:
+    """Timing and token breakdown of one mimic session"""
+    started: float = field(default_factory=time.perf_counter)
+    stages: dict[str, list[float]] = field(default_factory=dict)  # stage -> [seconds, count]
+    tokens: dict[str, int] = field(default_factory=dict)
+    llm_calls: int = 0
+    llm_seconds: float = 0.0
+
+    def add_stage(self, stage: str, seconds: float):
+        entry = self.stages.setdefault(stage, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        """JSON-friendly breakdown; stages run concurrently may add up to more than total"""
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 3),
+            "stages": {
+                stage: {"seconds": round(seconds, 3), "count": count}
+                for stage, (seconds, count) in self.stages.items()
+            },
+            "llm_calls": self.llm_calls,
+            "llm_seconds": round(self.llm_seconds, 3),
+            "tokens": dict(self.tokens),
+        }
+
+
+current_session_stats: ContextVar[SessionStats | None] = ContextVar(
+    "current_session_stats", default=None
+)
+current_stage: ContextVar[str] = ContextVar("current_stage", default="other")
+_usage_sinks: ContextVar[tuple[dict, ...]] = ContextVar("usage_sinks", default=())
+
+
+def observe_stage(stage: str, seconds: float):
+    """Record a measured stage duration"""
+    stage_seconds.observe(seconds, stage=stage)
+    stats = current_session_stats.get()
+    if stats is not None:
+        stats.add_stage(stage, seconds)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """Time a block as a pipeline stage; LLM calls inside it are labelled with the stage"""
+    token = current_stage.set(stage)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        current_stage.reset(token)
+        observe_stage(stage, time.perf_counter() - started)
+
+
+def record_cache(cache: str, hit: bool):
+    cache_requests.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def add_usage(target: dict, usage: dict[str, int]):
+    """Add prompt/completion/total token counts into a dict"""
+    for kind in TOKEN_KINDS:
+        target[kind] = target.get(kind, 0) + usage.get(kind, 0)
+
+
+def usage_from_response(usage: Any) -> dict[str, int]:
+    """Token counts from an OpenAI usage object (or dict); missing fields are 0"""
+    if usage is None:
+        return {}
+    get = usage.get if isinstance(usage, dict) else lambda name: getattr(usage, name, None)
+    counts = {kind: int(get(kind) or 0) for kind in TOKEN_KINDS}
+    if not counts["total_tokens"]:
+        counts["total_tokens"] = counts["prompt_tokens"] + counts["completion_tokens"]
+    return counts
+
+
+@contextmanager
+def collect_usage(target: dict) -> Iterator[dict]:
+    """Add the token usage of LLM calls made in this context to target"""
+    token = _usage_sinks.set(_usage_sinks.get() + (target,))
+    try:
+        yield target
+    finally:
+        _usage_sinks.reset(token)
+
+
+def record_llm_call(model: str, seconds: float, outcome: str = "ok", usage: dict[str, int] | None = None):
+    """Record one LLM request attempt"""
+    stage = current_stage.get()
+    llm_request_seconds.observe(seconds, model=model, stage=stage, outcome=outcome)
+
+    stats = current_session_stats.get()
+    if stats is not None:
+        stats.llm_calls += 1
+        stats.llm_seconds += seconds
+
+    if not usage:
+        return
+    for kind in ("prompt_tokens", "completion_tokens"):
+        if usage.get(kind):
+            llm_tokens.inc(usage[kind], model=model, stage=stage, kind=kind.removesuffix("_tokens"))
+    if stats is not None:
+        add_usage(stats.tokens, usage)
+    for sink in _usage_sinks.get():
+        add_usage(sink, usage)
+
+
+def track_session(func):
+    """
+    Run a session coroutine with its own SessionStats
+
+    The stats are available to the coroutine through current_session_stats;
+    the whole run is observed as the "session" stage.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        stats = SessionStats()
+        token = current_session_stats.set(stats)
+        active_sessions.inc()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            active_sessions.dec()
+            current_session_stats.reset(token)
+            stage_seconds.observe(time.perf_counter() - stats.started, stage="session")
+
+    return wrapper
+
+
+def _runtime_gauges() -> list[tuple[str, str, dict[str, Any], float]]:
+    """LLM scheduler and job queue state at scrape time"""
+    from src.services import llm_scheduler
+    from src.services.jobs import get_job_store
+
+    samples = []
+    scheduler = llm_scheduler._scheduler
+    if scheduler is not None:
+        samples += [
+            ("paper_mimic_llm_queued", "LLM requests waiting for a slot", {}, scheduler.queued),
+            ("paper_mimic_llm_inflight", "LLM requests in flight", {}, scheduler.inflight),
+            ("paper_mimic_llm_capacity", "Current LLM concurrency limit", {}, scheduler.capacity),
+        ]
+    samples.append(
+        ("paper_mimic_job_queue_depth", "Jobs waiting for a worker", {}, get_job_store().queue_depth())
+    )
+    return samples
+
+
+registry.add_collector(_runtime_gauges)
+
+
+def render_metrics() -> str:
+    return registry.render()
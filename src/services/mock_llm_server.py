@@ -0,0 +1,449 @@
+"""
+Local mock of an OpenAI-compatible API for offline testing
+
+Serves just enough of the API for the mimic pipeline without a provider key:
+
+- POST /v1/chat/completions: question extraction (questions found in the
+  paper's "Question N." lines), single and batched mimic generation, with
+  optional stream=True
+- POST /v1/files, GET /v1/files/{id}, GET /v1/files/{id}/content
+- POST /v1/batches, GET /v1/batches/{id}, POST /v1/batches/{id}/cancel
+
+Chat completions wait a first-token latency drawn from --latency and then
+emit completion tokens at --tokens-per-second. --error-rate makes a share of
+chat and batch requests fail with --error-status (429 responses carry a
+Retry-After). --seed makes latencies and errors reproducible, which the
+benchmarks rely on.
+
+Batches move validating -> in_progress -> completed over --batch-delay
+seconds. --batch-outcome failed makes them fail validation; expired lets
+them expire with only the first half of the requests done. State lives in
+memory only.
+
+Usage:
+    python -m src.services.mock_llm_server --port 8100 --batch-delay 5
+    python -m src.services.mock_llm_server --latency lognormal:0.8,0.5 --tokens-per-second 60
+    OPENAI_API_KEY=mock OPENAI_BASE_URL=http://127.0.0.1:8100/v1 \\
+        python src/agents/question/tools/exam_mimic.py --paper 2211asm1 --kb math2211 --batch-api
+"""
+
+import asyncio
+import json
+import math
+import random
+import re
+import time
+import uuid
+from typing import Any
+
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+# "Question 3." / "3)" / "## 3." at the start of a line of the paper
+QUESTION_LINE = re.compile(r"^\s*(?:#+\s*)?(?:Question\s+)?(\d+)[.):]\s+(.*)$", re.IGNORECASE)
+BATCH_ITEM_LINE = re.compile(r"^### Item (\d+)$", re.MULTILINE)
+BATCH_OUTCOMES = ("completed", "failed", "expired")
+
+
+class LatencyModel:
+    """
+    First-token latency distribution, parsed from "kind:params"
+
+    fixed:S, uniform:MIN,MAX, lognormal:MEDIAN,SIGMA or exponential:MEAN
+    (seconds).
+    """
+
+    def __init__(self, spec: str = "fixed:0", rng: random.Random | None = None):
+        self.spec = spec
+        self.rng = rng or random.Random()
+        kind, _, params = spec.partition(":")
+        self.kind = kind.strip().lower()
+        self.params = [float(p) for p in params.split(",") if p.strip()]
+        expected = {"fixed": 1, "uniform": 2, "lognormal": 2, "exponential": 1}
+        if self.kind not in expected or len(self.params) != expected[self.kind]:
+            raise ValueError(f"Invalid latency spec: {spec}")
+
+    def sample(self) -> float:
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return self.rng.uniform(*self.params)
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return median * math.exp(self.rng.gauss(0, sigma)) if median > 0 else 0.0
+        mean = self.params[0]
+        return self.rng.expovariate(1 / mean) if mean > 0 else 0.0
+
+
+def _mimic_question(reference: str, completion_tokens: int = 0) -> dict[str, Any]:
+    answer = "Mock answer"
+    if completion_tokens:
+        # Pad to roughly the requested size (about 4 characters per token)
+        answer += " lorem" * max(0, (completion_tokens * 4 - 200) // 6)
+    return {
+        "question": {
+            "question": f"Mock variant of: {reference[:80]}",
+            "type": "mock",
+            "answer": answer,
+        },
+        "validation": {"relevance": 0.9, "difficulty": "medium"},
+    }
+
+
+def mock_extraction(prompt: str) -> str:
+    """Questions of an extraction prompt, one per "Question N." line"""
+    content = prompt.split("Exam paper content (Markdown format):", 1)[-1]
+    content = content.split("Available image files:", 1)[0]
+
+    questions: list[dict[str, Any]] = []
+    for line in content.splitlines():
+        match = QUESTION_LINE.match(line)
+        if match:
+            questions.append(
+                {
+                    "question_number": match.group(1),
+                    "question_text": match.group(2).strip(),
+                    "images": [],
+                }
+            )
+        elif questions and line.strip() and not line.startswith("## Page"):
+            questions[-1]["question_text"] += " " + line.strip()
+    return json.dumps({"questions": questions})
+
+
+def mock_generation(messages: list[dict[str, Any]], completion_tokens: int = 0) -> str:
+    """Canned mimic question JSON echoing the start of the reference"""
+    prompt = messages[-1].get("content", "") if messages else ""
+    if "Exam paper content (Markdown format):" in prompt:
+        return mock_extraction(prompt)
+
+    items = BATCH_ITEM_LINE.findall(prompt)
+    if items:
+        # Batched generation: one entry per "### Item n" block
+        entries = []
+        for item_id, block in zip(items, BATCH_ITEM_LINE.split(prompt)[2::2]):
+            reference = block.split("Reference Question:", 1)[-1].strip().splitlines()
+            entries.append(
+                {"id": int(item_id), **_mimic_question(reference[0] if reference else "", completion_tokens)}
+            )
+        return json.dumps({"items": entries})
+
+    reference = prompt.split("Reference Question:", 1)[-1].strip().splitlines()
+    preview = reference[0] if reference else ""
+    return json.dumps(_mimic_question(preview, completion_tokens))
+
+
+def chat_completion(body: dict[str, Any], completion_tokens: int = 0) -> dict[str, Any]:
+    content = mock_generation(body.get("messages", []), completion_tokens)
+    prompt_tokens = sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // 4
+    completion_tokens = len(content) // 4
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "mock"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def create_app(
+    batch_delay: float = 2.0,
+    error_rate: float = 0.0,
+    latency: str = "fixed:0",
+    tokens_per_second: float = 0.0,
+    completion_tokens: int = 0,
+    error_status: int = 500,
+    seed: int | None = None,
+    batch_outcome: str = "completed",
+) -> FastAPI:
+    """Build the mock API app"""
+    if batch_outcome not in BATCH_OUTCOMES:
+        raise ValueError(f"Unknown batch outcome: {batch_outcome}")
+    app = FastAPI(title="Mock LLM API")
+    rng = random.Random(seed)
+    latency_model = LatencyModel(latency, rng)
+    files: dict[str, dict[str, Any]] = {}
+    batches: dict[str, dict[str, Any]] = {}
+    tasks: set[asyncio.Task] = set()
+
+    def store_file(content: bytes, filename: str, purpose: str) -> dict[str, Any]:
+        file_id = f"file-{uuid.uuid4().hex[:24]}"
+        files[file_id] = {
+            "meta": {
+                "id": file_id,
+                "object": "file",
+                "bytes": len(content),
+                "created_at": int(time.time()),
+                "filename": filename,
+                "purpose": purpose,
+                "status": "processed",
+            },
+            "content": content,
+        }
+        return files[file_id]["meta"]
+
+    async def run_batch(batch: dict[str, Any]):
+        lines = [
+            json.loads(raw)
+            for raw in files[batch["input_file_id"]]["content"].decode("utf-8").splitlines()
+            if raw.strip()
+        ]
+        batch["request_counts"]["total"] = len(lines)
+        await asyncio.sleep(batch_delay / 2)
+        if batch["status"] == "cancelling":
+            batch.update(status="cancelled", cancelled_at=int(time.time()))
+            return
+        if batch_outcome == "failed":
+            batch.update(
+                status="failed",
+                failed_at=int(time.time()),
+                errors={
+                    "object": "list",
+                    "data": [{"code": "invalid_request", "message": "Mock validation failure"}],
+                },
+            )
+            return
+        batch.update(status="in_progress", in_progress_at=int(time.time()))
+        await asyncio.sleep(batch_delay / 2)
+        if batch["status"] == "cancelling":
+            batch.update(status="cancelled", cancelled_at=int(time.time()))
+            return
+
+        output, errors = [], []
+        # An expired batch only got through the first half of its requests
+        finished = len(lines) // 2 if batch_outcome == "expired" else len(lines)
+        for number, line in enumerate(lines):
+            record = {"id": f"batch_req_{uuid.uuid4().hex[:24]}", "custom_id": line.get("custom_id")}
+            if number >= finished:
+                record["response"] = None
+                record["error"] = {
+                    "code": "batch_expired",
+                    "message": "This request could not be executed before the completion window expired.",
+                }
+                errors.append(record)
+            elif rng.random() < error_rate:
+                record["response"] = {
+                    "status_code": 500,
+                    "request_id": uuid.uuid4().hex,
+                    "body": {"error": {"message": "Mock server error", "type": "server_error"}},
+                }
+                record["error"] = None
+                errors.append(record)
+            else:
+                record["response"] = {
+                    "status_code": 200,
+                    "request_id": uuid.uuid4().hex,
+                    "body": chat_completion(line.get("body", {}), completion_tokens),
+                }
+                record["error"] = None
+                output.append(record)
+
+        def dump(records: list[dict[str, Any]]) -> bytes:
+            return "".join(json.dumps(r) + "\n" for r in records).encode("utf-8")
+
+        if output:
+            batch["output_file_id"] = store_file(dump(output), "batch_output.jsonl", "batch_output")["id"]
+        if errors:
+            batch["error_file_id"] = store_file(dump(errors), "batch_errors.jsonl", "batch_output")["id"]
+        batch["request_counts"].update(completed=len(output), failed=len(errors))
+        if batch_outcome == "expired":
+            batch.update(status="expired", expired_at=int(time.time()))
+        else:
+            batch.update(status="completed", completed_at=int(time.time()))
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.post("/v1/chat/completions")
+    async def create_chat_completion(request: Request):
+        body = await request.json()
+        # Draw from the RNG in arrival order so a seeded run is repeatable
+        first_token = latency_model.sample()
+        failed = rng.random() < error_rate
+
+        await asyncio.sleep(first_token)
+        if failed:
+            headers = {"retry-after": "1"} if error_status == 429 else None
+            return JSONResponse(
+                {"error": {"message": "Mock server error", "type": "server_error"}},
+                status_code=error_status,
+                headers=headers,
+            )
+
+        completion = chat_completion(body, completion_tokens)
+        tokens = completion["usage"]["completion_tokens"]
+        if not body.get("stream"):
+            if tokens_per_second:
+                await asyncio.sleep(tokens / tokens_per_second)
+            return completion
+
+        content = completion["choices"][0]["message"]["content"]
+        # 16 characters (about 4 tokens) per chunk
+        chunk_delay = 4 / tokens_per_second if tokens_per_second else 0
+
+        async def events():
+            for i in range(0, len(content), 16):
+                chunk = {
+                    "id": completion["id"],
+                    "object": "chat.completion.chunk",
+                    "created": completion["created"],
+                    "model": completion["model"],
+                    "choices": [{"index": 0, "delta": {"content": content[i:i + 16]}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                if chunk_delay:
+                    await asyncio.sleep(chunk_delay)
+            if (body.get("stream_options") or {}).get("include_usage"):
+                usage_chunk = {
+                    "id": completion["id"],
+                    "object": "chat.completion.chunk",
+                    "created": completion["created"],
+                    "model": completion["model"],
+                    "choices": [],
+                    "usage": completion["usage"],
+                }
+                yield f"data: {json.dumps(usage_chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/v1/files")
+    async def upload_file(file: UploadFile = File(...), purpose: str = Form(...)):
+        return store_file(await file.read(), file.filename or "upload.jsonl", purpose)
+
+    @app.get("/v1/files/{file_id}")
+    async def get_file(file_id: str):
+        if file_id not in files:
+            raise HTTPException(status_code=404, detail="File not found")
+        return files[file_id]["meta"]
+
+    @app.get("/v1/files/{file_id}/content")
+    async def get_file_content(file_id: str):
+        if file_id not in files:
+            raise HTTPException(status_code=404, detail="File not found")
+        return PlainTextResponse(files[file_id]["content"].decode("utf-8"))
+
+    @app.post("/v1/batches")
+    async def create_batch(request: Request):
+        body = await request.json()
+        if body.get("input_file_id") not in files:
+            raise HTTPException(status_code=400, detail="Unknown input_file_id")
+
+        batch_id = f"batch_{uuid.uuid4().hex[:24]}"
+        batch = {
+            "id": batch_id,
+            "object": "batch",
+            "endpoint": body.get("endpoint", "/v1/chat/completions"),
+            "input_file_id": body["input_file_id"],
+            "completion_window": body.get("completion_window", "24h"),
+            "status": "validating",
+            "output_file_id": None,
+            "error_file_id": None,
+            "created_at": int(time.time()),
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            "metadata": body.get("metadata"),
+        }
+        batches[batch_id] = batch
+
+        task = asyncio.create_task(run_batch(batch))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        return batch
+
+    @app.get("/v1/batches/{batch_id}")
+    async def get_batch(batch_id: str):
+        if batch_id not in batches:
+            raise HTTPException(status_code=404, detail="Batch not found")
+        return batches[batch_id]
+
+    @app.post("/v1/batches/{batch_id}/cancel")
+    async def cancel_batch(batch_id: str):
+        if batch_id not in batches:
+            raise HTTPException(status_code=404, detail="Batch not found")
+        batch = batches[batch_id]
+        if batch["status"] in ("validating", "in_progress"):
+            batch.update(status="cancelling", cancelling_at=int(time.time()))
+        return batch
+
+    return app
+
+
+def main():
+    """Command-line entry point."""
+    import argparse
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible API server")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Bind address")
+    parser.add_argument("--port", type=int, default=8100, help="Port")
+    parser.add_argument(
+        "--batch-delay", type=float, default=2.0, help="Seconds a batch takes to complete"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Share of chat and batch requests that fail (0-1)"
+    )
+    parser.add_argument(
+        "--error-status", type=int, default=500, help="HTTP status of failed chat requests (e.g. 429)"
+    )
+    parser.add_argument(
+        "--latency",
+        type=str,
+        default="fixed:0",
+        help="First-token latency: fixed:S, uniform:MIN,MAX, lognormal:MEDIAN,SIGMA or exponential:MEAN",
+    )
+    parser.add_argument(
+        "--tokens-per-second", type=float, default=0.0, help="Completion token rate (0 = instant)"
+    )
+    parser.add_argument(
+        "--completion-tokens",
+        type=int,
+        default=0,
+        help="Pad generated answers to about this many tokens (0 = short canned answer)",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for latencies and errors")
+    parser.add_argument(
+        "--batch-outcome",
+        choices=BATCH_OUTCOMES,
+        default="completed",
+        help="How batches end: completed, failed (validation) or expired (half done)",
+    )
+    args = parser.parse_args()
+
+    try:
+        LatencyModel(args.latency)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"🧪 Mock LLM API on http://{args.host}:{args.port}/v1 (latency {args.latency})")
+    uvicorn.run(
+        create_app(
+            batch_delay=args.batch_delay,
+            error_rate=args.error_rate,
+            latency=args.latency,
+            tokens_per_second=args.tokens_per_second,
+            completion_tokens=args.completion_tokens,
+            error_status=args.error_status,
+            seed=args.seed,
+            batch_outcome=args.batch_outcome,
+        ),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""Per-session progress and log channels"""
+
+import asyncio
+from collections import deque
+from contextvars import ContextVar
+import re
+import sys
+import threading
+import time
+from typing import Any, Awaitable, Callable
+
+from src.services.config import load_config_with_main
+
+# ANSI escape sequence pattern for stripping color codes
+ANSI_ESCAPE_PATTERN = re.compile(r"\x1b\[[0-9;]*[a-zA-Z]")
+
+# Channel of the session whose code is currently running (propagates into
+# tasks and asyncio.to_thread calls started by that session)
+current_channel: ContextVar["SessionChannel | None"] = ContextVar("current_channel", default=None)
+
+
+def get_progress_settings() -> dict:
+    """Get progress channel settings from config/main.yaml"""
+    config = load_config_with_main("question_config.yaml")
+    progress_cfg = config.get("progress", {})
+
+    return {
+        "max_pending_events": progress_cfg.get("max_pending_events", 256),
+        "max_log_lines": progress_cfg.get("max_log_lines", 500),
+        "log_batch_size": progress_cfg.get("log_batch_size", 50),
+        "log_flush_interval": progress_cfg.get("log_flush_interval", 0.1),
+    }
+
+
+class SessionChannel:
+    """
+    Bounded, ordered outbound channel for one client session
+
+    Events (progress, results, ...) are never dropped: once
+    max_pending_events are waiting, send_event() blocks until the client
+    catches up. Events sent with a coalesce_key replace a pending event with
+    the same key instead of queueing another one. Log lines use a
+    drop-oldest buffer of max_log_lines, collapse consecutive repeats, and
+    are sent several lines per frame.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[dict[str, Any]], Awaitable[Any]],
+        max_pending_events: int = 256,
+        max_log_lines: int = 500,
+        log_batch_size: int = 50,
+        log_flush_interval: float = 0.1,
+    ):
+        self._send = send
+        self.max_pending_events = max_pending_events
+        self.max_log_lines = max_log_lines
+        self.log_batch_size = log_batch_size
+        self.log_flush_interval = log_flush_interval
+
+        self._loop = asyncio.get_running_loop()
+        self._events: deque[dict[str, Any]] = deque()
+        self._coalesce: dict[str, dict[str, Any]] = {}
+        self._logs: deque[list] = deque()
+        self._logs_lock = threading.Lock()
+        self.dropped_logs = 0
+
+        self._wakeup = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._closed = False
+        self.broken = False
+        self._pusher = self._loop.create_task(self._push())
+
+    @classmethod
+    def from_config(cls, send: Callable[[dict[str, Any]], Awaitable[Any]]) -> "SessionChannel":
+        return cls(send, **get_progress_settings())
+
+    async def send_event(self, event: dict[str, Any], coalesce_key: str | None = None):
+        """Queue an event for the client, waiting while the queue is full"""
+        if self.broken or self._closed:
+            return
+
+        if coalesce_key is not None:
+            pending = self._coalesce.get(coalesce_key)
+            if pending is not None:
+                # Still queued: replace its content, keeping the marker the
+                # pusher uses to release the key once the event is sent
+                pending.clear()
+                pending.update(event)
+                pending["_coalesce_key"] = coalesce_key
+                return
+
+        while len(self._events) >= self.max_pending_events and not self.broken:
+            self._drained.clear()
+            await self._drained.wait()
+        if self.broken:
+            return
+
+        event = dict(event)
+        self._events.append(event)
+        if coalesce_key is not None:
+            event["_coalesce_key"] = coalesce_key
+            self._coalesce[coalesce_key] = event
+        self._wakeup.set()
+
+    def write_log(self, text: str):
+        """Buffer a log line (thread-safe, never blocks)"""
+        if self.broken or self._closed:
+            return
+
+        with self._logs_lock:
+            if self._logs and self._logs[-1][0] == text:
+                self._logs[-1][1] += 1
+            else:
+                if len(self._logs) >= self.max_log_lines:
+                    self._logs.popleft()
+                    self.dropped_logs += 1
+                self._logs.append([text, 1])
+
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _take_logs(self) -> tuple[list[str], int]:
+        with self._logs_lock:
+            count = min(len(self._logs), self.log_batch_size)
+            lines = []
+            for _ in range(count):
+                text, repeats = self._logs.popleft()
+                lines.append(text if repeats == 1 else f"{text} (x{repeats})")
+            dropped, self.dropped_logs = self.dropped_logs, 0
+        return lines, dropped
+
+    async def _flush_logs(self):
+        while True:
+            lines, dropped = self._take_logs()
+            if not lines:
+                return
+            message = {
+                "type": "log",
+                "content": "\n".join(lines),
+                "lines": lines,
+                "timestamp": time.time(),
+            }
+            if dropped:
+                message["dropped"] = dropped
+            await self._send(message)
+
+    async def _push(self):
+        """Single writer: flush logs, then events, in arrival order"""
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+
+                # Let a burst of log lines accumulate into one frame
+                if not self._events and not self._closed and self.log_flush_interval:
+                    await asyncio.sleep(self.log_flush_interval)
+
+                await self._flush_logs()
+                while self._events:
+                    event = self._events.popleft()
+                    key = event.pop("_coalesce_key", None)
+                    if key is not None:
+                        self._coalesce.pop(key, None)
+                    self._drained.set()
+                    await self._send(event)
+                    await self._flush_logs()
+
+                if self._closed and not self._events and not self._logs:
+                    return
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Client is gone: stop buffering and release blocked producers
+            self.broken = True
+            self._events.clear()
+            self._coalesce.clear()
+            with self._logs_lock:
+                self._logs.clear()
+            self._drained.set()
+
+    async def close(self, timeout: float = 5.0):
+        """Flush everything still pending and stop the pusher"""
+        self._closed = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._pusher), timeout=timeout)
+        except (asyncio.TimeoutError, Exception):
+            self._pusher.cancel()
+
+
+class _StdoutRouter:
+    """sys.stdout proxy that copies prints to the current session's channel"""
+
+    def __init__(self, original):
+        self.original = original
+
+    def write(self, message):
+        # Write to terminal first (with ANSI codes for color)
+        result = self.original.write(message)
+        channel = current_channel.get()
+        if channel is not None:
+            # Strip ANSI escape codes before sending to frontend
+            clean_message = ANSI_ESCAPE_PATTERN.sub("", message).strip()
+            if clean_message:
+                channel.write_log(clean_message)
+        return result
+
+    def flush(self):
+        self.original.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.original, name)
+
+
+def install_stdout_capture():
+    """Route prints to session channels (idempotent, process-wide, installed once)"""
+    if not isinstance(sys.stdout, _StdoutRouter):
+        sys.stdout = _StdoutRouter(sys.stdout)
+
+
+def uninstall_stdout_capture():
+    """Restore the original sys.stdout"""
+    if isinstance(sys.stdout, _StdoutRouter):
+        sys.stdout = sys.stdout.original
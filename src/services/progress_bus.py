@@ -0,0 +1,436 @@
+"""
+Pluggable pub/sub for session progress events
+
+Every event a /api/question/mimic session sends to its client is also
+published to the session's topic on a progress bus. A client that lost its
+connection can attach to the topic again, from any API worker when the
+backend is shared, and replay what it missed (see the "attach" mode of the
+WebSocket).
+
+Backends (progress.bus.backend in config/main.yaml):
+
+- ``memory``: in-process only; reconnects must reach the same worker
+- ``sqlite``: a SQLite file shared by all workers on one machine
+- ``redis``: Redis Streams (or any Redis-compatible server); needs the
+  optional ``redis`` package
+
+Events get increasing integer sequence numbers per topic. A topic is
+closed when its session ends; subscribers stop after the last event of a
+closed topic. Topics are kept for ``retention_seconds`` and hold at most
+``max_events`` events. Sessions publish through a TopicPublisher, which
+numbers events itself and writes them to the bus in a background task, so
+a slow backend never holds up the live WebSocket.
+"""
+
+import asyncio
+from contextlib import closing
+from dataclasses import dataclass, field
+import json
+import os
+from pathlib import Path
+import sqlite3
+import sys
+import time
+from typing import Any, AsyncIterator
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.services.config import load_config_with_main
+
+BUS_BACKENDS = ("memory", "sqlite", "redis")
+
+
+def get_bus_settings() -> dict:
+    """Get progress bus settings from config/main.yaml"""
+    config = load_config_with_main("question_config.yaml", project_root)
+    bus_cfg = config.get("progress", {}).get("bus", {})
+
+    sqlite_path = Path(bus_cfg.get("sqlite_path", "data/user/question/progress.sqlite3"))
+    if not sqlite_path.is_absolute():
+        sqlite_path = project_root / sqlite_path
+
+    backend = str(os.getenv("PROGRESS_BUS") or bus_cfg.get("backend", "memory"))
+    if backend not in BUS_BACKENDS:
+        print(f"⚠️ Unknown progress bus backend '{backend}', using 'memory'")
+        backend = "memory"
+
+    return {
+        "backend": backend,
+        "sqlite_path": sqlite_path,
+        "redis_url": os.getenv("REDIS_URL") or bus_cfg.get("redis_url", "redis://localhost:6379/0"),
+        "retention_seconds": bus_cfg.get("retention_seconds", 900),
+        "max_events": bus_cfg.get("max_events", 2000),
+        "poll_interval": bus_cfg.get("poll_interval", 0.25),
+    }
+
+
+class ProgressBus:
+    """Interface of a progress bus backend"""
+
+    async def publish(self, topic: str, event: dict[str, Any], seq: int | None = None) -> int:
+        """Append an event to a topic (as number seq if given); returns its sequence number"""
+        raise NotImplementedError
+
+    async def close_topic(self, topic: str):
+        """Mark a topic as finished (no more events will be published)"""
+        raise NotImplementedError
+
+    async def exists(self, topic: str) -> bool:
+        raise NotImplementedError
+
+    def subscribe(self, topic: str, after: int = 0) -> AsyncIterator[tuple[int, dict[str, Any]]]:
+        """Yield (seq, event) after ``after`` until the topic is closed"""
+        raise NotImplementedError
+
+    async def aclose(self):
+        """Release connections held by the backend"""
+
+
+@dataclass
+class _MemoryTopic:
+    events: list = field(default_factory=list)
+    next_seq: int = 1
+    closed: bool = False
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class MemoryBus(ProgressBus):
+    """Per-process bus; subscribers are woken directly on publish"""
+
+    def __init__(self, retention_seconds: float = 900, max_events: int = 2000):
+        self.retention_seconds = retention_seconds
+        self.max_events = max_events
+        self._topics: dict[str, _MemoryTopic] = {}
+
+    def _notify(self, topic: _MemoryTopic):
+        topic.changed.set()
+        topic.changed = asyncio.Event()
+
+    async def publish(self, topic: str, event: dict[str, Any], seq: int | None = None) -> int:
+        state = self._topics.setdefault(topic, _MemoryTopic())
+        if seq is None:
+            seq = state.next_seq
+        state.next_seq = max(state.next_seq, seq + 1)
+        state.events.append((seq, event))
+        if len(state.events) > self.max_events:
+            del state.events[: len(state.events) - self.max_events]
+        self._notify(state)
+        return seq
+
+    async def close_topic(self, topic: str):
+        state = self._topics.setdefault(topic, _MemoryTopic())
+        state.closed = True
+        self._notify(state)
+        asyncio.get_running_loop().call_later(
+            self.retention_seconds, self._topics.pop, topic, None
+        )
+
+    async def exists(self, topic: str) -> bool:
+        return topic in self._topics
+
+    async def subscribe(self, topic: str, after: int = 0):
+        while True:
+            state = self._topics.get(topic)
+            if state is None:
+                return
+            changed = state.changed
+            pending = [(seq, event) for seq, event in state.events if seq > after]
+            for seq, event in pending:
+                after = seq
+                yield seq, event
+            if not pending:
+                if state.closed:
+                    return
+                await changed.wait()
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS progress_topics (
+    topic TEXT PRIMARY KEY,
+    closed INTEGER NOT NULL DEFAULT 0,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS progress_events (
+    topic TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    PRIMARY KEY (topic, seq)
+);
+"""
+
+
+class SQLiteBus(ProgressBus):
+    """Bus in a SQLite file shared by the workers of one machine (polling)"""
+
+    def __init__(
+        self,
+        db_path: Path,
+        retention_seconds: float = 900,
+        max_events: int = 2000,
+        poll_interval: float = 0.25,
+    ):
+        self.db_path = Path(db_path)
+        self.retention_seconds = retention_seconds
+        self.max_events = max_events
+        self.poll_interval = poll_interval
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SQLITE_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _publish(self, topic: str, event: dict[str, Any], seq: int | None = None) -> int:
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if seq is None:
+                seq = conn.execute(
+                    "SELECT COALESCE(MAX(seq), 0) + 1 FROM progress_events WHERE topic = ?",
+                    (topic,),
+                ).fetchone()[0]
+            conn.execute(
+                "INSERT INTO progress_events (topic, seq, event) VALUES (?, ?, ?)",
+                (topic, seq, json.dumps(event, ensure_ascii=False)),
+            )
+            conn.execute(
+                "INSERT INTO progress_topics (topic, updated) VALUES (?, ?) "
+                "ON CONFLICT (topic) DO UPDATE SET updated = excluded.updated",
+                (topic, now),
+            )
+            if seq > self.max_events:
+                conn.execute(
+                    "DELETE FROM progress_events WHERE topic = ? AND seq <= ?",
+                    (topic, seq - self.max_events),
+                )
+        return seq
+
+    def _close_topic(self, topic: str):
+        now = time.time()
+        cutoff = now - self.retention_seconds
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT INTO progress_topics (topic, closed, updated) VALUES (?, 1, ?) "
+                "ON CONFLICT (topic) DO UPDATE SET closed = 1, updated = excluded.updated",
+                (topic, now),
+            )
+            # Expire old sessions while we are here
+            conn.execute(
+                "DELETE FROM progress_events WHERE topic IN "
+                "(SELECT topic FROM progress_topics WHERE updated < ?)",
+                (cutoff,),
+            )
+            conn.execute("DELETE FROM progress_topics WHERE updated < ?", (cutoff,))
+
+    def _read(self, topic: str, after: int) -> tuple[bool | None, list[tuple[int, dict[str, Any]]]]:
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT closed FROM progress_topics WHERE topic = ?", (topic,)
+            ).fetchone()
+            rows = conn.execute(
+                "SELECT seq, event FROM progress_events WHERE topic = ? AND seq > ? "
+                "ORDER BY seq LIMIT 500",
+                (topic, after),
+            ).fetchall()
+        closed = None if row is None else bool(row[0])
+        return closed, [(seq, json.loads(event)) for seq, event in rows]
+
+    async def publish(self, topic: str, event: dict[str, Any], seq: int | None = None) -> int:
+        return await asyncio.to_thread(self._publish, topic, event, seq)
+
+    async def close_topic(self, topic: str):
+        await asyncio.to_thread(self._close_topic, topic)
+
+    async def exists(self, topic: str) -> bool:
+        closed, _ = await asyncio.to_thread(self._read, topic, 0)
+        return closed is not None
+
+    async def subscribe(self, topic: str, after: int = 0):
+        while True:
+            # The closed flag is read before the events, so none are missed
+            closed, events = await asyncio.to_thread(self._read, topic, after)
+            for seq, event in events:
+                after = seq
+                yield seq, event
+            if not events:
+                if closed is None or closed:
+                    return
+                await asyncio.sleep(self.poll_interval)
+
+
+class RedisBus(ProgressBus):
+    """
+    Bus on Redis Streams
+
+    Each topic is a stream whose entry ids are ``0-<seq>``; an entry with an
+    ``end`` field closes it. Subscribers block on XREAD instead of polling.
+    """
+
+    END_FIELD = "end"
+
+    def __init__(self, url: str, retention_seconds: float = 900, max_events: int = 2000):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "The redis progress bus needs the 'redis' package (pip install redis)"
+            ) from e
+
+        self.retention_seconds = int(retention_seconds)
+        self.max_events = max_events
+        self._redis = redis.from_url(url, decode_responses=True)
+        # Sequence counters of topics published from this process
+        self._seq: dict[str, int] = {}
+
+    @staticmethod
+    def _key(topic: str) -> str:
+        return f"paper-mimic:progress:{topic}"
+
+    async def _next_seq(self, topic: str) -> int:
+        if topic not in self._seq:
+            last = await self._redis.xrevrange(self._key(topic), count=1)
+            self._seq[topic] = int(last[0][0].split("-")[1]) if last else 0
+        self._seq[topic] += 1
+        return self._seq[topic]
+
+    async def publish(self, topic: str, event: dict[str, Any], seq: int | None = None) -> int:
+        if seq is None:
+            seq = await self._next_seq(topic)
+        else:
+            self._seq[topic] = max(self._seq.get(topic, 0), seq)
+        key = self._key(topic)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.xadd(
+                key,
+                {"event": json.dumps(event, ensure_ascii=False)},
+                id=f"0-{seq}",
+                maxlen=self.max_events,
+                approximate=True,
+            )
+            pipe.expire(key, self.retention_seconds)
+            await pipe.execute()
+        return seq
+
+    async def close_topic(self, topic: str):
+        seq = await self._next_seq(topic)
+        key = self._key(topic)
+        await self._redis.xadd(key, {self.END_FIELD: "1"}, id=f"0-{seq}")
+        await self._redis.expire(key, self.retention_seconds)
+        self._seq.pop(topic, None)
+
+    async def exists(self, topic: str) -> bool:
+        return bool(await self._redis.exists(self._key(topic)))
+
+    async def subscribe(self, topic: str, after: int = 0):
+        key = self._key(topic)
+        if not await self._redis.exists(key):
+            return
+        last_id = f"0-{after}"
+        while True:
+            response = await self._redis.xread({key: last_id}, count=500, block=5000)
+            if not response:
+                if not await self._redis.exists(key):
+                    return  # expired
+                continue
+            for entry_id, fields in response[0][1]:
+                last_id = entry_id
+                if self.END_FIELD in fields:
+                    return
+                yield int(entry_id.split("-")[1]), json.loads(fields["event"])
+
+    async def aclose(self):
+        await self._redis.aclose()
+
+
+class TopicPublisher:
+    """
+    Publish one session's events to its topic without blocking the sender
+
+    publish() numbers the event and returns at once; a background task
+    writes events to the bus in order. A failed write is logged and
+    skipped, so the live connection never waits on the bus.
+    """
+
+    def __init__(self, bus: ProgressBus, topic: str):
+        self.bus = bus
+        self.topic = topic
+        self.seq = 0
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+
+    def publish(self, event: dict[str, Any]) -> int:
+        """Queue an event for the bus; returns its sequence number"""
+        self.seq += 1
+        self._queue.put_nowait((self.seq, event))
+        if self._task is None:
+            self._task = asyncio.create_task(self._pump())
+        return self.seq
+
+    async def _pump(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            seq, event = item
+            try:
+                await self.bus.publish(self.topic, event, seq=seq)
+            except Exception as e:
+                print(f"⚠️ Progress bus publish failed: {e}")
+
+    async def aclose(self):
+        """Write the queued events, then close the topic"""
+        if self._task is not None:
+            self._queue.put_nowait(None)
+            await self._task
+        await self.bus.close_topic(self.topic)
+
+
+def create_progress_bus(settings: dict | None = None) -> ProgressBus:
+    """Build the configured progress bus backend"""
+    settings = settings or get_bus_settings()
+    backend = settings["backend"]
+    if backend == "sqlite":
+        return SQLiteBus(
+            settings["sqlite_path"],
+            retention_seconds=settings["retention_seconds"],
+            max_events=settings["max_events"],
+            poll_interval=settings["poll_interval"],
+        )
+    if backend == "redis":
+        return RedisBus(
+            settings["redis_url"],
+            retention_seconds=settings["retention_seconds"],
+            max_events=settings["max_events"],
+        )
+    return MemoryBus(
+        retention_seconds=settings["retention_seconds"], max_events=settings["max_events"]
+    )
+
+
+# One bus per event loop (the API server runs a single loop per worker)
+_bus: ProgressBus | None = None
+_bus_loop = None
+
+
+def get_progress_bus() -> ProgressBus:
+    """Get the progress bus for the running event loop"""
+    global _bus, _bus_loop
+
+    loop = asyncio.get_running_loop()
+    if _bus is not None and _bus_loop is loop:
+        return _bus
+
+    _bus = create_progress_bus()
+    _bus_loop = loop
+    return _bus
+
+
+async def close_progress_bus():
+    """Release the progress bus's connections (application shutdown)"""
+    global _bus, _bus_loop
+
+    bus, _bus, _bus_loop = _bus, None, None
+    if bus is not None:
+        await bus.aclose()
@@ -0,0 +1,127 @@
+"""
+Sidecar files for serving history sessions
+
+Next to each ``*_generated_questions.json`` two derived files are kept:
+
+- ``<name>.json.gz``: precompressed copy for gzip-capable clients
+- ``<name>.jsonl`` + ``<name>.idx``: one generated question per line and the
+  byte offset of every line, so a single question is one seek + read
+
+Sidecars are rebuilt whenever they are older than the session file.
+"""
+
+from array import array
+import gzip
+import json
+import os
+from pathlib import Path
+import shutil
+from typing import Any
+import uuid
+
+
+def session_etag(json_file: Path) -> str:
+    """Validator for a session file, derived from its size and mtime"""
+    stat = json_file.stat()
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return etag.removeprefix("W/") in tags
+
+
+def _is_fresh(sidecar: Path, source: Path) -> bool:
+    try:
+        return sidecar.stat().st_mtime_ns >= source.stat().st_mtime_ns
+    except OSError:
+        return False
+
+
+def _atomic_write(target: Path, write):
+    tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex}")
+    try:
+        write(tmp)
+        os.replace(tmp, target)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def gzip_path(json_file: Path) -> Path:
+    return json_file.with_name(json_file.name + ".gz")
+
+
+def ensure_gzip(json_file: Path) -> Path:
+    """Get the precompressed copy of a session file, creating it if stale"""
+    target = gzip_path(json_file)
+    if _is_fresh(target, json_file):
+        return target
+
+    def write(tmp: Path):
+        with open(json_file, "rb") as src, gzip.open(tmp, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+
+    _atomic_write(target, write)
+    return target
+
+
+def question_index_paths(json_file: Path) -> tuple[Path, Path]:
+    """Paths of the JSONL questions file and its offset index"""
+    return json_file.with_suffix(".jsonl"), json_file.with_suffix(".idx")
+
+
+def write_question_index(json_file: Path, generated_questions: list[dict[str, Any]]):
+    """Write the JSONL layout and offsets for a session's generated questions"""
+    jsonl_file, idx_file = question_index_paths(json_file)
+    offsets = array("Q", [0])
+
+    def write_jsonl(tmp: Path):
+        with open(tmp, "wb") as f:
+            for question in generated_questions:
+                f.write(json.dumps(question, ensure_ascii=False).encode("utf-8") + b"\n")
+                offsets.append(f.tell())
+
+    def write_idx(tmp: Path):
+        with open(tmp, "wb") as f:
+            offsets.tofile(f)
+
+    # The index is published last, so a reader never sees offsets without data
+    _atomic_write(jsonl_file, write_jsonl)
+    _atomic_write(idx_file, write_idx)
+
+
+def ensure_question_index(json_file: Path) -> tuple[Path, Path]:
+    """Build the JSONL layout from the session file if missing or stale"""
+    jsonl_file, idx_file = question_index_paths(json_file)
+    if not (_is_fresh(jsonl_file, json_file) and _is_fresh(idx_file, json_file)):
+        with open(json_file, encoding="utf-8") as f:
+            data = json.load(f)
+        write_question_index(json_file, data.get("generated_questions", []))
+    return jsonl_file, idx_file
+
+
+def read_question(json_file: Path, n: int) -> tuple[bytes | None, int]:
+    """
+    Read the n-th (0-based) generated question as raw JSON
+
+    Returns:
+        (JSON bytes or None when out of range, total number of questions)
+    """
+    jsonl_file, idx_file = ensure_question_index(json_file)
+
+    offsets = array("Q")
+    with open(idx_file, "rb") as f:
+        offsets.frombytes(f.read())
+    total = len(offsets) - 1
+
+    if n < 0 or n >= total:
+        return None, total
+
+    with open(jsonl_file, "rb") as f:
+        f.seek(offsets[n])
+        return f.read(offsets[n + 1] - offsets[n]).rstrip(b"\n"), total
@@ -0,0 +1,332 @@
+"""Streaming PDF upload storage"""
+
+import asyncio
+from dataclasses import asdict, dataclass
+import hashlib
+import json
+import os
+from pathlib import Path
+import re
+import shutil
+import threading
+import time
+from typing import AsyncIterator
+import uuid
+
+from src.services.config import load_config_with_main
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+UPLOAD_DIR = PROJECT_ROOT / "data" / "user" / "question" / "uploads"
+
+_UPLOAD_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+# Received bytes are handed to a worker thread (hash + write) in blocks of this size
+WRITE_BUFFER_BYTES = 1024 * 1024
+
+# Minimum seconds between sweeps of unclaimed uploads
+SWEEP_INTERVAL = 3600
+
+_last_sweep = 0.0
+
+
+class UploadError(ValueError):
+    """Raised when an upload is rejected or cannot be found"""
+
+
+class UploadTooLarge(UploadError):
+    """Raised when an upload exceeds the configured size limit"""
+
+
+@dataclass
+class UploadRecord:
+    """A PDF that has been streamed to disk"""
+    upload_id: str
+    pdf_name: str
+    path: str
+    sha256: str
+    size: int
+
+
+def get_max_upload_bytes() -> int:
+    """Get the maximum accepted upload size in bytes"""
+    config = load_config_with_main("question_config.yaml")
+    return int(config.get("upload", {}).get("max_size_mb", 100) * 1024 * 1024)
+
+
+def get_upload_ttl_seconds() -> float:
+    """Get how long an unclaimed upload is kept, in seconds"""
+    config = load_config_with_main("question_config.yaml")
+    return float(config.get("upload", {}).get("ttl_hours", 24)) * 3600
+
+
+def safe_pdf_name(pdf_name: str | None) -> str:
+    """Strip directories and unsafe characters from a client-supplied file name"""
+    name = Path(pdf_name or "exam.pdf").name
+    name = re.sub(r"[^\w.\- ]", "_", name).strip() or "exam.pdf"
+    if not name.lower().endswith(".pdf"):
+        name += ".pdf"
+    return name
+
+
+class UploadWriter:
+    """
+    Write an upload to disk chunk by chunk
+
+    The SHA-256 and size are computed while the bytes arrive, so the
+    finished upload can be handed to the pipeline without re-reading it.
+    Received bytes are buffered and hashed/written in a worker thread, so
+    disk I/O never blocks the event loop.
+    """
+
+    def __init__(self, pdf_name: str, max_bytes: int | None = None):
+        self.upload_id = uuid.uuid4().hex
+        self.pdf_name = safe_pdf_name(pdf_name)
+        self.max_bytes = max_bytes if max_bytes is not None else get_max_upload_bytes()
+        self.size = 0
+        self._digest = hashlib.sha256()
+        self.dir = UPLOAD_DIR / self.upload_id
+        self.path = self.dir / self.pdf_name
+        self._buffer = bytearray()
+        self._file = None
+        self._discarded = False
+        # Serializes disk work, so an abort never races a write still in its thread
+        self._lock = threading.Lock()
+
+    async def write(self, chunk: bytes):
+        """Append a chunk, rejecting uploads over the size limit"""
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            await self.abort()
+            raise UploadTooLarge(
+                f"Upload exceeds the {self.max_bytes // (1024 * 1024)} MB limit"
+            )
+        self._buffer += chunk
+        if len(self._buffer) >= WRITE_BUFFER_BYTES:
+            await self._flush()
+
+    async def _flush(self):
+        if self._buffer:
+            data, self._buffer = bytes(self._buffer), bytearray()
+            await asyncio.to_thread(self._write_block, data)
+
+    def _write_block(self, data: bytes):
+        with self._lock:
+            if self._discarded:
+                return
+            if self._file is None:
+                self.dir.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "wb")
+            self._digest.update(data)
+            self._file.write(data)
+
+    async def finish(self) -> UploadRecord:
+        """Flush, fsync and close the file and record the upload metadata"""
+        await self._flush()
+        if self.size == 0:
+            await self.abort()
+            raise UploadError("Upload is empty")
+        return await asyncio.to_thread(self._finish)
+
+    def _finish(self) -> UploadRecord:
+        with self._lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+            record = UploadRecord(
+                upload_id=self.upload_id,
+                pdf_name=self.pdf_name,
+                path=str(self.path),
+                sha256=self._digest.hexdigest(),
+                size=self.size,
+            )
+            with open(self.dir / "meta.json", "w", encoding="utf-8") as f:
+                json.dump(asdict(record), f, ensure_ascii=False, indent=2)
+            return record
+
+    async def abort(self):
+        """Discard a partial upload"""
+        self._buffer = bytearray()
+        await asyncio.to_thread(self._discard)
+
+    def _discard(self):
+        with self._lock:
+            self._discarded = True
+            if self._file is not None and not self._file.closed:
+                self._file.close()
+            shutil.rmtree(self.dir, ignore_errors=True)
+
+
+def _load_multipart():
+    """python-multipart's streaming parser (module renamed in 0.0.13)"""
+    try:
+        from python_multipart.exceptions import FormParserError
+        from python_multipart.multipart import MultipartParser, parse_options_header
+    except ImportError:
+        from multipart.exceptions import FormParserError
+        from multipart.multipart import MultipartParser, parse_options_header
+    return MultipartParser, parse_options_header, FormParserError
+
+
+async def receive_multipart_upload(
+    content_type: str,
+    stream: AsyncIterator[bytes],
+    filename: str | None = None,
+    max_bytes: int | None = None,
+) -> UploadRecord:
+    """
+    Stream the ``file`` field of a multipart/form-data body into an upload
+
+    The body is parsed as it is received, and the file part goes straight
+    into an UploadWriter (hashed while receiving) instead of being spooled
+    to a temporary file first. Other fields are ignored.
+    """
+    MultipartParser, parse_options_header, FormParserError = _load_multipart()
+
+    _, options = parse_options_header(content_type)
+    boundary = options.get(b"boundary")
+    if not boundary:
+        raise UploadError("Multipart upload is missing its boundary")
+
+    writer: UploadWriter | None = None
+    headers: dict[bytes, bytes] = {}
+    header_field = bytearray()
+    header_value = bytearray()
+    # Parser callbacks are synchronous: collect file data and write it after each chunk
+    state = {"in_file": False, "file_done": False}
+    pieces: list[bytes] = []
+
+    def on_part_begin():
+        headers.clear()
+
+    def on_header_field(data: bytes, start: int, end: int):
+        header_field.extend(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int):
+        header_value.extend(data[start:end])
+
+    def on_header_end():
+        headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished():
+        nonlocal writer
+        _, disposition = parse_options_header(headers.get(b"content-disposition", b""))
+        is_file = disposition.get(b"name") == b"file" and b"filename" in disposition
+        state["in_file"] = is_file and writer is None
+        if state["in_file"]:
+            part_name = disposition[b"filename"].decode("utf-8", errors="replace")
+            writer = UploadWriter(filename or part_name, max_bytes=max_bytes)
+
+    def on_part_data(data: bytes, start: int, end: int):
+        if state["in_file"]:
+            pieces.append(data[start:end])
+
+    def on_part_end():
+        if state["in_file"]:
+            state["in_file"] = False
+            state["file_done"] = True
+
+    parser = MultipartParser(
+        boundary,
+        {
+            "on_part_begin": on_part_begin,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+        },
+    )
+
+    try:
+        async for chunk in stream:
+            try:
+                parser.write(chunk)
+            except FormParserError as e:
+                raise UploadError(f"Invalid multipart upload: {e}")
+            for piece in pieces:
+                await writer.write(piece)
+            pieces.clear()
+        parser.finalize()
+
+        if writer is None or not state["file_done"]:
+            raise UploadError("Multipart upload requires a 'file' field")
+        return await writer.finish()
+    except BaseException:
+        if writer is not None:
+            await writer.abort()
+        raise
+
+
+def get_upload(upload_id: str) -> UploadRecord:
+    """Load a finished upload by id"""
+    if not _UPLOAD_ID_PATTERN.match(upload_id or ""):
+        raise UploadError(f"Invalid upload id: {upload_id}")
+
+    meta_file = UPLOAD_DIR / upload_id / "meta.json"
+    if not meta_file.exists():
+        raise UploadError(f"Upload not found: {upload_id}")
+
+    with open(meta_file, encoding="utf-8") as f:
+        return UploadRecord(**json.load(f))
+
+
+def claim_upload(record: UploadRecord, target_dir: Path) -> Path:
+    """
+    Move an upload into a batch directory and drop its staging entry
+
+    Returns:
+        Path of the PDF inside target_dir
+    """
+    target_dir.mkdir(parents=True, exist_ok=True)
+    target = target_dir / record.pdf_name
+    try:
+        os.replace(record.path, target)
+    except OSError:
+        shutil.copy2(record.path, target)
+    shutil.rmtree(UPLOAD_DIR / record.upload_id, ignore_errors=True)
+    return target
+
+
+def sweep_stale_uploads(ttl_seconds: float | None = None) -> int:
+    """
+    Delete staged uploads (finished or partial) that were never claimed
+
+    Returns:
+        Number of uploads removed
+    """
+    if ttl_seconds is None:
+        ttl_seconds = get_upload_ttl_seconds()
+    if not UPLOAD_DIR.is_dir():
+        return 0
+
+    cutoff = time.time() - ttl_seconds
+    removed = 0
+    for entry in UPLOAD_DIR.iterdir():
+        if not _UPLOAD_ID_PATTERN.match(entry.name):
+            continue
+        try:
+            # Writes touch the file, not the directory: use the newest of both
+            last_write = max(p.stat().st_mtime for p in [entry, *entry.iterdir()])
+        except OSError:
+            continue
+        if last_write < cutoff:
+            shutil.rmtree(entry, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+async def sweep_stale_uploads_if_due():
+    """Run sweep_stale_uploads in a thread, at most once per SWEEP_INTERVAL"""
+    global _last_sweep
+
+    now = time.monotonic()
+    if _last_sweep and now - _last_sweep < SWEEP_INTERVAL:
+        return
+    _last_sweep = now
+    removed = await asyncio.to_thread(sweep_stale_uploads)
+    if removed:
+        print(f"🧹 Removed {removed} unclaimed upload(s)")
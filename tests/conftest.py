@@ -0,0 +1,81 @@
+"""Shared fixtures: a mock LLM server subprocess and the environment pointing at it"""
+
+from pathlib import Path
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import pytest
+
+project_root = Path(__file__).parent.parent
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="session")
+def mock_llm_server():
+    """
+    Start src.services.mock_llm_server with the given CLI options
+
+    Returns the /v1 base URL. Servers are shared by tests asking for the
+    same options and stopped at the end of the session.
+    """
+    servers: dict[tuple, tuple[subprocess.Popen, str]] = {}
+
+    def start(**options) -> str:
+        key = tuple(sorted(options.items()))
+        if key in servers:
+            return servers[key][1]
+
+        port = _free_port()
+        command = [sys.executable, "-m", "src.services.mock_llm_server", "--port", str(port)]
+        for name, value in options.items():
+            command += [f"--{name.replace('_', '-')}", str(value)]
+        process = subprocess.Popen(
+            command, cwd=project_root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                pytest.fail(f"mock LLM server did not start: {' '.join(command)}")
+            time.sleep(0.1)
+
+        base_url = f"http://127.0.0.1:{port}/v1"
+        servers[key] = (process, base_url)
+        return base_url
+
+    yield start
+
+    for process, _ in servers.values():
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+@pytest.fixture
+def use_llm(monkeypatch):
+    """Point get_llm_config() at a base URL (e.g. from mock_llm_server)"""
+
+    def use(base_url: str, model: str = "mock"):
+        for name in ("GEMINI_API_KEY", "GEMINI_BASE_URL", "LLM_API_KEY", "LLM_BASE_URL"):
+            monkeypatch.delenv(name, raising=False)
+        monkeypatch.setenv("OPENAI_API_KEY", "mock")
+        monkeypatch.setenv("OPENAI_BASE_URL", base_url)
+        monkeypatch.setenv("LLM_MODEL", model)
+
+    return use
@@ -0,0 +1,173 @@
+"""Tests for offline Batch API generation against the local mock server"""
+
+import asyncio
+import json
+
+import pytest
+
+from src.agents.question.tools import batch_mimic
+from src.agents.question.tools.batch_mimic import (
+    BATCH_INPUT_NAME,
+    BATCH_STATE_NAME,
+    generate_mimics_with_batch_api,
+    parse_batch_line,
+)
+from src.agents.question.tools.exam_mimic import mimic_exam_questions
+from src.agents.question.tools.result_journal import ResultJournal
+from src.services.llm import close_llm_clients
+
+
+def reference(number: int) -> dict:
+    return {
+        "question_number": str(number),
+        "question_text": f"Compute the derivative of x^{number} + {number}x.",
+        "images": [],
+    }
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(
+        batch_mimic,
+        "get_batch_api_settings",
+        lambda: {"poll_interval": 0.05, "completion_window": "24h"},
+    )
+
+
+def run(coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            await close_llm_clients()
+
+    return asyncio.run(main())
+
+
+def input_lines(session_dir) -> list[dict]:
+    text = (session_dir / BATCH_INPUT_NAME).read_text(encoding="utf-8")
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def test_parse_batch_line_errors():
+    assert parse_batch_line({"error": {"message": "expired"}})["error"] == "expired"
+    assert parse_batch_line({"response": {"status_code": 500}})["error"] == "HTTP 500"
+    bad = {"response": {"status_code": 200, "body": {"choices": [{"message": {"content": "?"}}]}}}
+    assert parse_batch_line(bad)["success"] is False
+
+
+def test_submit_poll_download(mock_llm_server, use_llm, tmp_path):
+    use_llm(mock_llm_server(batch_delay=0.2))
+    items = [(index, reference(index)) for index in (1, 2, 3)]
+
+    results = run(generate_mimics_with_batch_api(items, "kb", tmp_path))
+
+    assert sorted(results) == [1, 2, 3]
+    assert all(result["success"] for result in results.values())
+    assert all(result["question"]["question"] for result in results.values())
+    assert [line["custom_id"] for line in input_lines(tmp_path)] == ["mimic_1", "mimic_2", "mimic_3"]
+    # The batch finished, so there is nothing left to resume
+    assert not (tmp_path / BATCH_STATE_NAME).exists()
+
+
+def test_failed_batch_returns_failures(mock_llm_server, use_llm, tmp_path):
+    use_llm(mock_llm_server(batch_delay=0.2, batch_outcome="failed"))
+    items = [(index, reference(index)) for index in (1, 2)]
+
+    results = run(generate_mimics_with_batch_api(items, "kb", tmp_path))
+
+    assert [result["success"] for result in results.values()] == [False, False]
+    assert results[1]["reason"] == "Batch failed"
+
+
+def test_expired_batch_keeps_finished_requests(mock_llm_server, use_llm, tmp_path):
+    use_llm(mock_llm_server(batch_delay=0.2, batch_outcome="expired"))
+    items = [(index, reference(index)) for index in (1, 2, 3, 4)]
+
+    results = run(generate_mimics_with_batch_api(items, "kb", tmp_path))
+
+    assert [results[index]["success"] for index in (1, 2, 3, 4)] == [True, True, False, False]
+    assert "expired" in results[3]["error"]
+
+
+def test_resume_polls_the_submitted_batch(mock_llm_server, use_llm, tmp_path, monkeypatch):
+    use_llm(mock_llm_server(batch_delay=0.2))
+    items = [(index, reference(index)) for index in (1, 2)]
+    submitted = []
+    submit, poll = batch_mimic._submit, batch_mimic._poll
+
+    async def counting_submit(*args):
+        batch_id = await submit(*args)
+        submitted.append(batch_id)
+        return batch_id
+
+    async def interrupted_poll(*args):
+        raise RuntimeError("process stopped while waiting")
+
+    monkeypatch.setattr(batch_mimic, "_submit", counting_submit)
+    monkeypatch.setattr(batch_mimic, "_poll", interrupted_poll)
+    with pytest.raises(RuntimeError):
+        run(generate_mimics_with_batch_api(items, "kb", tmp_path))
+    assert json.loads((tmp_path / BATCH_STATE_NAME).read_text())["batch_id"] == submitted[0]
+
+    monkeypatch.setattr(batch_mimic, "_poll", poll)
+    results = run(generate_mimics_with_batch_api(items, "kb", tmp_path, resume=True))
+
+    assert len(submitted) == 1
+    assert all(result["success"] for result in results.values())
+
+
+def test_resume_with_other_references_submits_a_new_batch(mock_llm_server, use_llm, tmp_path):
+    use_llm(mock_llm_server(batch_delay=0.2))
+    (tmp_path / BATCH_STATE_NAME).write_text(
+        json.dumps({"batch_id": "batch_gone", "keys": {"mimic_1": "other"}})
+    )
+
+    results = run(generate_mimics_with_batch_api([(1, reference(1))], "kb", tmp_path, resume=True))
+
+    assert results[1]["success"]
+
+
+def _make_paper(tmp_path, monkeypatch, count: int) -> str:
+    """A parsed paper with an extracted questions file, found via ./reference_papers"""
+    name = f"batch_test_paper_{tmp_path.name}"
+    paper = tmp_path / "reference_papers" / name
+    (paper / "auto").mkdir(parents=True)
+    questions = {"questions": [reference(n) for n in range(1, count + 1)]}
+    (paper / f"{name}_questions.json").write_text(json.dumps(questions), encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    return name
+
+
+def _generated(output_dir) -> dict:
+    [summary] = output_dir.glob("*_generated_questions.json")
+    return json.loads(summary.read_text(encoding="utf-8"))
+
+
+def test_mimic_batch_mode_then_resume_from_journal(mock_llm_server, use_llm, tmp_path, monkeypatch):
+    paper = _make_paper(tmp_path, monkeypatch, 4)
+    output_dir = tmp_path / "session"
+
+    # First run: the batch expires with half of the requests done
+    use_llm(mock_llm_server(batch_delay=0.2, batch_outcome="expired"))
+    result = run(
+        mimic_exam_questions(paper_dir=paper, kb_name="kb", output_dir=str(output_dir), batch_api=True)
+    )
+    assert result["success"]
+    summary = _generated(output_dir)
+    assert (summary["successful_generations"], summary["failed_generations"]) == (2, 2)
+    assert len(ResultJournal(output_dir).load_completed()) == 2
+
+    # Resumed run: only the two missing references go into the new batch
+    use_llm(mock_llm_server(batch_delay=0.2))
+    result = run(
+        mimic_exam_questions(
+            paper_dir=paper, kb_name="kb", output_dir=str(output_dir), batch_api=True, resume=True
+        )
+    )
+    assert result["success"]
+    assert [line["custom_id"] for line in input_lines(output_dir)] == ["mimic_3", "mimic_4"]
+    summary = _generated(output_dir)
+    assert (summary["successful_generations"], summary["failed_generations"]) == (4, 0)
+    numbers = [item["reference_question_number"] for item in summary["generated_questions"]]
+    assert numbers == ["1", "2", "3", "4"]
@@ -0,0 +1,125 @@
+"""Tests for the AIMD LLM concurrency limiter"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.services import concurrency
+from src.services.concurrency import AdaptiveLimiter, get_llm_limiter, is_rate_limit_error
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+def test_rate_limit_detection():
+    assert is_rate_limit_error(RateLimited())
+    assert not is_rate_limit_error(ValueError())
+
+
+def test_acquire_waits_for_a_free_slot():
+    limiter = AdaptiveLimiter(initial=2, max_limit=2)
+    order = []
+
+    async def call(name, hold):
+        async with limiter.slot():
+            order.append(f"start {name}")
+            await asyncio.sleep(hold)
+            order.append(f"end {name}")
+
+    async def main():
+        await asyncio.gather(call("a", 0.05), call("b", 0.1), call("c", 0))
+
+    asyncio.run(main())
+    assert order.index("start c") > order.index("end a")
+    assert limiter.inflight == 0
+
+
+def test_cancelled_waiter_passes_its_wake_up_on():
+    limiter = AdaptiveLimiter(initial=1, max_limit=1)
+
+    async def main():
+        await limiter.acquire()
+        first = asyncio.create_task(limiter.acquire())
+        second = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        limiter.release()  # wakes "first"...
+        first.cancel()  # ...which is cancelled before it runs
+        await asyncio.wait_for(second, 1)
+        return first
+
+    first = asyncio.run(main())
+    assert first.cancelled()
+    assert limiter.inflight == 1
+
+
+def test_rate_limits_from_one_window_cut_once():
+    limiter = AdaptiveLimiter(initial=8, backoff=0.5)
+    started = time.monotonic()
+
+    limiter.on_error(RateLimited(), started)
+    limiter.on_error(RateLimited(), started)  # same burst, started before the cut
+    assert limiter.limit == 4
+    assert limiter.rate_limited == 2
+
+    limiter.on_error(RateLimited(), time.monotonic())
+    assert limiter.limit == 2
+
+
+def test_timeouts_cut_and_limit_never_drops_below_min():
+    limiter = AdaptiveLimiter(initial=2, min_limit=1, backoff=0.5)
+    for _ in range(3):
+        limiter.on_error(asyncio.TimeoutError(), time.monotonic())
+    assert limiter.limit == 1
+
+
+def test_increase_only_while_saturated_and_up_to_max():
+    limiter = AdaptiveLimiter(initial=2, max_limit=3)
+
+    limiter.on_success(1.0, time.monotonic(), inflight=0)
+    assert limiter.limit == 2
+
+    for _ in range(20):
+        limiter.on_success(1.0, time.monotonic(), inflight=int(limiter.limit))
+    assert limiter.limit == 3
+
+
+def test_latency_inflation_cuts_the_limit():
+    limiter = AdaptiveLimiter(initial=8, latency_tolerance=2.0, smoothing=1.0)
+    limiter.on_success(1.0, time.monotonic(), inflight=0)
+
+    limiter.on_success(5.0, time.monotonic(), inflight=0)
+
+    assert limiter.limit == 4
+
+
+def test_learned_limit_carries_over_to_a_new_loop(monkeypatch):
+    monkeypatch.setattr(concurrency, "_limiter", None)
+    monkeypatch.setattr(
+        concurrency,
+        "get_concurrency_settings",
+        lambda: {
+            "adaptive": True,
+            "initial": 4,
+            "min_limit": 1,
+            "max_limit": 20,
+            "backoff": 0.5,
+            "latency_tolerance": 2.0,
+        },
+    )
+
+    async def learn():
+        limiter = get_llm_limiter()
+        assert get_llm_limiter() is limiter
+        limiter.limit = 11.0
+        return limiter
+
+    async def get():
+        return get_llm_limiter()
+
+    first = asyncio.run(learn())
+    second = asyncio.run(get())
+
+    assert second is not first
+    assert second.limit == pytest.approx(11.0)
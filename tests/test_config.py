@@ -0,0 +1,45 @@
+"""Tests for the cached YAML config loading"""
+
+from src.services import config
+from src.services.config import load_config_with_main
+
+
+def write_config(root, main: str, specific: str | None = None):
+    (root / "config").mkdir(exist_ok=True)
+    (root / "config" / "main.yaml").write_text(main)
+    if specific is not None:
+        (root / "config" / "question_config.yaml").write_text(specific)
+
+
+def test_specific_config_overrides_main(tmp_path):
+    write_config(tmp_path, "a: 1\nb: {x: 1}\n", "b: {y: 2}\n")
+    assert load_config_with_main("question_config.yaml", tmp_path) == {"a": 1, "b": {"y": 2}}
+
+
+def test_unchanged_file_is_parsed_once(tmp_path, monkeypatch):
+    write_config(tmp_path, "a: 1\n")
+    parses = []
+    safe_load = config.yaml.safe_load
+    monkeypatch.setattr(config.yaml, "safe_load", lambda f: parses.append(1) or safe_load(f))
+
+    for _ in range(3):
+        load_config_with_main("missing.yaml", tmp_path)
+
+    assert len(parses) == 1
+
+
+def test_callers_get_copies(tmp_path):
+    write_config(tmp_path, "llm: {timeout: 10}\n")
+
+    load_config_with_main("missing.yaml", tmp_path)["llm"]["timeout"] = 99
+
+    assert load_config_with_main("missing.yaml", tmp_path)["llm"]["timeout"] == 10
+
+
+def test_edited_file_is_reloaded(tmp_path):
+    write_config(tmp_path, "a: 1\n")
+    assert load_config_with_main("missing.yaml", tmp_path)["a"] == 1
+
+    (tmp_path / "config" / "main.yaml").write_text("a: 22\n")
+
+    assert load_config_with_main("missing.yaml", tmp_path)["a"] == 22
@@ -0,0 +1,53 @@
+"""Tests for the persistent extraction cache"""
+
+from contextlib import closing
+
+from src.agents.question.tools.extraction_cache import ExtractionCache, make_extraction_key
+
+QUESTIONS = [{"question_number": "1", "question_text": "What is 2 + 2?", "images": []}]
+
+
+def test_key_depends_on_every_input_but_not_image_order():
+    key = make_extraction_key("# Paper", ["a.png", "b.png"], "model", "prompt")
+
+    assert key == make_extraction_key("# Paper", ["b.png", "a.png"], "model", "prompt")
+    assert key != make_extraction_key("# Paper 2", ["a.png", "b.png"], "model", "prompt")
+    assert key != make_extraction_key("# Paper", ["a.png"], "model", "prompt")
+    assert key != make_extraction_key("# Paper", ["a.png", "b.png"], "other", "prompt")
+    assert key != make_extraction_key("# Paper", ["a.png", "b.png"], "model", "new prompt")
+
+
+def test_put_and_get_roundtrip(tmp_path):
+    cache = ExtractionCache(tmp_path / "extraction.sqlite3")
+
+    assert cache.get("k") is None
+    cache.put("k", "model", QUESTIONS)
+
+    assert cache.get("k") == QUESTIONS
+    # A second instance (another process or session) reads the same store
+    assert ExtractionCache(tmp_path / "extraction.sqlite3").get("k") == QUESTIONS
+
+
+def test_eviction_keeps_most_recently_used(tmp_path):
+    cache = ExtractionCache(tmp_path / "extraction.sqlite3", max_entries=2)
+    cache.put("a", "model", QUESTIONS)
+    cache.put("b", "model", QUESTIONS)
+    with closing(cache._connect()) as conn, conn:
+        conn.execute("UPDATE extractions SET last_access = 1 WHERE key = 'a'")
+        conn.execute("UPDATE extractions SET last_access = 2 WHERE key = 'b'")
+    cache.get("a")  # "a" is now the most recently used
+
+    cache.put("c", "model", QUESTIONS)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_corrupt_row_is_a_miss(tmp_path):
+    cache = ExtractionCache(tmp_path / "extraction.sqlite3")
+    cache.put("k", "model", QUESTIONS)
+    with closing(cache._connect()) as conn, conn:
+        conn.execute("UPDATE extractions SET questions = '{not json' WHERE key = 'k'")
+
+    assert cache.get("k") is None
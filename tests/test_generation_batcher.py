@@ -0,0 +1,65 @@
+"""Tests for batched generation and the request batcher"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from src.agents.question import coordinator as coordinator_module
+from src.agents.question.coordinator import AgentCoordinator, GenerationBatcher
+
+
+class RecordingCache:
+    def __init__(self):
+        self.stored = {}
+
+    def put(self, key, result):
+        self.stored[key] = result
+
+
+def test_batched_results_are_cached_without_batched_marker(monkeypatch):
+    cache = RecordingCache()
+    coordinator = AgentCoordinator(kb_name="kb")
+
+    async def no_cached_result(requirement, model):
+        return cache, requirement["reference_question"], None
+
+    async def fake_completion(client, tokens, **kwargs):
+        items = [
+            {"id": n, "question": {"question": f"Q{n}", "answer": "a"}, "validation": {}}
+            for n in (1, 2)
+        ]
+        message = SimpleNamespace(content=json.dumps({"items": items}))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)]), 1
+
+    monkeypatch.setattr(coordinator, "_cache_lookup", no_cached_result)
+    monkeypatch.setattr(coordinator_module, "get_llm_config", lambda: SimpleNamespace(model="m"))
+    monkeypatch.setattr(coordinator_module, "get_async_llm_client", lambda config: None)
+    monkeypatch.setattr(coordinator_module, "create_chat_completion", fake_completion)
+
+    results = asyncio.run(
+        coordinator.generate_questions_batch(
+            [{"reference_question": "ref 1"}, {"reference_question": "ref 2"}]
+        )
+    )
+
+    assert [r["batched"] for r in results] == [True, True]
+    assert set(cache.stored) == {"ref 1", "ref 2"}
+    assert all("batched" not in stored for stored in cache.stored.values())
+
+
+def test_failed_batch_gives_each_caller_its_own_result():
+    class FailingCoordinator:
+        async def generate_questions_batch(self, requirements):
+            raise RuntimeError("boom")
+
+    batcher = GenerationBatcher(FailingCoordinator(), batch_size=2)
+
+    async def main():
+        return await asyncio.gather(batcher.generate({}), batcher.generate({}))
+
+    first, second = asyncio.run(main())
+    first["annotated"] = True
+
+    assert first is not second
+    assert "annotated" not in second
+    assert second["error"] == "boom"
@@ -0,0 +1,112 @@
+"""Tests for the generation cache and its reuse policies"""
+
+from contextlib import closing
+import time
+
+from src.agents.question.tools.generation_cache import (
+    GenerationCache,
+    is_valid_generation,
+    make_generation_key,
+)
+
+
+def generation(name: str, relevance: float | None = 0.9) -> dict:
+    validation = {} if relevance is None else {"relevance": relevance}
+    return {"question": {"question": name, "answer": "42"}, "validation": validation, "rounds": 1}
+
+
+def test_key_ignores_whitespace_and_width_differences():
+    key = make_generation_key("Find  x.\n", "kb", "model", 0.7, "template")
+
+    assert key == make_generation_key("Find x.", "kb", "model", 0.7, "template")
+    assert key == make_generation_key("Ｆｉｎｄ x.", "kb", "model", 0.7, "template")
+    assert key != make_generation_key("Find x.", "kb", "model", 0.8, "template")
+    assert key != make_generation_key("Find x.", "other", "model", 0.7, "template")
+
+
+def test_validity_requires_question_answer_and_relevance():
+    assert is_valid_generation(generation("q"))
+    assert is_valid_generation(generation("q", relevance=None))
+    assert not is_valid_generation(generation("q", relevance=0.2))
+    assert not is_valid_generation({"question": {"question": "q"}})
+
+
+def test_reuse_returns_the_stored_generation(tmp_path):
+    cache = GenerationCache(tmp_path / "gen.sqlite3", policy="reuse")
+
+    assert cache.get("k") is None
+    cache.put("k", generation("first"))
+    cache.put("k", generation("second"))  # replaces: one variant per key
+
+    assert cache.get("k") == generation("second")
+
+
+def test_reuse_if_valid_skips_low_relevance(tmp_path):
+    cache = GenerationCache(tmp_path / "gen.sqlite3", policy="reuse-if-valid", min_relevance=0.7)
+    cache.put("k", generation("weak", relevance=0.3))
+
+    assert cache.get("k") is None
+    cache.put("k", generation("good"))
+    assert cache.get("k") == generation("good")
+
+
+def test_n_variants_fills_the_pool_then_rotates(tmp_path):
+    cache = GenerationCache(tmp_path / "gen.sqlite3", policy="n-variants", variants=2)
+
+    assert cache.get("k") is None
+    cache.put("k", generation("a"))
+    assert cache.get("k") is None  # pool not full yet
+    cache.put("k", generation("b"))
+
+    served = []
+    for _ in range(4):
+        served.append(cache.get("k")["question"]["question"])
+        time.sleep(0.01)
+    assert sorted(served[:2]) == ["a", "b"]
+    assert served[2:] == served[:2]
+
+
+def test_expired_entries_are_not_served(tmp_path):
+    cache = GenerationCache(tmp_path / "gen.sqlite3", policy="reuse", ttl_hours=1)
+    cache.put("k", generation("old"))
+    with closing(cache._connect()) as conn, conn:
+        conn.execute("UPDATE generations SET created = ?", (time.time() - 7200,))
+
+    assert cache.get("k") is None
+
+
+def test_size_limit_evicts_least_recently_used(tmp_path):
+    cache = GenerationCache(tmp_path / "gen.sqlite3", policy="reuse", max_size_mb=0.0004)  # room for two entries
+    big = {"question": {"question": "x" * 120, "answer": "y"}, "validation": {}}
+    cache.put("a", big)
+    cache.put("b", big)
+    with closing(cache._connect()) as conn, conn:
+        conn.execute("UPDATE generations SET last_access = 1 WHERE key = 'a'")
+
+    cache.put("c", big)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == big and cache.get("c") == big
+
+
+def test_configured_cache_is_built_once_per_configuration(tmp_path, monkeypatch):
+    from src.agents.question.tools import generation_cache
+
+    settings = {
+        "policy": "reuse",
+        "path": tmp_path / "gen.sqlite3",
+        "ttl_hours": 1,
+        "max_size_mb": 1,
+        "variants": 1,
+        "min_relevance": 0.7,
+    }
+    monkeypatch.setattr(generation_cache, "_caches", {})
+    monkeypatch.setattr(generation_cache, "get_generation_cache_settings", lambda: dict(settings))
+
+    cache = generation_cache.get_generation_cache()
+    assert generation_cache.get_generation_cache() is cache
+
+    settings["policy"] = "n-variants"
+    assert generation_cache.get_generation_cache() is not cache
+    settings["policy"] = "off"
+    assert generation_cache.get_generation_cache() is None
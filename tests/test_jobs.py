@@ -0,0 +1,177 @@
+"""Tests for the SQLite job queue and for cancelling a running job"""
+
+import asyncio
+from contextlib import closing
+import json
+import time
+
+from src.agents.question.tools import exam_mimic
+from src.services.job_worker import run_job
+from src.services.jobs import JobStore
+
+
+def test_claim_takes_oldest_job_once(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    first = store.submit({"n": 1})
+    second = store.submit({"n": 2})
+
+    claimed = [store.claim("w1"), store.claim("w2"), store.claim("w3")]
+
+    assert [job["id"] for job in claimed[:2]] == [first, second]
+    assert claimed[2] is None
+    assert claimed[0]["status"] == "running" and claimed[0]["attempts"] == 1
+    assert claimed[0]["params"] == {"n": 1}
+
+
+def test_requeue_and_reclaim_counts_attempts(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    job_id = store.submit({})
+    store.claim("w1")
+
+    store.requeue(job_id)
+    assert store.get(job_id)["status"] == "queued"
+    assert store.claim("w2")["attempts"] == 2
+
+
+def test_recover_stale_requeues_then_fails(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    job_id = store.submit({})
+    store.claim("w1")
+
+    time.sleep(0.05)
+    assert store.recover_stale(stale_after=0.01, max_attempts=2) == [job_id]
+    assert store.get(job_id)["status"] == "queued"
+
+    store.claim("w2")
+    time.sleep(0.05)
+    store.recover_stale(stale_after=0.01, max_attempts=2)
+    assert store.get(job_id)["status"] == "failed"
+
+
+def test_finish_from_a_superseded_attempt_is_ignored(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    job_id = store.submit({})
+    store.claim("w1")
+    time.sleep(0.05)
+    store.recover_stale(stale_after=0.01, max_attempts=3)
+    store.claim("w2")
+
+    # The stalled first worker wakes up and reports a result
+    assert store.finish(job_id, "w1", "failed", "stale") is False
+    assert store.get(job_id)["status"] == "running"
+
+    assert store.finish(job_id, "w2", "succeeded") is True
+    job = store.get(job_id)
+    assert (job["status"], job["error"]) == ("succeeded", None)
+    assert store.finish(job_id, "w2", "failed") is False
+
+
+def test_get_job_store_is_built_once(tmp_path, monkeypatch):
+    from src.services import jobs
+
+    monkeypatch.setattr(jobs, "_stores", {})
+    monkeypatch.setattr(jobs, "get_job_settings", lambda: {"db_path": tmp_path / "jobs.sqlite3"})
+
+    assert jobs.get_job_store() is jobs.get_job_store()
+
+
+def test_cancel_stops_queued_job_and_flags_running_job(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    running = store.submit({})
+    queued = store.submit({})
+    store.claim("w1")  # takes the older job
+
+    assert store.heartbeat(running, "w1") is False
+    assert store.cancel(queued)["status"] == "cancelled"
+
+    job = store.cancel(running)
+    assert (job["status"], job["cancel_requested"]) == ("running", True)
+    assert store.heartbeat(running, "w1") is True
+
+
+def test_events_replay_after_sequence(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    job_id = store.submit({})
+    store.append_events(job_id, [{"n": 1}, {"n": 2}])
+    assert store.append_events(job_id, [{"n": 3}]) == 3
+
+    assert store.events_after(job_id, 1) == [(2, {"n": 2}), (3, {"n": 3})]
+
+
+def test_prune_deletes_only_expired_finished_jobs(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    old, recent, running = store.submit({}), store.submit({}), store.submit({})
+    for job_id in (old, recent, running):
+        store.append_events(job_id, [{"type": "log"}])
+        store.claim("w1")
+    store.finish(old, "w1", "succeeded")
+    store.finish(recent, "w1", "failed", "boom")
+    with closing(store._connect()) as conn, conn:
+        conn.execute("UPDATE jobs SET finished = ? WHERE id = ?", (time.time() - 7200, old))
+
+    assert store.prune(retention=3600) == 1
+    assert store.get(old) is None and store.events_after(old) == []
+    assert store.get(recent) is not None and store.get(running) is not None
+    assert len(store.events_after(running)) == 1
+
+
+def test_cancelled_job_stops_generating_queued_questions(tmp_path, monkeypatch):
+    paper = tmp_path / "reference_papers" / "cancel_paper"
+    (paper / "auto").mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+
+    generating = []
+    running = 0
+
+    async def fake_extract(paper_dir, output_dir=None, on_questions=None):
+        questions = [
+            {"question_number": str(n), "question_text": f"Question {n}", "images": []}
+            for n in range(1, 101)
+        ]
+        await on_questions(questions)
+        await asyncio.Event().wait()  # extraction of later chunks never finishes
+
+    async def fake_generate(reference_question, **kwargs):
+        nonlocal running
+        generating.append(reference_question["question_number"])
+        running += 1
+        try:
+            await asyncio.sleep(0.2)
+        finally:
+            running -= 1
+        return {"success": False, "error": "fake"}
+
+    monkeypatch.setattr(exam_mimic, "extract_questions_from_paper_async", fake_extract)
+    monkeypatch.setattr(exam_mimic, "generate_question_from_reference", fake_generate)
+
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    job_id = store.submit(
+        {
+            "paper_dir": "cancel_paper",
+            "kb_name": "kb",
+            "output_dir": str(tmp_path / "out"),
+            "streaming": True,
+        }
+    )
+    job = store.claim("w1")
+
+    async def main():
+        task = asyncio.create_task(run_job(store, job, "w1", heartbeat_interval=0.05))
+        for _ in range(500):
+            if generating or task.done():
+                break
+            await asyncio.sleep(0.01)
+        assert generating, "generation never started"
+        store.cancel(job_id)
+        await task
+        started = len(generating)
+        await asyncio.sleep(0.5)
+        return started
+
+    started = asyncio.run(main())
+
+    assert store.get(job_id)["status"] == "cancelled"
+    assert len(generating) == started < 100
+    assert running == 0
+    events = [json.dumps(event) for _, event in store.events_after(job_id)]
+    assert any("Job cancelled" in event for event in events)
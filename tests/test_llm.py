@@ -0,0 +1,69 @@
+"""Tests for the shared per-loop LLM clients"""
+
+import asyncio
+import threading
+
+from src.services import llm
+from src.services.llm import LLMConfig, close_llm_clients, get_async_llm_client
+
+CONFIG = LLMConfig("key", "http://127.0.0.1:1/v1", "mock")
+OTHER_KEY = LLMConfig("other", "http://127.0.0.1:1/v1", "mock")
+
+
+def test_client_is_shared_and_closed_with_every_key():
+    async def main():
+        first = get_async_llm_client(CONFIG)
+        assert get_async_llm_client(CONFIG) is first
+
+        # A key change builds a new client without closing the one in use
+        other = get_async_llm_client(OTHER_KEY)
+        assert other is not first and not first.is_closed()
+
+        await close_llm_clients()
+        return first, other
+
+    first, other = asyncio.run(main())
+    assert first.is_closed() and other.is_closed()
+    assert llm._async_clients == {}
+
+
+def test_close_leaves_clients_of_other_running_loops():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def get_client():
+        return get_async_llm_client(CONFIG)
+
+    try:
+        background = asyncio.run_coroutine_threadsafe(get_client(), loop).result()
+
+        async def main():
+            client = get_async_llm_client(CONFIG)
+            await close_llm_clients()
+            return client
+
+        client = asyncio.run(main())
+        assert client is not background
+        assert client.is_closed() and not background.is_closed()
+    finally:
+        asyncio.run_coroutine_threadsafe(close_llm_clients(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    assert background.is_closed()
+
+
+def test_clients_of_closed_loops_are_dropped():
+    async def get_client():
+        return get_async_llm_client(CONFIG)
+
+    asyncio.run(get_client())  # loop closed without close_llm_clients()
+
+    async def main():
+        get_async_llm_client(CONFIG)
+        assert len(llm._async_clients) == 1
+        await close_llm_clients()
+
+    asyncio.run(main())
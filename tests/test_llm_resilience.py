@@ -0,0 +1,154 @@
+"""Tests for LLM retries, timeouts and hedging with a scripted client"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import llm_resilience
+from src.services.llm_resilience import (
+    LatencyTracker,
+    backoff_delay,
+    create_chat_completion,
+    is_retryable_error,
+    retry_after_seconds,
+    stream_chat_completion,
+)
+
+
+class APIError(Exception):
+    def __init__(self, status_code: int, headers: dict | None = None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+class ScriptedClient:
+    """Each create() call runs the next step: an exception, a delay, or a reply"""
+
+    def __init__(self, steps):
+        self.steps = list(steps)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def with_options(self, **options):
+        return self
+
+    async def create(self, **kwargs):
+        step = self.steps[self.calls]
+        self.calls += 1
+        if isinstance(step, tuple):
+            delay, step = step
+            await asyncio.sleep(delay)
+        if isinstance(step, BaseException):
+            raise step
+        if kwargs.get("stream"):
+            return self._stream(step)
+        return SimpleNamespace(text=step, usage=None)
+
+    async def _stream(self, parts):
+        for part in parts:
+            if isinstance(part, BaseException):
+                raise part
+            delta = SimpleNamespace(content=part)
+            yield SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=delta)])
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    settings = {
+        "max_attempts": 3,
+        "base_delay": 0.01,
+        "max_delay": 0.02,
+        "attempt_timeout": 0.5,
+        "hedge": False,
+        "hedge_quantile": 0.95,
+        "hedge_min_samples": 5,
+    }
+    monkeypatch.setattr(llm_resilience, "get_retry_settings", lambda: dict(settings))
+    monkeypatch.setattr(llm_resilience, "latency_tracker", LatencyTracker())
+    return settings
+
+
+def call(client, **kwargs):
+    return asyncio.run(create_chat_completion(client, model="mock", messages=[], **kwargs))
+
+
+def test_retryable_errors():
+    assert is_retryable_error(APIError(429))
+    assert is_retryable_error(APIError(503))
+    assert is_retryable_error(asyncio.TimeoutError())
+    assert not is_retryable_error(APIError(400))
+    assert not is_retryable_error(ValueError())
+
+
+def test_retry_after_headers():
+    assert retry_after_seconds(APIError(429, {"retry-after-ms": "1500"})) == 1.5
+    assert retry_after_seconds(APIError(429, {"retry-after": "3"})) == 3.0
+    assert retry_after_seconds(APIError(429, {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0
+    assert retry_after_seconds(APIError(429)) is None
+
+
+def test_backoff_is_jittered_capped_and_honours_retry_after():
+    delays = [backoff_delay(5, base_delay=1.0, max_delay=4.0) for _ in range(50)]
+    assert all(0 <= delay <= 4.0 for delay in delays)
+    assert backoff_delay(1, base_delay=0.1, max_delay=4.0, retry_after=3.0) == 3.0
+
+
+def test_transient_errors_are_retried():
+    client = ScriptedClient([APIError(429), APIError(502), "answer"])
+
+    response, attempts = call(client)
+
+    assert (response.text, attempts) == ("answer", 3)
+
+
+def test_client_errors_are_not_retried():
+    client = ScriptedClient([APIError(400), "answer"])
+
+    with pytest.raises(APIError):
+        call(client)
+    assert client.calls == 1
+
+
+def test_gives_up_after_max_attempts():
+    client = ScriptedClient([APIError(500)] * 3 + ["answer"])
+
+    with pytest.raises(APIError):
+        call(client)
+    assert client.calls == 3
+
+
+def test_slow_attempt_times_out_and_is_retried():
+    client = ScriptedClient([(5, "too late"), "answer"])
+
+    response, attempts = call(client)
+
+    assert (response.text, attempts) == ("answer", 2)
+
+
+def test_hedged_request_wins_over_a_slow_primary(fast_retries):
+    fast_retries["hedge"] = True
+    for _ in range(5):
+        llm_resilience.latency_tracker.add("mock", 0.01)
+    client = ScriptedClient([(0.4, "primary"), "hedge"])
+
+    response, attempts = call(client)
+
+    assert (response.text, attempts) == ("hedge", 1)
+    assert client.calls == 2
+
+
+def test_stream_restarts_on_retry_and_reports_the_attempt():
+    client = ScriptedClient([["Hel", APIError(503)], ["Hello", " world"]])
+    deltas = []
+
+    async def on_delta(text, attempt):
+        deltas.append((attempt, text))
+
+    text, attempts = asyncio.run(
+        stream_chat_completion(client, on_delta, model="mock", messages=[])
+    )
+
+    assert (text, attempts) == ("Hello world", 2)
+    assert deltas == [(1, "Hel"), (2, "Hello"), (2, " world")]
@@ -0,0 +1,93 @@
+"""Tests for the process-wide LLM scheduler"""
+
+import asyncio
+from collections import deque
+import time
+
+import pytest
+
+from src.services.concurrency import AdaptiveLimiter
+from src.services.llm_scheduler import LLMScheduler, WINDOW_SECONDS, llm_session
+
+
+def grant_order(scheduler: LLMScheduler, requests: list[tuple[str, int]]) -> list[str]:
+    """Queue (session, weight) requests behind a held slot and record grant order"""
+    granted = []
+
+    async def call(session_id: str, weight: int):
+        with llm_session(session_id, weight):
+            async with scheduler.slot():
+                granted.append(session_id)
+                await asyncio.sleep(0)
+
+    async def main():
+        await scheduler.acquire()  # hold the only slot while everything queues
+        tasks = [asyncio.create_task(call(*request)) for request in requests]
+        await asyncio.sleep(0)
+        scheduler.release()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    return granted
+
+
+def test_sessions_are_served_round_robin():
+    scheduler = LLMScheduler(max_concurrency=1)
+    granted = grant_order(scheduler, [("big", 1)] * 4 + [("small", 1)] * 2)
+
+    assert granted == ["big", "small", "big", "small", "big", "big"]
+    assert scheduler.inflight == 0 and scheduler.queued == 0
+
+
+def test_weight_gives_a_session_more_turns():
+    scheduler = LLMScheduler(max_concurrency=1)
+    granted = grant_order(scheduler, [("heavy", 2)] * 4 + [("light", 1)] * 2)
+
+    assert granted == ["heavy", "heavy", "light", "heavy", "heavy", "light"]
+
+
+def test_rpm_budget_waits_for_the_window():
+    scheduler = LLMScheduler(rpm=2)
+    now = time.monotonic()
+    scheduler._window = deque([[now - WINDOW_SECONDS + 0.5, 0], [now - 1, 0]])
+
+    assert scheduler._budget_wait(0, now) == pytest.approx(0.5)
+    scheduler.rpm = 3
+    assert scheduler._budget_wait(0, now) == 0
+
+
+def test_tpm_budget_and_oversized_requests():
+    scheduler = LLMScheduler(tpm=1000)
+    now = time.monotonic()
+    scheduler._window = deque([[now - 50, 600], [now - 20, 300]])
+
+    assert scheduler._budget_wait(100, now) == 0
+    assert scheduler._budget_wait(200, now) == pytest.approx(10)
+    # Larger than the whole budget: admitted once the window is empty
+    assert scheduler._budget_wait(5000, now) == pytest.approx(40)
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    scheduler = LLMScheduler(max_concurrency=1)
+
+    async def main():
+        await scheduler.acquire()
+        waiter = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+        assert scheduler.queued == 1
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        scheduler.release()
+        await asyncio.wait_for(scheduler.acquire(), 1)
+
+    asyncio.run(main())
+    assert scheduler.inflight == 1 and scheduler.queued == 0
+
+
+def test_capacity_follows_the_adaptive_limit():
+    limiter = AdaptiveLimiter(initial=3, max_limit=10)
+    scheduler = LLMScheduler(max_concurrency=5, limiter=limiter)
+
+    assert scheduler.capacity == 3
+    limiter.limit = 9.5
+    assert scheduler.capacity == 5
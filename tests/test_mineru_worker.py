@@ -0,0 +1,89 @@
+"""Tests for the persistent MinerU worker with a fake parse backend"""
+
+import asyncio
+import os
+from pathlib import Path
+import time
+
+import pytest
+
+from src.agents.question.tools.mineru_worker import MinerUWorker
+
+
+def fake_backend():
+    """Loaded in the worker process: behaviour depends on the PDF name"""
+
+    def parse(pdf_bytes: bytes, pdf_name: str, output_dir: Path):
+        if pdf_name.startswith("crash"):
+            os._exit(1)
+        if pdf_name.startswith("hang"):
+            time.sleep(60)
+        if pdf_name.startswith("slow"):
+            time.sleep(0.7)
+        auto_dir = output_dir / pdf_name / "auto"
+        auto_dir.mkdir(parents=True, exist_ok=True)
+        (auto_dir / f"{pdf_name}.md").write_text(pdf_bytes.decode())
+
+    return parse
+
+
+@pytest.fixture
+def worker():
+    worker = MinerUWorker(job_timeout=1.5, load_backend=fake_backend)
+    yield worker
+    worker.stop()
+
+
+def _job(tmp_path, name):
+    pdf = tmp_path / f"{name}.pdf"
+    pdf.write_text(name)
+    return str(pdf), str(tmp_path / "out")
+
+
+def test_parse_writes_output(worker, tmp_path):
+    ok, error = asyncio.run(worker.parse(*_job(tmp_path, "paper")))
+
+    assert (ok, error) == (True, "")
+    assert (tmp_path / "out" / "paper" / "auto" / "paper.md").read_text() == "paper"
+
+
+def test_timeout_does_not_count_time_waiting_in_the_queue(worker, tmp_path):
+    async def main():
+        # Together they take longer than the timeout; each alone does not
+        jobs = [worker.parse(*_job(tmp_path, f"slow_{n}")) for n in range(3)]
+        return await asyncio.gather(*jobs)
+
+    assert asyncio.run(main()) == [(True, "")] * 3
+
+
+def test_stopped_process_does_not_fail_jobs_of_its_replacement(worker, tmp_path):
+    async def main():
+        assert await worker.parse(*_job(tmp_path, "first")) == (True, "")
+        await asyncio.to_thread(worker.stop)
+        # The old reader notices its process exit while this job runs
+        return await worker.parse(*_job(tmp_path, "slow_second"))
+
+    assert asyncio.run(main()) == (True, "")
+
+
+def test_crashed_process_fails_only_its_job(worker, tmp_path):
+    async def main():
+        crashed = await worker.parse(*_job(tmp_path, "crash"))
+        after = await worker.parse(*_job(tmp_path, "after"))
+        return crashed, after
+
+    crashed, after = asyncio.run(main())
+    assert crashed == (False, "MinerU worker process exited")
+    assert after == (True, "")
+
+
+def test_stuck_job_times_out_and_queued_jobs_move_to_a_new_process(worker, tmp_path):
+    async def main():
+        hung = asyncio.create_task(worker.parse(*_job(tmp_path, "hang")))
+        await asyncio.sleep(0.1)
+        queued = worker.parse(*_job(tmp_path, "queued"))
+        return await asyncio.gather(hung, queued)
+
+    hung, queued = asyncio.run(main())
+    assert hung[0] is False and "timed out" in hung[1]
+    assert queued == (True, "")
@@ -0,0 +1,136 @@
+"""Tests for the content-addressed parse cache and the cached parser wrapper"""
+
+import asyncio
+import os
+import time
+
+from src.agents.question.tools import pdf_parser
+from src.agents.question.tools.parse_cache import ParseCache, hash_pdf, make_cache_key
+
+
+def write_tree(root, text="# Paper"):
+    (root / "auto" / "images").mkdir(parents=True)
+    (root / "auto" / "paper.md").write_text(text)
+    return root
+
+
+def test_store_and_restore_roundtrip(tmp_path):
+    cache = ParseCache(tmp_path / "cache")
+    source = write_tree(tmp_path / "parsed" / "paper")
+
+    assert cache.lookup("k") is None
+    assert cache.store("k", source, {"mode": "pymupdf"})
+    assert cache.restore("k", tmp_path / "out" / "paper")
+    assert (tmp_path / "out" / "paper" / "auto" / "paper.md").read_text() == "# Paper"
+
+
+def test_restore_gives_the_tree_a_fresh_mtime(tmp_path):
+    cache = ParseCache(tmp_path / "cache")
+    source = write_tree(tmp_path / "parsed" / "old_paper")
+    cache.store("k", source)
+    old = time.time() - 3600
+    os.utime(cache.lookup("k"), (old, old))
+
+    # Another paper parsed since then lives in the same output directory
+    write_tree(tmp_path / "out" / "newer_paper")
+    cache.restore("k", tmp_path / "out" / "old_paper")
+
+    newest = max((tmp_path / "out").iterdir(), key=lambda d: d.stat().st_mtime)
+    assert newest.name == "old_paper"
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = ParseCache(tmp_path / "cache", max_entries=2)
+    for index, key in enumerate(["a", "b"]):
+        cache.store(key, write_tree(tmp_path / f"src_{key}"))
+        stamp = time.time() - 100 + index
+        os.utime(cache.cache_dir / key / "meta.json", (stamp, stamp))
+    cache.lookup("a")  # "a" is now the most recently used
+
+    cache.store("c", write_tree(tmp_path / "src_c"))
+
+    assert cache.lookup("a") is not None
+    assert cache.lookup("b") is None
+    assert cache.lookup("c") is not None
+
+
+def _setup_parser(monkeypatch, tmp_path):
+    cache = ParseCache(tmp_path / "cache")
+    monkeypatch.setattr(pdf_parser, "get_parse_cache", lambda: cache)
+    pdf = tmp_path / "paper.pdf"
+    pdf.write_bytes(b"%PDF-1.4 test paper")
+    return cache, pdf, tmp_path / "out"
+
+
+def _writer(text, calls):
+    def parse(pdf_path, output_base_dir):
+        calls.append(text)
+        write_tree(output_base_dir / pdf_path.stem, text)
+        return True
+
+    return parse
+
+
+def _failing(calls):
+    def parse(pdf_path, output_base_dir):
+        calls.append("fail")
+        return False
+
+    return parse
+
+
+def test_parse_returns_the_paper_dir_and_hits_the_cache(monkeypatch, tmp_path):
+    cache, pdf, out = _setup_parser(monkeypatch, tmp_path)
+    calls = []
+
+    first = pdf_parser._parse_with_cache("mineru", pdf, out, _writer("mineru", calls))
+    second = pdf_parser._parse_with_cache("mineru", pdf, out, _writer("mineru", calls))
+
+    assert first == second == out / "paper"
+    assert calls == ["mineru"]
+
+
+def test_fallback_output_is_not_cached_as_mineru(monkeypatch, tmp_path):
+    cache, pdf, out = _setup_parser(monkeypatch, tmp_path)
+    calls = []
+
+    result = pdf_parser._parse_with_cache(
+        "mineru", pdf, out, _failing(calls), fallback_fn=_writer("pymupdf", calls)
+    )
+    assert result == out / "paper"
+
+    pdf_hash = hash_pdf(pdf)
+    assert cache.lookup(make_cache_key(pdf_hash, "mineru")) is None
+    assert cache.lookup(make_cache_key(pdf_hash, "pymupdf")) is not None
+
+    # The next run tries MinerU again instead of reusing the fallback parse
+    result = pdf_parser._parse_with_cache(
+        "mineru", pdf, out, _writer("mineru", calls), fallback_fn=_writer("pymupdf", calls)
+    )
+    assert calls == ["fail", "pymupdf", "mineru"]
+    assert (result / "auto" / "paper.md").read_text() == "mineru"
+
+
+def test_async_fallback_is_cached_under_pymupdf(monkeypatch, tmp_path):
+    cache, pdf, out = _setup_parser(monkeypatch, tmp_path)
+    calls = []
+
+    async def fail(pdf_path, output_base_dir):
+        return _failing(calls)(pdf_path, output_base_dir)
+
+    async def fallback(pdf_path, output_base_dir):
+        return _writer("pymupdf", calls)(pdf_path, output_base_dir)
+
+    result = asyncio.run(
+        pdf_parser._parse_with_cache_async("mineru", pdf, out, fail, fallback_fn=fallback)
+    )
+    assert result == out / "paper"
+    assert cache.lookup(make_cache_key(hash_pdf(pdf), "mineru")) is None
+    assert cache.lookup(make_cache_key(hash_pdf(pdf), "pymupdf")) is not None
+
+
+def test_failed_parse_returns_none_and_caches_nothing(monkeypatch, tmp_path):
+    cache, pdf, out = _setup_parser(monkeypatch, tmp_path)
+
+    assert pdf_parser._parse_with_cache("pymupdf", pdf, out, _failing([])) is None
+    assert cache.lookup(make_cache_key(hash_pdf(pdf), "pymupdf")) is None
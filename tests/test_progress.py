@@ -0,0 +1,134 @@
+"""Tests for the per-session progress channel"""
+
+import asyncio
+
+from src.services.progress import SessionChannel
+
+
+class SlowClient:
+    """WebSocket stand-in whose sends wait until the test releases them"""
+
+    def __init__(self):
+        self.sent: list[dict] = []
+        self.gate = asyncio.Semaphore(0)
+
+    async def send(self, message: dict):
+        await self.gate.acquire()
+        self.sent.append(message)
+
+    def release(self, count: int = 1):
+        for _ in range(count):
+            self.gate.release()
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def partial(text: str) -> dict:
+    return {"type": "question_partial", "question_id": "q1", "text": text}
+
+
+def test_events_are_sent_in_order():
+    async def run():
+        client = SlowClient()
+        channel = SessionChannel(client.send, log_flush_interval=0)
+        client.release(10)
+        for index in range(3):
+            await channel.send_event({"type": "progress", "index": index})
+        await channel.close()
+        return client.sent
+
+    sent = asyncio.run(run())
+    assert [event["index"] for event in sent] == [0, 1, 2]
+
+
+def test_coalesced_events_replace_pending_event():
+    async def run():
+        client = SlowClient()
+        channel = SessionChannel(client.send, log_flush_interval=0)
+        await channel.send_event(partial("a"), coalesce_key="q1")
+        await _settle()  # "a" is being sent, the client is slow
+        await channel.send_event(partial("ab"), coalesce_key="q1")
+        await channel.send_event(partial("abc"), coalesce_key="q1")
+        client.release(10)
+        await channel.close()
+        return client.sent
+
+    sent = asyncio.run(run())
+    assert [event["text"] for event in sent] == ["a", "abc"]
+    assert all("_coalesce_key" not in event for event in sent)
+
+
+def test_slow_consumer_keeps_receiving_coalesced_updates():
+    async def run():
+        client = SlowClient()
+        channel = SessionChannel(client.send, log_flush_interval=0)
+        await channel.send_event(partial("a"), coalesce_key="q1")
+        await _settle()
+        await channel.send_event(partial("ab"), coalesce_key="q1")
+        await channel.send_event(partial("abc"), coalesce_key="q1")
+
+        # "a" goes out, then the merged "abc" starts sending
+        client.release()
+        await _settle()
+        await channel.send_event(partial("abcd"), coalesce_key="q1")
+        await channel.send_event(partial("abcde"), coalesce_key="q1")
+
+        client.release(10)
+        await channel.close()
+        return client.sent
+
+    sent = asyncio.run(run())
+    assert [event["text"] for event in sent] == ["a", "abc", "abcde"]
+
+
+def test_coalescing_does_not_reorder_other_events():
+    async def run():
+        client = SlowClient()
+        channel = SessionChannel(client.send, log_flush_interval=0)
+        await channel.send_event({"type": "progress", "stage": "start"})
+        await _settle()
+        await channel.send_event(partial("a"), coalesce_key="q1")
+        await channel.send_event({"type": "result", "question_id": "q1"})
+        await channel.send_event(partial("ab"), coalesce_key="q1")
+        client.release(10)
+        await channel.close()
+        return client.sent
+
+    sent = asyncio.run(run())
+    assert [event["type"] for event in sent] == ["progress", "question_partial", "result"]
+    assert sent[1]["text"] == "ab"
+
+
+def test_logs_collapse_repeats_and_drop_oldest():
+    async def run():
+        client = SlowClient()
+        channel = SessionChannel(client.send, max_log_lines=3, log_flush_interval=0)
+        await channel.send_event({"type": "progress"})
+        await _settle()  # hold the pusher while logs pile up
+        for line in ("one", "two", "two", "three", "four"):
+            channel.write_log(line)
+        client.release(10)
+        await channel.close()
+        return client.sent
+
+    sent = asyncio.run(run())
+    logs = [event for event in sent if event["type"] == "log"]
+    assert logs[0]["lines"] == ["two (x2)", "three", "four"]
+    assert logs[0]["dropped"] == 1
+
+
+def test_broken_client_releases_blocked_producers():
+    async def run():
+        async def send(message):
+            raise ConnectionError("client went away")
+
+        channel = SessionChannel(send, max_pending_events=1, log_flush_interval=0)
+        for index in range(5):
+            await asyncio.wait_for(channel.send_event({"index": index}), timeout=1)
+        await channel.close()
+        return channel.broken
+
+    assert asyncio.run(run()) is True
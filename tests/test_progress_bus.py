@@ -0,0 +1,68 @@
+"""Tests for the progress bus backends and the background topic publisher"""
+
+import asyncio
+
+import pytest
+
+from src.services.progress_bus import MemoryBus, ProgressBus, SQLiteBus, TopicPublisher
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def bus(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBus()
+    return SQLiteBus(tmp_path / "progress.sqlite3", poll_interval=0.01)
+
+
+async def replay(bus: ProgressBus, topic: str, after: int = 0) -> list:
+    return [(seq, event) async for seq, event in bus.subscribe(topic, after)]
+
+
+def test_publisher_numbers_events_and_writes_them_in_order(bus):
+    async def main():
+        publisher = TopicPublisher(bus, "t")
+        seqs = [publisher.publish({"n": n}) for n in range(5)]
+        await publisher.aclose()
+        return seqs, await replay(bus, "t", after=2)
+
+    seqs, events = asyncio.run(main())
+    assert seqs == [1, 2, 3, 4, 5]
+    assert events == [(3, {"n": 2}), (4, {"n": 3}), (5, {"n": 4})]
+
+
+def test_slow_or_failing_bus_does_not_block_the_sender():
+    class SlowBus(MemoryBus):
+        async def publish(self, topic, event, seq=None):
+            await asyncio.sleep(0.2)
+            if event.get("fail"):
+                raise RuntimeError("bus down")
+            return await super().publish(topic, event, seq)
+
+    bus = SlowBus()
+
+    async def main():
+        publisher = TopicPublisher(bus, "t")
+        loop = asyncio.get_running_loop()
+        began = loop.time()
+        for event in ({"n": 1}, {"fail": True}, {"n": 3}):
+            publisher.publish(event)
+        sent_in = loop.time() - began
+        await publisher.aclose()
+        return sent_in, await replay(bus, "t")
+
+    sent_in, events = asyncio.run(main())
+    assert sent_in < 0.05
+    # The failed event is skipped; the numbering of the others is kept
+    assert events == [(1, {"n": 1}), (3, {"n": 3})]
+
+
+def test_memory_bus_keeps_only_max_events():
+    bus = MemoryBus(max_events=2)
+
+    async def main():
+        for n in range(4):
+            await bus.publish("t", {"n": n})
+        await bus.close_topic("t")
+        return await replay(bus, "t")
+
+    assert asyncio.run(main()) == [(3, {"n": 2}), (4, {"n": 3})]
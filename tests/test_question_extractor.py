@@ -0,0 +1,192 @@
+"""Tests for chunked question extraction and chunk merging"""
+
+import asyncio
+from contextlib import closing
+
+from src.agents.question.tools import question_extractor
+from src.agents.question.tools.extraction_cache import ExtractionCache
+from src.agents.question.tools.question_extractor import (
+    _merge_questions_into,
+    merge_chunk_questions,
+    split_markdown_into_chunks,
+)
+from src.agents.question.tools.result_journal import reference_key
+from src.services.llm import LLMConfig
+
+
+def q(number, text, images=None):
+    return {"question_number": str(number), "question_text": text, "images": images or []}
+
+
+def paper(count: int) -> str:
+    return "".join(
+        f"Question {n}. What is {n} plus {n}? Show all working.\n\n" for n in range(1, count + 1)
+    )
+
+
+def test_short_paper_is_one_chunk():
+    assert split_markdown_into_chunks("Question 1. x", chunk_chars=100) == ["Question 1. x"]
+
+
+def test_chunks_split_on_question_boundaries_with_overlap():
+    markdown = paper(40)
+    chunks = split_markdown_into_chunks(markdown, chunk_chars=500, overlap_chars=120)
+
+    assert len(chunks) > 1
+    for previous, chunk in zip(chunks, chunks[1:]):
+        # Each chunk repeats whole lines from the end of the previous one
+        head = chunk.split("\n", 1)[0]
+        assert head in previous
+        assert chunk.startswith("Question") or chunk.startswith("\n")
+    # Nothing is lost
+    for n in range(1, 41):
+        assert any(f"Question {n}." in chunk for chunk in chunks)
+
+
+def test_merge_deduplicates_overlap_keeping_longest_text_and_all_images():
+    merged = merge_chunk_questions(
+        [
+            [q(1, "First question"), q(2, "Second question, cut", ["a.png"])],
+            [q(2, "Second question, cut at the edge", ["b.png"]), q(3, "Third question")],
+        ]
+    )
+
+    assert [item["question_number"] for item in merged] == ["1", "2", "3"]
+    assert merged[1]["question_text"] == "Second question, cut at the edge"
+    assert merged[1]["images"] == ["a.png", "b.png"]
+
+
+def test_merge_keeps_same_number_with_different_text():
+    merged = merge_chunk_questions(
+        [[q(1, "Section A: integrate x squared")], [q(1, "Section B: the probability of two sixes")]]
+    )
+    assert len(merged) == 2
+
+
+def test_merge_returns_only_new_questions_and_skips_empty():
+    merged = [q(1, "First question")]
+    added = _merge_questions_into(merged, [q(1, "First question"), q(2, ""), "junk", q(3, "Third")])
+    assert added == [q(3, "Third")]
+
+
+def _fake_chunks(monkeypatch, chunk_results: list[list[dict] | None], chunks: list[str]):
+    """Make the extractor split into chunks and return canned per-chunk results"""
+    monkeypatch.setattr(
+        question_extractor,
+        "get_extraction_settings",
+        lambda: {
+            "chunked": True,
+            "chunk_chars": 10,
+            "overlap_chars": 40,
+            "max_concurrency": 4,
+            "max_chars": 1000,
+        },
+    )
+    monkeypatch.setattr(question_extractor, "split_markdown_into_chunks", lambda *a: chunks)
+    monkeypatch.setattr(question_extractor, "get_async_llm_client", lambda config: None)
+    monkeypatch.setattr(question_extractor, "get_agent_params", lambda name: {})
+
+    async def fake_chunk(client, model, chunk, image_list, index, total, params):
+        if chunk_results[index] is None:
+            return None
+        return [dict(item) for item in chunk_results[index]]
+
+    monkeypatch.setattr(question_extractor, "_extract_chunk_async", fake_chunk)
+
+
+def _run_streaming(monkeypatch, chunk_results: list[list[dict] | None], chunks: list[str]):
+    """Run extract_questions_with_llm_async with canned per-chunk results"""
+    _fake_chunks(monkeypatch, chunk_results, chunks)
+    emitted: list[list[dict]] = []
+
+    async def on_questions(questions):
+        emitted.append(questions)
+
+    async def run():
+        return await question_extractor.extract_questions_with_llm_async(
+            "paper", None, question_extractor.Path("/nonexistent"), "key", "url", "model",
+            on_questions=on_questions,
+        )
+
+    return asyncio.run(run()), emitted
+
+
+def test_streaming_holds_back_overlap_questions_until_next_chunk(monkeypatch):
+    chunks = [
+        "Question 1. First question\nQuestion 2. Second question, cut",
+        "Question 2. Second question, cut at the edge\nQuestion 3. Third question",
+    ]
+    results = [
+        [q(1, "First question"), q(2, "Second question, cut")],
+        [q(2, "Second question, cut at the edge"), q(3, "Third question")],
+    ]
+    merged, emitted = _run_streaming(monkeypatch, results, chunks)
+
+    # Question 2 is in the overlap, so it waits for chunk 2 and goes out complete
+    assert [[item["question_number"] for item in batch] for batch in emitted] == [["1"], ["2", "3"]]
+    assert emitted[1][0]["question_text"] == "Second question, cut at the edge"
+
+    streamed = [item for batch in emitted for item in batch]
+    assert [reference_key(item) for item in streamed] == [reference_key(item) for item in merged]
+
+
+def test_streaming_emits_copies(monkeypatch):
+    chunks = ["Question 1. One\nQuestion 2. Two", "Question 2. Two\nQuestion 3. Three"]
+    results = [[q(1, "One"), q(2, "Two")], [q(2, "Two", ["x.png"]), q(3, "Three")]]
+    merged, emitted = _run_streaming(monkeypatch, results, chunks)
+
+    streamed = [item for batch in emitted for item in batch]
+    keys = [reference_key(item) for item in streamed]
+    assert all(a is not b for a, b in zip(streamed, merged))
+
+    # Later merging must not change what a consumer already received
+    merged[0]["question_text"] = "changed"
+    merged[1]["images"].append("y.png")
+    assert [reference_key(item) for item in streamed] == keys
+    assert streamed[1]["images"] == ["x.png"]
+
+
+def test_failed_chunk_fails_the_whole_extraction(monkeypatch):
+    chunks = ["Question 1. One", "Question 2. Two", "Question 3. Three"]
+    results = [[q(1, "One")], None, [q(3, "Three")]]
+    merged, emitted = _run_streaming(monkeypatch, results, chunks)
+
+    assert merged == []
+    # Question 1 may already be out, but nothing after the failed chunk is
+    streamed = [item["question_number"] for batch in emitted for item in batch]
+    assert "3" not in streamed
+
+
+def _extract_paper(monkeypatch, tmp_path, chunk_results):
+    paper_dir = tmp_path / "paper"
+    (paper_dir / "auto").mkdir(parents=True)
+    (paper_dir / "auto" / "paper.md").write_text("Question 1. One\nQuestion 2. Two\n")
+    cache = ExtractionCache(tmp_path / "extraction.sqlite3")
+
+    _fake_chunks(monkeypatch, chunk_results, ["Question 1. One", "Question 2. Two"])
+    monkeypatch.setattr(
+        question_extractor, "get_llm_config", lambda: LLMConfig("key", "http://mock", "mock")
+    )
+    monkeypatch.setattr(question_extractor, "get_extraction_cache", lambda: cache)
+
+    success = asyncio.run(question_extractor.extract_questions_from_paper_async(str(paper_dir)))
+    saved = list((paper_dir).glob("*_questions.json"))
+    return success, saved, cache
+
+
+def test_partial_extraction_is_not_cached_or_saved(monkeypatch, tmp_path):
+    success, saved, cache = _extract_paper(monkeypatch, tmp_path, [[q(1, "One")], None])
+
+    assert success is False
+    assert saved == []
+    with closing(cache._connect()) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0] == 0
+
+
+def test_complete_extraction_is_cached_and_saved(monkeypatch, tmp_path):
+    success, saved, cache = _extract_paper(monkeypatch, tmp_path, [[q(1, "One")], [q(2, "Two")]])
+
+    assert success is True
+    assert len(saved) == 1
+    with closing(cache._connect()) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0] == 1
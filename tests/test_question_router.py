@@ -0,0 +1,51 @@
+"""Tests for resolving mimic request inputs, including session resume"""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from src.api.routers import question
+from src.api.routers.question import MimicRequestError, resolve_mimic_inputs
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(question, "MIMIC_OUTPUT_DIR", tmp_path / "mimic_papers")
+    return tmp_path / "mimic_papers"
+
+
+def resolve(data: dict) -> dict:
+    return asyncio.run(resolve_mimic_inputs(data))
+
+
+def test_parsed_session_can_be_resumed(output_dir):
+    started = resolve({"mode": "parsed", "paper_path": "2211asm1"})
+    session_id = Path(started["output_dir"]).name
+
+    resumed = resolve({"mode": "resume", "session_id": session_id})
+
+    assert resumed["paper_dir"] == "2211asm1"
+    assert resumed["output_dir"] == started["output_dir"]
+    assert resumed["resume"] is True
+
+
+def test_pdf_session_resumes_the_paper_in_its_batch_dir(output_dir):
+    (output_dir / "mimic_1_exam" / "exam" / "auto").mkdir(parents=True)
+
+    resumed = resolve({"mode": "resume", "session_id": "mimic_1_exam"})
+
+    assert resumed["paper_dir"] == "mimic_1_exam/exam"
+
+
+@pytest.mark.parametrize("session_id", ["", "../etc", "missing"])
+def test_resume_rejects_unknown_sessions(output_dir, session_id):
+    output_dir.mkdir()
+    with pytest.raises(MimicRequestError):
+        resolve({"mode": "resume", "session_id": session_id})
+
+
+def test_resume_without_a_paper_fails(output_dir):
+    (output_dir / "mimic_1_empty").mkdir(parents=True)
+    with pytest.raises(MimicRequestError, match="no parsed paper"):
+        resolve({"mode": "resume", "session_id": "mimic_1_empty"})
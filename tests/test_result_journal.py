@@ -0,0 +1,132 @@
+"""Tests for the mimic result journal and resuming a session from it"""
+
+import asyncio
+import json
+
+import pytest
+
+from src.agents.question.tools import exam_mimic
+from src.agents.question.tools.result_journal import JournalBusy, ResultJournal, reference_key
+
+
+def ok(n: int) -> dict:
+    return {"success": True, "reference_question_number": str(n), "generated_question": {"n": n}}
+
+
+def failed(n: int) -> dict:
+    return {"success": False, "reference_question_number": str(n), "error": "boom"}
+
+
+def test_reference_key_is_stable_and_content_based():
+    ref = {"question_number": "1", "question_text": "Solve x.", "images": ["a.png"]}
+
+    assert reference_key(ref) == reference_key({**ref, "images": []})
+    assert reference_key(ref) != reference_key({**ref, "question_text": "Solve y."})
+
+
+def test_load_completed_keeps_only_successes(tmp_path):
+    journal = ResultJournal(tmp_path)
+    journal.append(1, "a", ok(1))
+    journal.append(2, "b", failed(2))
+
+    assert journal.load_completed() == {"a": ok(1)}
+
+
+def test_latest_result_wins_and_torn_line_is_ignored(tmp_path):
+    journal = ResultJournal(tmp_path)
+    journal.append(1, "a", failed(1))
+    journal.append(1, "a", ok(1))
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"index": 2, "key": "b", "resu')  # crash mid-append
+
+    assert list(journal.iter_results(["b", "a"])) == [ok(1)]
+    assert journal.load_completed() == {"a": ok(1)}
+
+
+def test_reset_starts_an_empty_journal(tmp_path):
+    journal = ResultJournal(tmp_path)
+    journal.append(1, "a", ok(1))
+    journal.reset()
+
+    assert journal.load_completed() == {}
+
+
+def test_journal_lock_refuses_a_second_run(tmp_path):
+    first, second = ResultJournal(tmp_path), ResultJournal(tmp_path)
+    first.acquire()
+
+    with pytest.raises(JournalBusy):
+        second.acquire()
+
+    first.release()
+    second.acquire()
+    second.release()
+
+
+def test_write_summary_streams_results_in_key_order(tmp_path):
+    journal = ResultJournal(tmp_path)
+    journal.append(2, "b", failed(2))
+    journal.append(1, "a", ok(1))
+    journal.append(3, "c", ok(3))
+
+    output = tmp_path / "summary.json"
+    counts = journal.write_summary(output, {"kb_name": "kb"}, ["a", "b", "c"])
+
+    summary = json.loads(output.read_text(encoding="utf-8"))
+    assert counts == {"successful": 2, "failed": 1}
+    assert summary["kb_name"] == "kb"
+    assert (summary["successful_generations"], summary["failed_generations"]) == (2, 1)
+    assert summary["generated_questions"] == [ok(1), ok(3)]
+    assert summary["failed_questions"] == [failed(2)]
+
+
+def test_resumed_session_only_regenerates_missing_results(tmp_path, monkeypatch):
+    paper = tmp_path / "reference_papers" / "journal_paper"
+    (paper / "auto").mkdir(parents=True)
+    references = [
+        {"question_number": str(n), "question_text": f"Question {n}: find x.", "images": []}
+        for n in (1, 2, 3)
+    ]
+    (paper / "journal_paper_questions.json").write_text(json.dumps({"questions": references}))
+    monkeypatch.chdir(tmp_path)
+
+    generated = []
+    failing = {"2"}
+
+    async def fake_generate(reference_question, **kwargs):
+        number = reference_question["question_number"]
+        generated.append(number)
+        if number in failing:
+            return {"success": False, "error": "boom"}
+        return {
+            "success": True,
+            "question": {"question": f"Mimic {number}", "answer": "x"},
+            "validation": {},
+            "rounds": 1,
+        }
+
+    monkeypatch.setattr(exam_mimic, "generate_question_from_reference", fake_generate)
+    output_dir = tmp_path / "session"
+
+    def run(resume: bool) -> dict:
+        return asyncio.run(
+            exam_mimic.mimic_exam_questions(
+                paper_dir="journal_paper", kb_name="kb", output_dir=str(output_dir), resume=resume
+            )
+        )
+
+    assert run(resume=False)["success"]
+    assert sorted(generated) == ["1", "2", "3"]
+    # Another paper whose name shares the prefix, in the same output directory
+    other_paper = output_dir / "journal_paper_v2_20240101_000000_generated_questions.json"
+    other_paper.write_text("{}")
+
+    generated.clear()
+    failing.clear()
+    assert run(resume=True)["success"]
+    assert generated == ["2"]
+
+    assert other_paper.exists()
+    [summary_file] = set(output_dir.glob("*_generated_questions.json")) - {other_paper}
+    summary = json.loads(summary_file.read_text(encoding="utf-8"))
+    assert (summary["successful_generations"], summary["failed_generations"]) == (3, 0)
@@ -0,0 +1,124 @@
+"""Tests for streamed upload storage, multipart parsing and the TTL sweep"""
+
+import asyncio
+import hashlib
+import os
+import time
+
+import pytest
+
+from src.services import uploads
+from src.services.uploads import (
+    UploadError,
+    UploadTooLarge,
+    UploadWriter,
+    claim_upload,
+    get_upload,
+    receive_multipart_upload,
+    sweep_stale_uploads,
+)
+
+PDF = b"%PDF-1.4\n" + bytes(range(256)) * 5000
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_DIR", tmp_path / "uploads")
+    monkeypatch.setattr(uploads, "WRITE_BUFFER_BYTES", 4096)
+    return tmp_path / "uploads"
+
+
+async def chunked(data: bytes, size: int = 1000):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+def multipart_body(boundary: str, filename: str, data: bytes) -> bytes:
+    return (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="note"\r\n\r\n'
+        "ignored\r\n"
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode() + data + f"\r\n--{boundary}--\r\n".encode()
+
+
+def test_writer_hashes_while_writing(upload_dir):
+    async def main():
+        writer = UploadWriter("../exam", max_bytes=len(PDF))
+        async for chunk in chunked(PDF):
+            await writer.write(chunk)
+        return await writer.finish()
+
+    record = asyncio.run(main())
+
+    assert record.pdf_name == "exam.pdf"
+    assert record.sha256 == hashlib.sha256(PDF).hexdigest()
+    assert open(record.path, "rb").read() == PDF
+    assert get_upload(record.upload_id) == record
+
+
+def test_writer_rejects_oversized_upload(upload_dir):
+    async def main():
+        writer = UploadWriter("exam.pdf", max_bytes=5000)
+        async for chunk in chunked(PDF):
+            await writer.write(chunk)
+
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(main())
+    assert not upload_dir.exists() or not any(upload_dir.iterdir())
+
+
+def test_multipart_streams_the_file_part(upload_dir):
+    body = multipart_body("xyzzy", "paper.pdf", PDF)
+
+    record = asyncio.run(
+        receive_multipart_upload("multipart/form-data; boundary=xyzzy", chunked(body, 777))
+    )
+
+    assert record.pdf_name == "paper.pdf"
+    assert record.size == len(PDF)
+    assert record.sha256 == hashlib.sha256(PDF).hexdigest()
+
+
+def test_multipart_without_file_field_is_rejected(upload_dir):
+    body = b'--b\r\nContent-Disposition: form-data; name="note"\r\n\r\nx\r\n--b--\r\n'
+    with pytest.raises(UploadError, match="'file' field"):
+        asyncio.run(receive_multipart_upload("multipart/form-data; boundary=b", chunked(body)))
+
+
+def test_sweep_removes_only_stale_unclaimed_uploads(upload_dir, tmp_path):
+    async def store(name):
+        writer = UploadWriter(name)
+        await writer.write(PDF)
+        return await writer.finish()
+
+    stale, fresh, claimed = (asyncio.run(store(f"{n}.pdf")) for n in ("stale", "fresh", "claimed"))
+    claim_upload(claimed, tmp_path / "session")
+    old = time.time() - 7200
+    for path in (upload_dir / stale.upload_id).iterdir():
+        os.utime(path, (old, old))
+    os.utime(upload_dir / stale.upload_id, (old, old))
+
+    assert sweep_stale_uploads(ttl_seconds=3600) == 1
+    assert sorted(p.name for p in upload_dir.iterdir()) == [fresh.upload_id]
+    assert (tmp_path / "session" / "claimed.pdf").read_bytes() == PDF
+
+
+def test_upload_endpoint_accepts_raw_and_multipart_bodies(upload_dir):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from src.api.routers import question
+
+    app = FastAPI()
+    app.include_router(question.router, prefix="/api/question")
+    client = TestClient(app)
+    digest = hashlib.sha256(PDF).hexdigest()
+
+    raw = client.post("/api/question/upload?filename=raw.pdf", content=PDF)
+    form = client.post("/api/question/upload", files={"file": ("form.pdf", PDF, "application/pdf")})
+
+    assert (raw.json()["pdf_name"], raw.json()["sha256"]) == ("raw.pdf", digest)
+    assert (form.json()["pdf_name"], form.json()["sha256"]) == ("form.pdf", digest)